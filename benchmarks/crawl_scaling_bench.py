@@ -0,0 +1,129 @@
+# benchmarks/crawl_scaling_bench.py
+"""
+일괄 크롤링 처리량 벤치마크: 스레드만 쓰는 기존 방식 vs 받기 스레드 + 파싱 프로세스 풀(crawl_pipeline.crawl_items).
+
+pipeline_bench.py의 로컬 poedb 대역 서버가 고정 아이템 페이지(benchmarks/fixtures/poedb_item.html)를 지연과 함께 돌려주고,
+같은 페이지 N개를 가져와 파싱하는 데 걸린 시간을 잰다.
+  - threads     : get_item_details_from_poedb를 ThreadPoolExecutor(받기 스레드 수)로 동시에 (파싱이 GIL을 두고 줄을 섬)
+  - pipeline[p] : crawl_items(parse_workers=p) — p를 1부터 --max-workers(기본: CPU 코어 수)까지 두 배씩
+결과마다 초당 페이지 수와 threads 대비 배율을 보여준다. 코어가 하나뿐인 PC에서는 프로세스를 늘려도 빨라지지 않는 것이 정상이다.
+결과를 JSON으로 저장해서 --compare로 이전 결과(다른 PC 포함)와 비교할 수 있다.
+
+사용법:
+    python benchmarks/crawl_scaling_bench.py --pages 200 --output crawl_result.json
+    python benchmarks/crawl_scaling_bench.py --pages 400 --latency-ms 50 --fetch-threads 8 --max-workers 16
+    python benchmarks/crawl_scaling_bench.py --compare 이전_결과.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def worker_counts(max_workers):
+    counts = []; count = 1
+    while count < max_workers: counts.append(count); count *= 2
+    return counts + [max_workers]
+
+
+def run_threads(identifiers, fetch_threads):
+    from crawler import get_item_details_from_poedb
+    with ThreadPoolExecutor(max_workers=fetch_threads) as executor:
+        results = list(executor.map(get_item_details_from_poedb, identifiers))
+    return sum(1 for item_data in results if item_data)
+
+
+def run_pipeline(identifiers, fetch_threads, parse_workers):
+    from crawl_pipeline import crawl_items
+    return sum(1 for result in crawl_items(identifiers, parse_workers=parse_workers, fetch_threads=fetch_threads, request_delay_seconds=0) if result['item_data'])
+
+
+def measure(label, function, pages, verbose):
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()): # 크롤러의 URL 출력 등은 버림
+        started = time.perf_counter(); succeeded = function(); elapsed = time.perf_counter() - started
+    row = {'mode': label, 'pages': pages, 'succeeded': succeeded, 'seconds': elapsed, 'pages_per_second': pages / elapsed}
+    print(f"  {label:<16}{elapsed:>10.2f}{row['pages_per_second']:>12.1f}{succeeded:>8}/{pages}", flush=True)
+    return row
+
+
+def run_benchmark(args):
+    # pipeline_bench의 대역 서버를 그대로 쓴다 (poedb 경로만 사용)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from pipeline_bench import start_stand_in_server
+    config = {'poedb_latency_ms': args.latency_ms, 'item_html': open(os.path.join(FIXTURES_DIR, "poedb_item.html"), 'rb').read(),
+              'home_html': open(os.path.join(FIXTURES_DIR, "poedb_home.html"), 'rb').read()}
+    server, base_url = start_stand_in_server(config)
+    # 앱 모듈은 임포트할 때 환경 변수를 읽으므로 임포트 전에 대역 서버를 가리키게 한다 (파싱 프로세스는 URL을 쓰지 않음)
+    os.environ.update({'POEPLANNER_POEDB_BASE_URL': f"{base_url}/kr/", 'POEPLANNER_POEDB_REQUEST_DELAY': "0"})
+    sys.path.insert(0, SRC_DIR)
+    import crawler # noqa: 측정 전에 임포트
+    identifiers = [f"Bench_Item_{index}" for index in range(args.pages)]
+    rows = []
+    try:
+        print(f"  {'방식':<16}{'초':>10}{'페이지/초':>12}{'성공':>8}")
+        if args.warmup: measure("warmup", lambda: run_threads(identifiers[:args.fetch_threads * 2], args.fetch_threads), args.fetch_threads * 2, args.verbose) # 연결/임포트 데우기
+        rows.append(measure("threads", lambda: run_threads(identifiers, args.fetch_threads), args.pages, args.verbose))
+        for parse_workers in worker_counts(args.max_workers):
+            rows.append(measure(f"pipeline[{parse_workers}]", lambda: run_pipeline(identifiers, args.fetch_threads, parse_workers), args.pages, args.verbose))
+    finally:
+        server.shutdown()
+    baseline = rows[0]['pages_per_second']
+    for row in rows: row['speedup_vs_threads'] = row['pages_per_second'] / baseline
+    return {'meta': collect_meta(args), 'results': rows}
+
+
+def collect_meta(args):
+    try: commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): commit = None
+    options = {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'verbose')}
+    return {'commit': commit, 'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'options': options}
+
+
+def print_summary(results):
+    meta = results['meta']
+    print(f"\n일괄 크롤링: 페이지 {meta['options']['pages']}개, 지연 {meta['options']['latency_ms']}ms, 받기 스레드 {meta['options']['fetch_threads']}개, CPU {meta['cpu_count']}개 (커밋 {meta['commit'] or '?'})")
+    for row in results['results']: print(f"  {row['mode']:<16}{row['pages_per_second']:>10.1f} 페이지/초  (threads 대비 {row['speedup_vs_threads']:.2f}x)")
+
+
+def print_comparison(baseline, results):
+    print(f"\n비교: 기준 커밋 {baseline['meta'].get('commit') or '?'} (CPU {baseline['meta'].get('cpu_count')}개) -> 현재 {results['meta'].get('commit') or '?'} (CPU {results['meta'].get('cpu_count')}개)")
+    old_rows = {row['mode']: row for row in baseline.get('results', [])}
+    for row in results['results']:
+        old = old_rows.get(row['mode'])
+        if old: print(f"  {row['mode']:<16}{old['pages_per_second']:>10.1f} -> {row['pages_per_second']:.1f} 페이지/초 ({row['pages_per_second'] / old['pages_per_second']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일괄 크롤링 처리량 벤치마크 (스레드 vs 파싱 프로세스 풀)")
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=20, help="대역 poedb 서버의 응답 지연")
+    parser.add_argument('--fetch-threads', type=int, default=4, help="받기 스레드 수 (threads 방식의 스레드 수와 같음)")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help="파싱 프로세스 수 최댓값 (1부터 두 배씩 잰다)")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', help="결과 JSON 경로")
+    parser.add_argument('--compare', help="비교할 이전 결과 JSON")
+    parser.add_argument('--verbose', action='store_true', help="앱 모듈의 출력 메시지도 보여주기")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    print_summary(results)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f: print_comparison(json.load(f), results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# benchmarks/item_memory_bench.py
+"""
+아이템 정보 메모리 벤치마크: dict(지금 주고받는 모양) vs item_record.ItemRecord(__slots__ + intern한 옵션 틀 + 숫자 문자열) (네트워크 없이).
+
+similarity_bench와 같은 합성 아이템(옵션 4~8줄, 실제 poedb 문장 모양)을 JSON Lines로 만든 뒤, 아이템 저장소를 읽을 때처럼 줄마다 json.loads해서
+  - dict   : json.loads 결과 그대로 N개
+  - record : ItemRecord.from_dict(json.loads 결과) N개
+를 들고 있을 때 늘어난 메모리(tracemalloc, 목록만 남기고 재료는 버린 뒤)와 measured_size 합, 만들기 시간(json.loads 포함)을 잰다.
+to_dict()로 되돌린 값이 원래 dict와 같은지 확인하고, ByteBoundedCache(--cache-mb)에 각각 몇 개가 들어가는지도 보여준다.
+결과를 JSON으로 저장해서 --compare로 이전 결과와 비교할 수 있다.
+
+사용법:
+    python benchmarks/item_memory_bench.py --items 50000 --output memory_result.json
+    python benchmarks/item_memory_bench.py --items 10000 50000 --cache-mb 8 --compare 이전_결과.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from item_record import ItemRecord, ByteBoundedCache, measured_size
+from similarity_bench import synthetic_items
+
+REPRESENTATIONS = {'dict': lambda item_data: item_data, 'record': ItemRecord.from_dict}
+
+
+def store_lines(count, args):
+    with contextlib.redirect_stdout(io.StringIO()): items = synthetic_items(count - 1, args.templates, args.seed) # 고정 페이지 아이템 하나가 더 붙는다
+    for index, item_data in enumerate(items): item_data['url'] = item_data['url'] or f"https://poedb.tw/kr/Synthetic_Unique_{index}"
+    return [json.dumps(item_data, ensure_ascii=False) for item_data in items]
+
+
+def measure(lines, convert):
+    # 줄마다 새로 읽어서(문자열을 다른 표현과 같이 쓰지 않게) 목록을 만들고, 목록이 붙잡고 있는 메모리만 잰다.
+    # 시간은 tracemalloc 없이 한 번 따로 잰다 (추적 중에는 할당마다 느려짐)
+    started = time.perf_counter(); items = [convert(json.loads(line)) for line in lines]; build_seconds = time.perf_counter() - started
+    del items; gc.collect(); tracemalloc.start(); before = tracemalloc.get_traced_memory()[0]
+    items = [convert(json.loads(line)) for line in lines]
+    gc.collect(); retained = tracemalloc.get_traced_memory()[0] - before; tracemalloc.stop()
+    return items, retained, build_seconds
+
+
+def run_size(count, args):
+    lines = store_lines(count, args)
+    rows = []; measured = {}
+    for representation, convert in REPRESENTATIONS.items():
+        items, retained, build_seconds = measure(lines, convert)
+        seen = set(); measured_bytes = sum(measured_size(item_data, seen) for item_data in items) # 같이 쓰는 intern 문자열은 한 번만
+        cache = ByteBoundedCache(args.cache_mb * 1024 * 1024)
+        for index, item_data in enumerate(items): cache.put(index, item_data)
+        if representation == 'record': # 되돌린 값이 원래와 같은지 (스냅샷/GuideWorker가 받는 dict 모양)
+            started = time.perf_counter(); mismatches = sum(item_data.to_dict() != json.loads(line) for item_data, line in zip(items, lines)); to_dict_seconds = time.perf_counter() - started
+        else: mismatches = 0; to_dict_seconds = 0.0
+        rows.append({'representation': representation, 'items': count, 'retained_bytes': retained, 'measured_bytes': measured_bytes, 'build_ms': build_seconds * 1000,
+                     'to_dict_ms': to_dict_seconds * 1000, 'cache_mb': args.cache_mb, 'cache_items': len(cache), 'mismatches': mismatches})
+        measured[representation] = retained
+        print(format_row(rows[-1]), flush=True)
+        del items, cache
+    print(f"  -> {count}개: record가 dict의 {measured['record'] / measured['dict']:.2f}배 ({(measured['dict'] - measured['record']) / 1024 / 1024:,.1f}MB 절약)\n", flush=True)
+    return rows
+
+
+def case_key(row):
+    return f"{row['representation']}@{row['items']}"
+
+
+def format_row(row):
+    return (f"  {row['representation']:<8}{row['items']:>8}{row['retained_bytes'] / 1024 / 1024:>12,.1f}{row['retained_bytes'] / row['items']:>10,.0f}"
+            f"{row['measured_bytes'] / 1024 / 1024:>12,.1f}{row['build_ms']:>12,.0f}{row['to_dict_ms']:>10,.0f}{row['cache_items']:>12,}" + ("  (되돌린 값 불일치 %d개!)" % row['mismatches'] if row['mismatches'] else ""))
+
+
+def git_commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+
+def print_comparison(previous, results):
+    previous_by_key = {case_key(row): row for row in previous.get('results', [])}
+    print(f"비교: 기준 커밋 {previous.get('meta', {}).get('git_commit')} -> 현재 {git_commit()}  (들고 있는 메모리, 1보다 작으면 줄어듦)")
+    for row in results:
+        before = previous_by_key.get(case_key(row))
+        if before: print(f"  {case_key(row):<16} {before['retained_bytes'] / 1024 / 1024:,.1f} -> {row['retained_bytes'] / 1024 / 1024:,.1f}MB ({row['retained_bytes'] / before['retained_bytes']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="아이템 정보 메모리 벤치마크 (dict vs ItemRecord)")
+    parser.add_argument('--items', nargs='*', type=int, default=[50000], help="아이템 수")
+    parser.add_argument('--templates', type=int, default=3000, help="서로 다른 옵션 템플릿 수")
+    parser.add_argument('--cache-mb', type=int, default=16, help="ByteBoundedCache 한도 (MB)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+
+    print(f"  {'표현':<8}{'아이템':>8}{'메모리MB':>12}{'B/아이템':>10}{'잰MB':>12}{'만들기ms':>12}{'되돌리기ms':>10}{'캐시에 든 수':>12}")
+    results = [row for count in args.items for row in run_size(count, args)]
+    if args.output:
+        meta = {'git_commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(), 'templates': args.templates, 'seed': args.seed}
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=4)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f: print_comparison(json.load(f), results)
+    return 1 if any(row['mismatches'] for row in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# benchmarks/parser_microbench.py
+"""
+파서/매퍼 핫패스 마이크로 벤치마크 (네트워크 없이).
+
+  - parse_item_details        : 저장해 둔 poedb 아이템 페이지 HTML 파싱 (get_item_details_from_poedb의 파싱 부분)
+  - parse_current_league_info : 저장해 둔 poedb 홈페이지의 리그 카드 태그 탐색 (get_current_league_info_from_poedb의 파싱 부분)
+  - get_poedb_identifier      : 100/1k/10k/100k 항목의 합성 매핑 테이블에서 이름 찾기 (앞쪽 적중/끝쪽 적중/한글 미적중/영어 자동 변환)
+  - is_known_poedb_identifier : 같은 테이블에서 없는 식별자 확인
+
+함수마다 초당 실행 횟수(ops/s, timeit 반복 중 최고값)와 한 번 호출할 때의 메모리 할당(tracemalloc: 최고 사용량/호출 후 남은 양)을 잰다.
+--corpus 폴더를 주면 그 안의 저장된 poedb 페이지(*.html)도 함께 잰다. 홈페이지인지 아이템 페이지인지는 리그 카드 유무로 나눈다.
+결과를 JSON으로 저장해서 --compare로 이전 결과와 비교할 수 있다.
+
+사용법:
+    python benchmarks/parser_microbench.py --output micro_result.json
+    python benchmarks/parser_microbench.py --filter mapper --sizes 1000 100000
+    python benchmarks/parser_microbench.py --corpus 저장한_페이지_폴더 --compare 이전_결과.json
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_TABLE_SIZES = [100, 1000, 10000, 100000]
+
+import crawler
+import item_name_mapper
+
+
+# ---------------------------------------------------------------------
+# 입력 자료
+# ---------------------------------------------------------------------
+def load_pages(corpus_dirs):
+    """(이름, 종류('item'|'home'), HTML bytes) 목록. 고정 HTML(fixtures) + --corpus 폴더들의 *.html."""
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, "poedb_*.html")))
+    for directory in corpus_dirs: paths += sorted(glob.glob(os.path.join(directory, "**", "*.html"), recursive=True))
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f: html_content = f.read()
+        kind = 'home' if b'card mb-2' in html_content and b'Running for' in html_content else 'item'
+        pages.append((os.path.relpath(path, PROJECT_ROOT), kind, html_content))
+    return pages
+
+
+def build_mapper_table(size):
+    """
+    실제 매핑 테이블 + 합성 항목으로 size개짜리 테이블을 만든다.
+    한글/영어 이름을 반씩 섞고, 영어 키는 실제처럼 아포스트로피와 공백을 넣는다. 마지막 키는 '끝쪽 적중' 조회에 쓴다.
+    """
+    table = dict(item_name_mapper.ITEM_NAME_TO_POEDB_ID)
+    index = 0
+    while len(table) < size:
+        if index % 2: table[f"합성 유니크 {index}번 심장"] = f"Synthetic_Unique_{index}"
+        else: table[f"synthetic unique's {index} heart"] = f"Synthetic_Uniques_{index}_Heart"
+        index += 1
+    return table
+
+
+# ---------------------------------------------------------------------
+# 측정
+# ---------------------------------------------------------------------
+def measure(function, repeat):
+    """(ops/s, 호출당 최고 메모리 KB, 호출 후 남은 메모리 KB). ops/s는 timeit 자동 반복 횟수로 repeat번 재서 가장 빠른 값."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange() # 한 묶음이 0.2초 이상 걸리도록 반복 횟수를 정한다
+    best = min(timer.repeat(repeat=repeat, number=number))
+    tracemalloc.start()
+    try:
+        tracemalloc.clear_traces()
+        baseline, _ = tracemalloc.get_traced_memory(); tracemalloc.reset_peak()
+        result = function()
+        current, peak = tracemalloc.get_traced_memory() # 반환값 + 아직 GC되지 않은 순환 참조(BeautifulSoup 트리 등)가 '남은 양'에 잡힌다
+    finally:
+        tracemalloc.stop()
+    del result
+    return number / best, (peak - baseline) / 1024, (current - baseline) / 1024
+
+
+def collect_cases(args):
+    """(이름, 테이블 크기 또는 None, 호출할 함수, 준비 함수 또는 None) 목록."""
+    cases = []
+    for page_name, kind, html_content in load_pages(args.corpus):
+        label = os.path.basename(page_name)
+        if kind == 'item':
+            cases.append((f"parse_item_details[{label}]", None, lambda html_content=html_content: crawler.parse_item_details(html_content, "https://poedb.tw/kr/bench"), None))
+        else:
+            cases.append((f"parse_current_league_info[{label}]", None, lambda html_content=html_content: crawler.parse_current_league_info(html_content), None))
+    for size in args.sizes:
+        table = build_mapper_table(size)
+        use_table = lambda table=table: setattr(item_name_mapper, 'ITEM_NAME_TO_POEDB_ID', table)
+        last_key = next(reversed(table))
+        for case_name, query in (("hit_first", "카옴의 심장"), ("hit_last", last_key), ("miss_korean", "없는 아이템 이름"), ("miss_english", "Watcher's Eye")):
+            cases.append((f"mapper.get_poedb_identifier[{case_name}]", size, lambda query=query: item_name_mapper.get_poedb_identifier(query), use_table))
+        cases.append(("mapper.is_known_poedb_identifier[miss]", size, lambda: item_name_mapper.is_known_poedb_identifier("Watchers_Eye"), use_table))
+    return [case for case in cases if not args.filter or any(text in case[0] for text in args.filter)]
+
+
+def run_cases(cases, repeat):
+    original_table = item_name_mapper.ITEM_NAME_TO_POEDB_ID
+    results = []
+    try:
+        with open(os.devnull, 'w') as devnull:
+            for name, size, function, prepare in cases:
+                if prepare: prepare()
+                with contextlib.redirect_stdout(devnull): # 매퍼/파서의 진행 메시지는 버린다 (print 자체의 비용은 측정에 포함)
+                    ops_per_second, peak_kb, retained_kb = measure(function, repeat)
+                results.append({'name': name, 'table_size': size, 'ops_per_second': ops_per_second, 'us_per_op': 1e6 / ops_per_second,
+                                'peak_kb': peak_kb, 'retained_kb': retained_kb})
+                print(format_row(results[-1]), flush=True)
+    finally:
+        item_name_mapper.ITEM_NAME_TO_POEDB_ID = original_table
+    return results
+
+
+# ---------------------------------------------------------------------
+# 출력/비교
+# ---------------------------------------------------------------------
+def case_key(result):
+    return f"{result['name']}@{result['table_size']}" if result['table_size'] else result['name']
+
+
+def format_row(result):
+    return (f"  {result['name']:<50} {result['table_size'] or '':>7} {result['ops_per_second']:>12,.1f} {result['us_per_op']:>12,.1f}"
+            f" {result['peak_kb']:>10,.1f} {result['retained_kb']:>10,.1f}")
+
+
+def git_commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+
+def print_comparison(previous, results):
+    previous_by_key = {case_key(result): result for result in previous.get('results', [])}
+    print(f"비교: 기준 커밋 {previous.get('meta', {}).get('git_commit')} -> 현재 {git_commit()}  (ops/s 비율, 1보다 크면 빨라짐)")
+    for result in results:
+        before = previous_by_key.get(case_key(result))
+        if not before: continue
+        print(f"  {case_key(result):<58} {before['ops_per_second']:>12,.1f} -> {result['ops_per_second']:>12,.1f} ({result['ops_per_second'] / before['ops_per_second']:.2f}x)"
+              f", 최고 메모리 {before['peak_kb']:,.1f} -> {result['peak_kb']:,.1f}KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파서/매퍼 핫패스 마이크로 벤치마크")
+    parser.add_argument('--corpus', nargs='*', default=[], help="추가로 잴 저장된 poedb 페이지(*.html) 폴더")
+    parser.add_argument('--sizes', nargs='*', type=int, default=DEFAULT_TABLE_SIZES, help="합성 매핑 테이블 크기")
+    parser.add_argument('--filter', nargs='*', default=[], help="이름에 이 문자열이 들어간 항목만 잰다 (예: parse, mapper)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+
+    cases = collect_cases(args)
+    if not cases: print("잴 항목이 없습니다. --filter/--corpus를 확인해주세요."); return 1
+    print(f"  {'항목':<50} {'테이블':>7} {'ops/s':>12} {'us/op':>12} {'최고KB':>10} {'잔류KB':>10}")
+    results = run_cases(cases, args.repeat)
+
+    if args.output:
+        meta = {'git_commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(), 'repeat': args.repeat}
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=4)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f: print_comparison(json.load(f), results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
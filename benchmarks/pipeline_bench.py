@@ -0,0 +1,283 @@
+# benchmarks/pipeline_bench.py
+"""
+오프라인 종단간(end-to-end) 가이드 파이프라인 벤치마크.
+
+네트워크 없이 실제 GuideWorker 파이프라인을 그대로 돌린다. 로컬 HTTP 대역 서버 하나가
+  - poedb.tw 홈페이지/아이템 페이지 (benchmarks/fixtures/*.html 고정 HTML)
+  - OpenAI 호환 /v1/chat/completions (SSE 스트리밍)
+  - Gemini 호환 /v1beta/models/<모델>:streamGenerateContent (REST 전송의 JSON 배열 스트리밍)
+를 흉내 내고, 응답 지연/첫 토큰 지연/조각 수를 옵션으로 정할 수 있다.
+앱 모듈은 환경 변수(POEPLANNER_POEDB_BASE_URL, OPENAI_BASE_URL, POEPLANNER_GEMINI_API_ENDPOINT 등)로 이 서버를 가리키게 한다.
+
+요청마다 단계별 시간을 모아 p50/p95/p99를 낸다:
+  map(이름 -> poedb ID), crawl_wait(예의상 대기), crawl(네트워크), parse(HTML 파싱), prompt(프롬프트 구성),
+  llm_first_chunk(첫 조각까지), llm(응답 끝까지), render(GuideRenderer로 화면 문서에 그리기), total
+결과는 JSON으로 저장해서 커밋 사이에 --compare로 비교할 수 있다. --trace-dir을 주면 요청마다 단계별 구간을 Chrome 트레이스로도 남기고,
+--metrics-file을 주면 앱이 기록한 지표(요청 수, 캐시 적중, 단계별 히스토그램)를 Prometheus 텍스트 형식으로 남긴다.
+
+사용법:
+    python benchmarks/pipeline_bench.py --requests 40 --concurrency 4 --output pipeline_result.json
+    python benchmarks/pipeline_bench.py --llm Gemini --llm-ttft-ms 300 --llm-chunk-ms 10
+    python benchmarks/pipeline_bench.py --compare 이전_결과.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAMPLE_SNAPSHOT_PATH = os.path.join(PROJECT_ROOT, "일반가이드_위치_오컬티스트_정착자들_소프트코어_스냅샷.json")
+STAGES = ['map', 'crawl_wait', 'crawl', 'parse', 'prompt', 'llm_first_chunk', 'llm', 'render', 'total']
+PERCENTILES = [50, 95, 99]
+
+
+# ---------------------------------------------------------------------
+# 로컬 대역 서버 (poedb.tw + OpenAI + Gemini)
+# ---------------------------------------------------------------------
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # 실제 서버처럼 연결 재사용 + chunked 스트리밍
+
+    def log_message(self, format, *args): pass
+
+    def do_GET(self):
+        config = self.server.config
+        if not self.path.startswith(("/kr/", "/us/")): self._send_bytes(404, b"not found", "text/plain"); return
+        time.sleep(config['poedb_latency_ms'] / 1000)
+        page = config['home_html'] if self.path.rstrip("/") in ("/kr", "/us") else config['item_html'] # us 언어판도 같은 고정 페이지
+        self._send_bytes(200, page, "text/html; charset=utf-8")
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b"{}")
+        if self.path.startswith("/v1/chat/completions"): self._stream_openai(body)
+        elif ":streamGenerateContent" in self.path: self._stream_gemini()
+        else: self._send_bytes(404, b"{}", "application/json")
+
+    def _stream_openai(self, body):
+        model = body.get('model', 'gpt-fake')
+        def event(text, finish_reason=None):
+            return {"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text} if text else {}, "finish_reason": finish_reason}]}
+        self._stream_sse([event(text) for text in self.server.config['guide_chunks']] + [event(None, "stop")], done_marker=True)
+
+    def _stream_gemini(self):
+        chunks = self.server.config['guide_chunks']
+        events = [{"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0, **({"finishReason": "STOP"} if index == len(chunks) - 1 else {})}]}
+                  for index, text in enumerate(chunks)]
+        # google-generativeai의 REST 전송은 SSE가 아니라 JSON 배열을 조각조각 받아 파싱한다: [{...},\r\n{...}]
+        pieces = [("[" if index == 0 else ",\r\n") + json.dumps(event, ensure_ascii=False) for index, event in enumerate(events)]
+        pieces[-1] += "]"
+        self._stream_pieces(pieces, "application/json")
+
+    def _stream_sse(self, events, done_marker):
+        pieces = [f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events] + (["data: [DONE]\n\n"] if done_marker else [])
+        self._stream_pieces(pieces, "text/event-stream")
+
+    def _stream_pieces(self, pieces, content_type):
+        # 첫 조각까지 llm_ttft_ms, 이후 조각마다 llm_chunk_ms 간격으로 흘려보낸다
+        config = self.server.config
+        self.send_response(200); self.send_header("Content-Type", content_type); self.send_header("Transfer-Encoding", "chunked"); self.end_headers()
+        time.sleep(config['llm_ttft_ms'] / 1000)
+        for index, piece in enumerate(pieces):
+            if index: time.sleep(config['llm_chunk_ms'] / 1000)
+            self._write_chunk(piece.encode('utf-8'))
+        self.wfile.write(b"0\r\n\r\n"); self.wfile.flush()
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n"); self.wfile.flush()
+
+    def _send_bytes(self, status, data, content_type):
+        self.send_response(status); self.send_header("Content-Type", content_type); self.send_header("Content-Length", str(len(data))); self.end_headers()
+        self.wfile.write(data)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)): return # 측정이 끝나며 끊긴 keep-alive 연결 / 클라이언트가 닫은 스트림
+        super().handle_error(request, client_address)
+
+
+def start_stand_in_server(config):
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    server.config = config
+    threading.Thread(target=server.serve_forever, name="stand-in-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def split_text(text, chunk_count):
+    size = max(1, -(-len(text) // chunk_count))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+# ---------------------------------------------------------------------
+# 측정
+# ---------------------------------------------------------------------
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered: return None
+    position = (len(ordered) - 1) * pct / 100; lower = int(position); upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    summary = {}
+    for stage in STAGES:
+        values = [sample['stages_ms'][stage] for sample in samples if stage in sample['stages_ms']]
+        if not values: continue
+        summary[stage] = {'count': len(values), 'mean': sum(values) / len(values), 'max': max(values), **{f"p{pct}": percentile(values, pct) for pct in PERCENTILES}}
+    return summary
+
+
+def run_job(index, args, item_names):
+    from PyQt5.QtCore import Qt
+    from app_planner import GuideWorker
+    item_query = item_names[index % len(item_names)] if item_names else ""
+    worker = GuideWorker(item_query, args.llm, "위치", "오컬티스트", "소프트코어", "정착자들", "gpt-bench", "models/gemini-bench", "")
+    outcome = {'index': index, 'item_query': item_query, 'trace': worker.trace}
+    worker.finished.connect(lambda status, result: outcome.update(status=status, result=result), Qt.DirectConnection) # 이벤트 루프 없이 이 스레드에서 바로 받음
+    started = time.perf_counter(); worker.run(); outcome['worker_seconds'] = time.perf_counter() - started
+    return outcome
+
+
+def render_guide(guide_text, trace=None):
+    # 실제 앱처럼 QTextBrowser + GuideRenderer에 그린다. 새 가이드는 캐시에 없으므로 매번 빈 렌더 캐시를 쓴다.
+    from PyQt5.QtWidgets import QTextBrowser
+    from guide_renderer import GuideRenderer
+    from render_cache import RenderCache
+    browser = QTextBrowser(); renderer = GuideRenderer(browser, render_cache=RenderCache()); renderer.set_trace(trace)
+    started = time.perf_counter()
+    renderer.show("### 벤치마크 가이드\n", guide_text); renderer.flush_all()
+    return time.perf_counter() - started
+
+
+def run_benchmark(args):
+    guide_text = args.guide_text
+    config = {'poedb_latency_ms': args.poedb_latency_ms, 'llm_ttft_ms': args.llm_ttft_ms, 'llm_chunk_ms': args.llm_chunk_ms,
+              'guide_chunks': split_text(guide_text, args.llm_chunks),
+              'item_html': open(os.path.join(FIXTURES_DIR, "poedb_item.html"), 'rb').read(),
+              'home_html': open(os.path.join(FIXTURES_DIR, "poedb_home.html"), 'rb').read()}
+    server, base_url = start_stand_in_server(config)
+    keys_file = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8')
+    keys_file.write("[OPENAI]\nAPI_KEY = bench-openai-key\n\n[GEMINI]\nAPI_KEY = bench-gemini-key\n"); keys_file.close()
+    # 앱 모듈은 임포트할 때 환경 변수를 읽으므로, 임포트 전에 대역 서버를 가리키게 한다.
+    os.environ.update({'POEPLANNER_POEDB_BASE_URL': f"{base_url}/kr/", 'POEPLANNER_POEDB_REQUEST_DELAY': str(args.crawl_delay),
+                       'OPENAI_BASE_URL': f"{base_url}/v1", 'POEPLANNER_GEMINI_API_ENDPOINT': base_url, 'POEPLANNER_API_KEYS_FILE': keys_file.name})
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    sys.path.insert(0, SRC_DIR)
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    import app_planner # GuideWorker + 무거운 모듈(crawler, LLM SDK)을 측정 전에 미리 임포트
+    import crawler, openai, google.generativeai
+    if args.trace_dir:
+        from tracing import configure_tracing
+        configure_tracing(True, args.trace_dir) # 요청마다 Chrome 트레이스 파일 저장
+    from item_name_mapper import ITEM_NAME_TO_POEDB_ID
+    item_names = [] if args.no_item else list(ITEM_NAME_TO_POEDB_ID.keys())
+
+    samples = []; errors = []
+    quiet_output = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(quiet_output if not args.verbose else sys.stdout):
+            for warmup_index in range(args.warmup): run_job(warmup_index, args, item_names) # 커넥션/임포트 데우기 (집계 제외)
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                futures = [executor.submit(run_job, index, args, item_names) for index in range(args.requests)]
+                for future in as_completed(futures): # 렌더링은 GUI 스레드(이 스레드)에서 끝난 순서대로
+                    outcome = future.result()
+                    if outcome.get('status') != "success": outcome['trace'].finish(outcome.get('status')); errors.append({'index': outcome['index'], 'status': outcome.get('status'), 'message': str(outcome.get('result'))[:300]}); continue
+                    result = outcome['result']
+                    stages_ms = {stage: seconds * 1000 for stage, seconds in result.get('timings', {}).items()}
+                    stages_ms['render'] = render_guide(result['guide'], outcome['trace']) * 1000; outcome['trace'].finish("success")
+                    stages_ms['total'] = outcome['worker_seconds'] * 1000 + stages_ms['render']
+                    samples.append({'index': outcome['index'], 'item_query': outcome['item_query'], 'guide_chars': len(result['guide']), 'stages_ms': stages_ms})
+    finally:
+        wall_seconds = time.perf_counter() - started
+        server.shutdown(); os.remove(keys_file.name)
+    return {'meta': collect_meta(args), 'wall_seconds': wall_seconds, 'throughput_rps': len(samples) / wall_seconds if wall_seconds else 0,
+            'errors': errors, 'summary': summarize(samples), 'samples': sorted(samples, key=lambda sample: sample['index'])}
+
+
+def collect_meta(args):
+    try: commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): commit = None
+    options = {key: value for key, value in vars(args).items() if key not in ('guide_text', 'output', 'compare', 'verbose')}
+    return {'commit': commit, 'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'options': options}
+
+
+# ---------------------------------------------------------------------
+# 출력
+# ---------------------------------------------------------------------
+def print_summary(results):
+    options = results['meta']['options']
+    print(f"파이프라인 벤치마크: {options['llm']}, 요청 {options['requests']}개, 동시 {options['concurrency']}개 "
+          f"(커밋 {results['meta']['commit'] or '?'}) -> {results['wall_seconds']:.2f}초, {results['throughput_rps']:.2f}건/초, 오류 {len(results['errors'])}건")
+    print(f"  {'단계':<16}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for stage, values in results['summary'].items():
+        print(f"  {stage:<16}" + "".join(f"{values[key]:>10.1f}" for key in ('p50', 'p95', 'p99', 'max')))
+    for error in results['errors'][:5]: print(f"  오류 #{error['index']} ({error['status']}): {error['message']}")
+
+
+def print_comparison(baseline, results):
+    print(f"\n비교: 기준 커밋 {baseline['meta'].get('commit') or '?'} -> 현재 {results['meta'].get('commit') or '?'}")
+    for stage, values in results['summary'].items():
+        old = baseline.get('summary', {}).get(stage)
+        if not old: continue
+        changes = []
+        for key in ('p50', 'p95', 'p99'):
+            change = (values[key] - old[key]) / old[key] * 100 if old[key] else 0
+            changes.append(f"{key} {old[key]:.1f} -> {values[key]:.1f} ({change:+.0f}%)")
+        print(f"  {stage:<16}" + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 종단간 가이드 파이프라인 벤치마크")
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--llm', choices=['ChatGPT', 'Gemini'], default='ChatGPT')
+    parser.add_argument('--no-item', action='store_true', help="아이템 없이 일반 가이드만 요청 (map/crawl/parse 생략)")
+    parser.add_argument('--poedb-latency-ms', type=float, default=80)
+    parser.add_argument('--crawl-delay', type=float, default=0.0, help="poedb 요청 전 예의상 대기(초). 실제 앱 기본값은 1.5")
+    parser.add_argument('--llm-ttft-ms', type=float, default=400, help="LLM 첫 조각까지 지연")
+    parser.add_argument('--llm-chunk-ms', type=float, default=15, help="LLM 조각 사이 간격")
+    parser.add_argument('--llm-chunks', type=int, default=120)
+    parser.add_argument('--guide-file', help="LLM 대역이 돌려줄 가이드 마크다운 (기본: 프로젝트 루트 예시 스냅샷의 가이드)")
+    parser.add_argument('--output', help="결과 JSON 경로")
+    parser.add_argument('--compare', help="비교할 이전 결과 JSON")
+    parser.add_argument('--trace-dir', help="요청마다 Chrome 트레이스 JSON을 저장할 폴더 (config.ini [TRACING]과 같은 형식)")
+    parser.add_argument('--metrics-file', help="실행이 끝난 뒤 앱 지표(config.ini [METRICS] DUMP_FILE과 같은 Prometheus 텍스트 형식)를 쓸 경로")
+    parser.add_argument('--verbose', action='store_true', help="앱 모듈의 출력 메시지도 보여주기")
+    args = parser.parse_args()
+
+    if args.guide_file:
+        with open(args.guide_file, 'r', encoding='utf-8') as f: args.guide_text = f.read()
+    else:
+        with open(SAMPLE_SNAPSHOT_PATH, 'r', encoding='utf-8') as f: args.guide_text = json.load(f)['generated_guide_text_markdown']
+
+    results = run_benchmark(args)
+    print_summary(results)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f: print_comparison(json.load(f), results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    if args.metrics_file:
+        from metrics import write_metrics_file
+        write_metrics_file(args.metrics_file); print(f"지표 저장: {args.metrics_file}")
+    sys.stdout.flush(); os._exit(1 if results['errors'] else 0) # SDK/Qt 백그라운드 스레드를 기다리지 않고 종료
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/similarity_bench.py
+"""
+'옵션이 비슷한 아이템' 검색(mod_stats.ModStatIndex)과 옵션 조건 검색(mod_search.ModSearchIndex) 벤치마크 (네트워크 없이).
+
+실제 poedb 옵션 문장 모양을 흉내 낸 합성 아이템 저장소(아이템 N개, 옵션 템플릿 수천 개, 아이템당 옵션 4~8줄)를 만들고
+  - build : 옵션 정규화 + 아이템 x 템플릿 행렬(또는 희소 벡터) 만들기
+  - query : 저장소 안의 아이템 이름으로 비슷한 아이템 top 10 (--queries번 재서 중앙값/최댓값)
+  - query_weighted : 템플릿 3개에 가중치를 준 조회 (가중 열만큼 노름을 보정하는 경로)
+을 NumPy 백엔드와 순수 파이썬 백엔드 각각으로 잰다 (NumPy가 없으면 파이썬만). 고정 아이템 페이지(fixtures)의 카옴의 심장도 저장소에 넣는다.
+같은 저장소로 옵션 조건 검색(역색인)의 만들기 시간과 FILTER_QUERIES 검색어별 조회 시간(중앙값/최댓값, 결과 100개까지 만들기 포함)도 잰다.
+결과를 JSON으로 저장해서 --compare로 이전 결과와 비교할 수 있다.
+
+사용법:
+    python benchmarks/similarity_bench.py --items 1000 5000 --output similarity_result.json
+    python benchmarks/similarity_bench.py --items 20000 --templates 5000 --compare 이전_결과.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+import crawler
+import mod_stats
+import mod_search
+
+_STATS = ["최대 생명력", "최대 마나", "최대 에너지 보호막", "화염 저항", "냉기 저항", "번개 저항", "카오스 저항", "공격 속도", "시전 속도", "치명타 확률",
+          "치명타 피해 배율", "이동 속도", "회피", "방어도", "주문 피해", "물리 피해", "원소 피해", "화염 피해", "냉기 피해", "번개 피해",
+          "생명력 재생", "마나 재생", "마나 예약 효율", "범위 효과", "투사체 속도", "광역 피해", "소환수 피해", "지속 피해", "출혈 확률", "중독 확률"]
+_FORMS = ["+({low}–{high}) {stat}", "{stat} ({low}–{high})% 증가", "{stat} +({low}–{high})%", "{stat} {low}% 감소", "{condition} {stat} ({low}–{high})% 증가"]
+FILTER_QUERIES = ["최대 에너지 보호막 >= 50 & 카오스 저항", "최대 생명력 & 화염 저항 +#% >= 30 & 냉기 저항", "카오스 저항 | 번개 저항 <= 10", "저항", "저항 & 피해 & 속도"]
+_CONDITIONS = ["최근 4초 동안 적을 처치했다면", "격노 충전 하나당", "저주받은 적에게", "최대 생명력일 때", "방패를 들고 있으면", "마법 부여 중에", "광란 충전 하나당", "이동 중에"]
+
+
+def template_pool(count, rng):
+    """서로 다른 옵션 문장 틀 count개 (숫자 자리는 {low}/{high})."""
+    pool = set()
+    while len(pool) < count:
+        form = rng.choice(_FORMS)
+        stat = rng.choice(_STATS) if len(pool) < len(_STATS) * 3 else f"{rng.choice(_STATS)} 및 {rng.choice(_STATS)}" # 숫자를 넣으면 정규화에서 합쳐지므로 글자 조합으로
+        pool.add(form.replace("{stat}", stat).replace("{condition}", rng.choice(_CONDITIONS)))
+    return sorted(pool)
+
+
+def synthetic_items(count, template_count, seed):
+    rng = random.Random(seed)
+    pool = template_pool(template_count, rng)
+    popular = pool[:max(1, template_count // 20)] # 일부 옵션(생명력, 저항 등)은 실제처럼 훨씬 자주 나온다
+    items = []
+    for index in range(count):
+        mods = []
+        for _ in range(rng.randint(4, 8)):
+            form = rng.choice(popular) if rng.random() < 0.5 else rng.choice(pool)
+            low = rng.randint(1, 80); mods.append(form.format(low=low, high=low + rng.randint(1, 40)))
+        items.append({'name': f"합성 고유 아이템 {index}", 'type': rng.choice(["판금 갑옷", "반지", "목걸이", "투구", "장갑", "장화"]), 'mods': mods, 'url': None})
+    with open(os.path.join(FIXTURES_DIR, "poedb_item.html"), 'rb') as f:
+        items.append(crawler.parse_item_details(f.read(), "https://poedb.tw/kr/Kaoms_Heart"))
+    return items
+
+
+def time_queries(index, names, weights):
+    durations = []
+    for name in names:
+        started = time.perf_counter(); index.similar(name, top_n=10, weights=weights); durations.append(time.perf_counter() - started)
+    return statistics.median(durations) * 1000, max(durations) * 1000
+
+
+def run_size(item_count, args):
+    items = synthetic_items(item_count, args.templates, args.seed)
+    rng = random.Random(args.seed + 1)
+    names = [item['name'] for item in rng.sample(items, min(args.queries, len(items)))]
+    backends = [True, False] if mod_stats.numpy is not None else [False]
+    rows = []
+    for use_numpy in backends:
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter(); index = mod_stats.ModStatIndex(items, use_numpy=use_numpy); build_ms = (time.perf_counter() - started) * 1000
+        weights = {template: 3.0 for template in index.templates[:3]}
+        query_median, query_max = time_queries(index, names, None)
+        weighted_median, weighted_max = time_queries(index, names, weights)
+        rows.append({'backend': index.backend, 'items': len(index), 'templates': len(index.templates), 'build_ms': build_ms,
+                     'query_median_ms': query_median, 'query_max_ms': query_max, 'weighted_median_ms': weighted_median, 'weighted_max_ms': weighted_max})
+        print(format_row(rows[-1]), flush=True)
+    return rows
+
+
+def run_filter_size(item_count, args):
+    items = synthetic_items(item_count, args.templates, args.seed)
+    started = time.perf_counter(); index = mod_search.ModSearchIndex(items); build_ms = (time.perf_counter() - started) * 1000
+    rows = []
+    for query in FILTER_QUERIES:
+        durations = []
+        for _ in range(args.filter_repeat):
+            results, total, elapsed_ms = index.search_text(query, limit=100); durations.append(elapsed_ms)
+        rows.append({'query': query, 'items': len(index), 'build_ms': build_ms, 'matches': total, 'median_ms': statistics.median(durations), 'max_ms': max(durations)})
+        print(f"  {item_count:>8}{build_ms:>12,.1f}{total:>8}{rows[-1]['median_ms']:>12.3f}{rows[-1]['max_ms']:>10.3f}  {query}", flush=True)
+    return rows
+
+
+def case_key(row):
+    return f"{row['backend']}@{row['items']}"
+
+
+def format_row(row):
+    return (f"  {row['backend']:<8}{row['items']:>8}{row['templates']:>8}{row['build_ms']:>12,.1f}"
+            f"{row['query_median_ms']:>12.3f}{row['query_max_ms']:>10.3f}{row['weighted_median_ms']:>12.3f}{row['weighted_max_ms']:>10.3f}")
+
+
+def git_commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+
+def print_comparison(previous, results, filter_results):
+    previous_by_key = {case_key(row): row for row in previous.get('results', [])}
+    print(f"비교: 기준 커밋 {previous.get('meta', {}).get('git_commit')} -> 현재 {git_commit()}  (조회 중앙값 ms, 1보다 작으면 빨라짐)")
+    for row in results:
+        before = previous_by_key.get(case_key(row))
+        if not before: continue
+        print(f"  {case_key(row):<16} 조회 {before['query_median_ms']:.3f} -> {row['query_median_ms']:.3f}ms ({row['query_median_ms'] / before['query_median_ms']:.2f}x)"
+              f", 만들기 {before['build_ms']:,.1f} -> {row['build_ms']:,.1f}ms")
+    previous_filters = {f"{row['query']}@{row['items']}": row for row in previous.get('filter_results', [])}
+    for row in filter_results:
+        before = previous_filters.get(f"{row['query']}@{row['items']}")
+        if before: print(f"  조건 검색 @{row['items']:<8} {before['median_ms']:.3f} -> {row['median_ms']:.3f}ms ({row['median_ms'] / before['median_ms']:.2f}x)  {row['query']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비슷한 아이템 검색(ModStatIndex) 벤치마크")
+    parser.add_argument('--items', nargs='*', type=int, default=[1000, 5000], help="합성 저장소 아이템 수")
+    parser.add_argument('--templates', type=int, default=3000, help="서로 다른 옵션 템플릿 수")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--filter-repeat', type=int, default=20, help="조건 검색어마다 반복 횟수")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+
+    print(f"  {'백엔드':<8}{'아이템':>8}{'템플릿':>8}{'만들기ms':>12}{'조회ms(중앙)':>12}{'최대':>10}{'가중ms(중앙)':>12}{'최대':>10}")
+    results = [row for item_count in args.items for row in run_size(item_count, args)]
+    print(f"\n  {'아이템':>8}{'만들기ms':>12}{'일치':>8}{'조회ms(중앙)':>12}{'최대':>10}  조건 검색어")
+    filter_results = [row for item_count in args.items for row in run_filter_size(item_count, args)]
+
+    if args.output:
+        meta = {'git_commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+                'numpy': getattr(mod_stats.numpy, '__version__', None), 'templates': args.templates, 'queries': args.queries, 'seed': args.seed}
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump({'meta': meta, 'results': results, 'filter_results': filter_results}, f, ensure_ascii=False, indent=4)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f: print_comparison(json.load(f), results, filter_results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
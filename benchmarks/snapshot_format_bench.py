@@ -0,0 +1,109 @@
+# benchmarks/snapshot_format_bench.py
+"""
+스냅샷 저장 형식 비교 벤치마크: 1.3 JSON vs 2.0 압축(.poesnap) vs 2.1 압축 + blob 저장소(중복 제거).
+
+지정한 폴더(기본: 프로젝트 루트)의 기존 스냅샷들을 임시 폴더에 세 형식으로 각각 다시 저장한 뒤
+  - 디스크 크기 합계 (2.1은 스냅샷 파일 + blob 파일 + refs.db)
+  - 전체 불러오기(read_snapshot) 시간
+  - 헤더만 읽기(read_snapshot_header, 목록/검색 화면용) 시간
+을 비교한다. --convert-to 를 주면 변환된 .poesnap 파일을 그 폴더에 남긴다.
+
+사용법:
+    python benchmarks/snapshot_format_bench.py [스냅샷_폴더 ...] [--repeat 5] [--output 결과.json] [--convert-to 폴더]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from blob_store import BlobStore
+from snapshot_io import read_snapshot, read_snapshot_header, write_snapshot, SnapshotFormatError, SNAPSHOT_FILE_EXTENSIONS, COMPACT_SNAPSHOT_EXTENSION
+
+
+def collect_snapshots(directories):
+    snapshots = []
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [name for name in dirs if not name.startswith('.') and name not in ('benchmarks', 'src', '__pycache__')]
+            for name in sorted(files):
+                if not name.lower().endswith(SNAPSHOT_FILE_EXTENSIONS): continue
+                path = os.path.join(root, name)
+                try: snapshots.append((name, read_snapshot(path)))
+                except (OSError, SnapshotFormatError): pass # 스냅샷이 아닌 JSON 파일 등은 건너뜀
+    return snapshots
+
+
+def time_reads(paths, reader, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path in paths: reader(path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스냅샷 형식 크기/불러오기 시간 비교")
+    parser.add_argument('directories', nargs='*', default=[PROJECT_ROOT])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output')
+    parser.add_argument('--convert-to')
+    args = parser.parse_args()
+
+    snapshots = collect_snapshots(args.directories)
+    if not snapshots: print("비교할 스냅샷 파일을 찾지 못했습니다."); return 1
+
+    work_dir = tempfile.mkdtemp(prefix="poesnap_bench_")
+    try:
+        blob_store = BlobStore(os.path.join(work_dir, 'blobs'))
+        write_ms = {}; written_paths = {}
+        for label, extension, write_kwargs in (('json', ".json", {'compact': False}), ('compact', COMPACT_SNAPSHOT_EXTENSION, {'compact': True}), ('dedup', "_dedup" + COMPACT_SNAPSHOT_EXTENSION, {'blob_store': blob_store})):
+            paths = [os.path.join(work_dir, f"{index:06d}{extension}") for index in range(len(snapshots))]
+            started = time.perf_counter()
+            for path, (_, snapshot_data) in zip(paths, snapshots): write_snapshot(path, snapshot_data, **write_kwargs)
+            write_ms[label] = (time.perf_counter() - started) * 1000; written_paths[label] = paths
+        json_paths, compact_paths, dedup_paths = written_paths['json'], written_paths['compact'], written_paths['dedup']
+        if args.convert_to:
+            os.makedirs(args.convert_to, exist_ok=True)
+            for path, (name, _) in zip(compact_paths, snapshots): shutil.copy2(path, os.path.join(args.convert_to, os.path.splitext(name)[0] + COMPACT_SNAPSHOT_EXTENSION))
+
+        blob_stats = blob_store.stats()
+        results = {
+            'snapshots': len(snapshots),
+            'json_bytes': sum(os.path.getsize(path) for path in json_paths),
+            'compact_bytes': sum(os.path.getsize(path) for path in compact_paths),
+            'json_load_ms': time_reads(json_paths, read_snapshot, args.repeat),
+            'compact_load_ms': time_reads(compact_paths, read_snapshot, args.repeat),
+            'json_header_ms': time_reads(json_paths, read_snapshot_header, args.repeat),
+            'compact_header_ms': time_reads(compact_paths, read_snapshot_header, args.repeat),
+            'dedup_bytes': sum(os.path.getsize(path) for path in dedup_paths) + blob_stats['stored_bytes'] + os.path.getsize(os.path.join(work_dir, 'blobs', 'refs.db')),
+            'dedup_blob_bytes_written': blob_store.bytes_written,
+            'dedup_blobs': blob_stats['blobs'], 'dedup_references': blob_stats['references'],
+            'json_write_ms': write_ms['json'], 'compact_write_ms': write_ms['compact'], 'dedup_write_ms': write_ms['dedup'],
+            'dedup_load_ms': time_reads(dedup_paths, lambda path: read_snapshot(path, blob_store), args.repeat),
+            'dedup_header_ms': time_reads(dedup_paths, read_snapshot_header, args.repeat),
+        }
+        blob_store.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"스냅샷 {results['snapshots']}개")
+    print(f"  크기        : JSON {results['json_bytes'] / 1024:.1f}KB -> 압축 {results['compact_bytes'] / 1024:.1f}KB ({results['compact_bytes'] / results['json_bytes']:.0%})"
+          f" -> 중복 제거 {results['dedup_bytes'] / 1024:.1f}KB ({results['dedup_bytes'] / results['json_bytes']:.0%}, blob {results['dedup_blobs']}개 / 참조 {results['dedup_references']}개)")
+    print(f"  전체 불러오기: JSON {results['json_load_ms']:.1f}ms -> 압축 {results['compact_load_ms']:.1f}ms -> 중복 제거 {results['dedup_load_ms']:.1f}ms")
+    print(f"  헤더만 읽기  : JSON {results['json_header_ms']:.1f}ms -> 압축 {results['compact_header_ms']:.1f}ms -> 중복 제거 {results['dedup_header_ms']:.1f}ms")
+    print(f"  저장        : JSON {results['json_write_ms']:.1f}ms -> 압축 {results['compact_write_ms']:.1f}ms -> 중복 제거 {results['dedup_write_ms']:.1f}ms (blob 쓰기 {results['dedup_blob_bytes_written'] / 1024:.1f}KB)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(results, f, ensure_ascii=False, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
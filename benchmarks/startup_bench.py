@@ -0,0 +1,116 @@
+# benchmarks/startup_bench.py
+"""
+콜드 스타트 벤치마크 (임포트 시간 + 첫 화면 그리기까지 걸린 시간).
+
+매 회차마다 새 파이썬 프로세스를 띄워서
+  - import_ms      : app_planner 모듈 임포트 시간
+  - window_ms      : PoEPlannerApp 생성(initUI 포함)까지 걸린 시간 (임포트 이후)
+  - first_paint_ms : 프로세스 시작 시점부터 첫 Paint 이벤트까지 걸린 시간
+을 재고, 중앙값을 기준값(startup_baseline.json)과 비교한다.
+기준값 * 허용 배수를 넘거나, 창 생성 시점에 무거운 모듈(LLM SDK, requests, bs4 등)이 이미 임포트되어 있으면
+종료 코드 1로 실패한다. (CI 또는 빌드 전에 돌려서 시작 속도 회귀를 막는 용도)
+
+사용법:
+    python benchmarks/startup_bench.py                  # 5회 측정 후 기준값과 비교
+    python benchmarks/startup_bench.py --runs 10
+    python benchmarks/startup_bench.py --update-baseline # 현재 측정값을 새 기준값으로 저장
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+# 창이 만들어지는 시점까지 임포트되면 안 되는 모듈들 (app_planner가 백그라운드에서 데우거나 첫 사용 때 임포트함)
+HEAVY_MODULES = ['openai', 'google.generativeai', 'requests', 'bs4', 'lxml.etree', 'PyQt5.QtPrintSupport', 'crawler']
+METRICS = ['import_ms', 'window_ms', 'first_paint_ms']
+
+
+def run_child(process_start_time):
+    """자식 프로세스: 실제 앱을 띄우고 첫 Paint 이벤트에서 측정값을 출력한 뒤 바로 종료."""
+    sys.path.insert(0, SRC_DIR)
+    import_started = time.perf_counter()
+    import app_planner
+    import_ms = (time.perf_counter() - import_started) * 1000
+
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from PyQt5.QtCore import QObject, QEvent
+    # API 키가 없을 때 뜨는 경고창 등 모달 대화상자가 측정을 막지 않도록 바로 반환하게 한다.
+    for dialog_name in ('warning', 'information', 'critical'): setattr(QMessageBox, dialog_name, staticmethod(lambda *args, **kwargs: None))
+
+    result = {'import_ms': import_ms}
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and 'first_paint_ms' not in result:
+                result['first_paint_ms'] = (time.time() - process_start_time) * 1000
+                print(json.dumps(result)); sys.stdout.flush()
+                os._exit(0) # 백그라운드 스레드(리그 정보, 모듈 데우기)를 기다리지 않고 즉시 종료
+            return False
+
+    app = QApplication(sys.argv)
+    paint_filter = FirstPaintFilter(); app.installEventFilter(paint_filter)
+    window_started = time.perf_counter()
+    window = app_planner.PoEPlannerApp()
+    result['window_ms'] = (time.perf_counter() - window_started) * 1000
+    result['heavy_modules_loaded'] = [name for name in HEAVY_MODULES if name in sys.modules]
+    app.exec_()
+
+
+def measure_once(python_executable):
+    env = dict(os.environ); env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    process_start_time = time.time()
+    completed = subprocess.run([python_executable, os.path.abspath(__file__), '--child', repr(process_start_time)],
+                               cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, encoding='utf-8', timeout=120)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith('{'): return json.loads(line)
+    raise RuntimeError(f"자식 프로세스 측정 실패 (exit {completed.returncode}):\n{completed.stdout}\n{completed.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PoE Planner 콜드 스타트 벤치마크")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=1.5, help="기준값 대비 허용 배수 (기본 1.5배)")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', help="측정 결과를 JSON으로 저장할 경로")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(float(args.child)); return 0
+
+    samples = [measure_once(sys.executable) for _ in range(args.runs)]
+    summary = {metric: statistics.median(sample[metric] for sample in samples) for metric in METRICS}
+    heavy_modules_loaded = sorted({name for sample in samples for name in sample.get('heavy_modules_loaded', [])})
+    print(f"콜드 스타트 ({args.runs}회 중앙값): " + ", ".join(f"{metric}={summary[metric]:.1f}" for metric in METRICS))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump({'summary': summary, 'samples': samples}, f, ensure_ascii=False, indent=4)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f: json.dump({metric: round(summary[metric], 1) for metric in METRICS}, f, indent=4)
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    failures = []
+    if heavy_modules_loaded: failures.append(f"창 생성 시점에 무거운 모듈이 임포트됨: {', '.join(heavy_modules_loaded)}")
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f: baseline = json.load(f)
+        for metric in METRICS:
+            if metric in baseline and summary[metric] > baseline[metric] * args.tolerance:
+                failures.append(f"{metric}: {summary[metric]:.1f}ms > 기준 {baseline[metric]}ms x {args.tolerance}")
+    else:
+        print(f"알림: 기준값 파일({args.baseline})이 없어 시간 비교는 건너뜁니다. --update-baseline 으로 만들 수 있습니다.")
+
+    if failures:
+        print("시작 속도 회귀 감지!\n- " + "\n- ".join(failures)); return 1
+    print("시작 속도 기준 통과."); return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
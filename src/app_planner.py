@@ -1,16 +1,18 @@
 # src/app_planner.py
 import sys
 import os
-import json 
 from datetime import datetime
-import configparser 
 import shutil 
+import threading
+import multiprocessing
+import importlib
+import time
 
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QTextBrowser, QMessageBox,
-                             QComboBox, QFileDialog, QDialog, QDialogButtonBox, QTextEdit)
-from PyQt5.QtCore import Qt, QCoreApplication, QObject, QThread, pyqtSignal
-from PyQt5.QtPrintSupport import QPrinter
+                             QComboBox, QFileDialog, QDialog, QDialogButtonBox, QTextEdit,
+                             QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView, QProgressDialog, QTabWidget)
+from PyQt5.QtCore import Qt, QCoreApplication, QObject, QThread, QTimer, pyqtSignal
 
 # --- utils.py에서 resource_path 함수 가져오기 ---
 try:
@@ -21,10 +23,21 @@ except ImportError as e:
         return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", relative_path_from_project_root))
 
 # --- 다른 우리 모듈에서 함수 가져오기 ---
+# crawler(requests/bs4/lxml)와 LLM SDK(openai, google.generativeai)는 무거우므로 여기서 임포트하지 않는다.
+# 실제로 쓰는 곳(GuideWorker.run, LeagueInfoWorker.run)에서 임포트하고, 창이 뜬 뒤 백그라운드 스레드에서 미리 데워둔다.
 try:
     from guide import generate_guide_with_chatgpt, generate_guide_with_gemini, load_api_key
     from item_name_mapper import get_poedb_identifier
-    from crawler import get_item_details_from_poedb, get_current_league_info_from_poedb 
+    from cancellation import CancelToken
+    from prefetch import ItemPrefetcher
+    from settings_store import get_settings_file
+    from popularity import PopularityLog, CacheWarmer
+    from league_version import get_league_version_tracker
+    from guide_client import GuideServerClient, GuideServerError
+    from guide_renderer import GuideRenderer
+    from tracing import configure_tracing, start_request_trace, use_trace, NULL_TRACE
+    from metrics import GUIDE_REQUESTS, STAGE_SECONDS, observe_stage_timings, configure_metrics_exporters, shutdown_metrics_exporters
+    from snapshot_io import SNAPSHOT_VERSION, COMPACT_SNAPSHOT_EXTENSION, SNAPSHOT_FILE_EXTENSIONS, SnapshotFormatError, read_snapshot_stages, snapshot_markdown_parts, write_snapshot, export_standalone_snapshot
 except ImportError as e:
     print(f"필수 모듈 임포트 실패! 프로그램 실행 불가: {e}")
     # QApplication 생성 전이므로 QMessageBox 사용 불가, 터미널에만 출력 후 종료
@@ -37,6 +50,12 @@ except ImportError as e:
 CONFIG_FILE_PATH = resource_path('config.ini')
 API_KEYS_FILE_PATH = resource_path('api_keys.txt') 
 
+# 창이 뜬 직후 백그라운드에서 미리 임포트해 둘 무거운 모듈들 (첫 가이드 생성 때 임포트 대기 시간 제거)
+BACKGROUND_WARM_MODULES = ['crawler', 'bs4', 'lxml.etree', 'openai', 'google.generativeai', 'mod_stats']
+
+# 앱을 켜 둔 채 패치 날을 넘길 수 있으므로 리그 정보를 주기적으로 다시 확인한다 (버전이 바뀌면 아이템 캐시를 비우고 다시 데움)
+LEAGUE_INFO_RECHECK_INTERVAL_MS = 60 * 60 * 1000
+
 # ---------------------------------------------------------------------
 # 설정 다이얼로그 클래스 정의
 # ---------------------------------------------------------------------
@@ -45,11 +64,8 @@ class SettingsDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("LLM 모델 설정")
         self.setMinimumWidth(450)
-        self.config = configparser.ConfigParser()
-        if os.path.exists(CONFIG_FILE_PATH):
-            self.config.read(CONFIG_FILE_PATH, encoding='utf-8')
-        else: 
-            if 'LLM_MODELS' not in self.config: self.config.add_section('LLM_MODELS')
+        self.config = get_settings_file(CONFIG_FILE_PATH).editable_copy() # 앱이 이미 읽어 둔 config.ini의 복사본 (디스크를 다시 읽지 않음)
+        if 'LLM_MODELS' not in self.config: self.config.add_section('LLM_MODELS')
         
         layout = QVBoxLayout(self)
         chatgpt_hbox = QHBoxLayout(); lbl_chatgpt = QLabel("ChatGPT 모델 ID:"); self.edit_chatgpt_model = QLineEdit()
@@ -76,34 +92,398 @@ class SettingsDialog(QDialog):
         self.config['LLM_MODELS']['CHATGPT_MODEL'] = chatgpt_model_input
         self.config['LLM_MODELS']['GEMINI_MODEL'] = gemini_model_input
         try:
-            with open(CONFIG_FILE_PATH, 'w', encoding='utf-8') as configfile: self.config.write(configfile)
+            get_settings_file(CONFIG_FILE_PATH).write(self.config) # 임시 파일에 쓰고 바꿔치기: 가이드 일꾼/서버가 반쯤 쓴 파일을 읽지 않음
             if self.parent() and hasattr(self.parent(), 'settings_updated_actions'): self.parent().settings_updated_actions()
             QMessageBox.information(self, "저장 완료", f"설정이 {CONFIG_FILE_PATH}에 저장되었습니다.")
             super().accept() 
         except Exception as e: QMessageBox.critical(self, "저장 오류", f"설정 저장 중 오류 발생:\n{e}")
 
+# ---------------------------------------------------------------------
+# 스냅샷 라이브러리 다이얼로그 (색인된 스냅샷 목록을 필터링해서 고르고 열기)
+# ---------------------------------------------------------------------
+class SnapshotLibraryDialog(QDialog):
+    COLUMNS = [("timestamp", "저장 시각"), ("item_name", "아이템"), ("base_class", "클래스"), ("ascendancy_class", "전직"), ("league_season", "리그"), ("league_mode", "유형"), ("selected_llm", "LLM")]
+    FILTERS = [("base_class", "클래스"), ("ascendancy_class", "전직"), ("league_season", "리그"), ("league_mode", "유형")]
+    ALL_TEXT = "(전체)"
+
+    def __init__(self, parent, snapshot_library):
+        super().__init__(parent)
+        self.setWindowTitle("스냅샷 라이브러리"); self.resize(900, 600)
+        self.library = snapshot_library; self.selected_snapshot_id = None; self.selected_snapshot_ids = [] # 탭으로 열기를 고르면 여러 개
+        layout = QVBoxLayout(self)
+        text_search_hbox = QHBoxLayout(); lbl_text_search = QLabel("가이드/노트 본문 검색:"); self.edit_text_search = QLineEdit(); self.edit_text_search.setPlaceholderText("예: 겨울의 낙인, 분노 (입력하면 관련도 순으로 정렬)")
+        self.text_search_timer = QTimer(self); self.text_search_timer.setSingleShot(True); self.text_search_timer.setInterval(250); self.text_search_timer.timeout.connect(self.refresh_results); self.edit_text_search.textChanged.connect(self.text_search_timer.start)
+        text_search_hbox.addWidget(lbl_text_search); text_search_hbox.addWidget(self.edit_text_search, 1); layout.addLayout(text_search_hbox)
+        filter_hbox = QHBoxLayout(); self.edit_item_filter = QLineEdit(); self.edit_item_filter.setPlaceholderText("아이템 이름 검색"); self.edit_item_filter.textChanged.connect(self.refresh_results); filter_hbox.addWidget(self.edit_item_filter, 2)
+        self.filter_combos = {}
+        for column, label in self.FILTERS:
+            combo = QComboBox(); combo.setToolTip(label); combo.currentTextChanged.connect(self.refresh_results); filter_hbox.addWidget(combo, 1); self.filter_combos[column] = combo
+        layout.addLayout(filter_hbox)
+        self.table = QTableWidget(0, len(self.COLUMNS) + 1); self.table.setHorizontalHeaderLabels([label for _, label in self.COLUMNS] + ["본문 발췌"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows); self.table.setSelectionMode(QAbstractItemView.ExtendedSelection); self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents); self.table.horizontalHeader().setStretchLastSection(True); self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(lambda row, column: self.open_selected()); layout.addWidget(self.table, 1)
+        self.lbl_status = QLabel(""); layout.addWidget(self.lbl_status)
+        buttons_hbox = QHBoxLayout()
+        btn_import = QPushButton("폴더에서 스냅샷 가져오기"); btn_import.clicked.connect(self.import_folder); buttons_hbox.addWidget(btn_import)
+        btn_export = QPushButton("독립 파일로 내보내기"); btn_export.setToolTip("blob 저장소 없이도 열리는 파일 하나로 저장합니다 (다른 PC로 옮기거나 공유할 때)."); btn_export.clicked.connect(self.export_selected); buttons_hbox.addWidget(btn_export)
+        btn_batch_pdf = QPushButton("PDF로 일괄 내보내기"); btn_batch_pdf.setToolTip("선택한 스냅샷들(선택이 없으면 지금 표시된 전체)을 여러 프로세스에서 나눠 PDF로 만듭니다."); btn_batch_pdf.clicked.connect(self.export_pdf_batch); buttons_hbox.addWidget(btn_batch_pdf)
+        btn_gc = QPushButton("저장소 정리"); btn_gc.setToolTip("지우거나 덮어쓴 스냅샷이 참조하던, 더 이상 쓰이지 않는 blob을 삭제합니다. (라이브러리/스냅샷 폴더에 옮기거나 복사해 둔 파일이 쓰는 blob은 남깁니다)"); btn_gc.clicked.connect(self.collect_blob_garbage); buttons_hbox.addWidget(btn_gc)
+        buttons_hbox.addStretch(1)
+        btn_open_tabs = QPushButton("탭으로 비교하기"); btn_open_tabs.setToolTip("선택한 스냅샷들을 새 창의 탭으로 동시에 불러옵니다."); btn_open_tabs.clicked.connect(self.open_selected_in_tabs); buttons_hbox.addWidget(btn_open_tabs)
+        btn_open = QPushButton("열기"); btn_open.clicked.connect(self.open_selected); buttons_hbox.addWidget(btn_open)
+        btn_close = QPushButton("닫기"); btn_close.clicked.connect(self.reject); buttons_hbox.addWidget(btn_close)
+        layout.addLayout(buttons_hbox)
+        self.refresh_filters(); self.refresh_results()
+
+    def refresh_filters(self):
+        for column, combo in self.filter_combos.items():
+            current = combo.currentText(); combo.blockSignals(True); combo.clear()
+            combo.addItems([self.ALL_TEXT] + self.library.distinct_values(column))
+            if current: combo.setCurrentText(current)
+            combo.blockSignals(False)
+
+    def refresh_results(self):
+        started = time.perf_counter()
+        filters = {column: combo.currentText() for column, combo in self.filter_combos.items() if combo.currentText() not in ("", self.ALL_TEXT)}
+        text_query = self.edit_text_search.text().strip()
+        if text_query: rows = self.library.search_text(text_query, limit=100, item_text=self.edit_item_filter.text().strip(), **filters) # 관련도 순 + 발췌문
+        else: rows = self.library.search(item_text=self.edit_item_filter.text().strip(), **filters)
+        query_ms = (time.perf_counter() - started) * 1000
+        self.table.setColumnHidden(len(self.COLUMNS), not text_query)
+        self.table.setUpdatesEnabled(False); self.table.setRowCount(len(rows))
+        for row_index, entry in enumerate(rows):
+            for column_index, (column, _) in enumerate(self.COLUMNS):
+                value = entry.get(column) or ""
+                if column == "item_name" and not value: value = entry.get("item_input_text") or "(아이템 미지정)"
+                cell = QTableWidgetItem(str(value))
+                if column_index == 0: cell.setData(Qt.UserRole, entry["id"])
+                self.table.setItem(row_index, column_index, cell)
+            if text_query: self.table.setItem(row_index, len(self.COLUMNS), QTableWidgetItem(entry.get("snippet", "").replace("**", "")))
+        self.table.setUpdatesEnabled(True)
+        self.lbl_status.setText(f"{len(rows)}개 표시 / 전체 {self.library.count()}개 (조회 {query_ms:.1f}ms)")
+
+    def import_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, "스냅샷 폴더 선택")
+        if not directory: return
+        imported, skipped, failed = self.library.import_directory(directory)
+        QMessageBox.information(self, "가져오기 완료", f"{imported}개 추가, {skipped}개 변경 없음, {failed}개 실패")
+        self.refresh_filters(); self.refresh_results()
+
+    def export_selected(self):
+        row = self.table.currentRow()
+        if row < 0: QMessageBox.information(self, "선택 필요", "내보낼 스냅샷을 선택해주세요."); return
+        entry = self.library.get_entry(self.table.item(row, 0).data(Qt.UserRole))
+        default_name = os.path.splitext(os.path.basename(entry['file_path']))[0] + "_독립" + COMPACT_SNAPSHOT_EXTENSION
+        target_path, _ = QFileDialog.getSaveFileName(self, "독립 스냅샷으로 내보내기", default_name, f"압축 스냅샷 (*{COMPACT_SNAPSHOT_EXTENSION});;JSON 파일 (1.3 호환) (*.json)")
+        if not target_path: return
+        if not target_path.lower().endswith(SNAPSHOT_FILE_EXTENSIONS): target_path += COMPACT_SNAPSHOT_EXTENSION
+        try: export_standalone_snapshot(entry['file_path'], target_path)
+        except (OSError, SnapshotFormatError) as e: QMessageBox.warning(self, "내보내기 실패", str(e)); return
+        QMessageBox.information(self, "내보내기 완료", f"독립 스냅샷 저장 완료:\n{target_path}")
+
+    def export_pdf_batch(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()}) or list(range(self.table.rowCount()))
+        if not rows: QMessageBox.information(self, "내보낼 항목 없음", "PDF로 내보낼 스냅샷이 없습니다."); return
+        output_dir = QFileDialog.getExistingDirectory(self, "PDF를 저장할 폴더 선택")
+        if not output_dir: return
+        snapshot_paths = [self.library.get_entry(self.table.item(row, 0).data(Qt.UserRole))['file_path'] for row in rows]
+        self.batch_progress = QProgressDialog(f"PDF {len(snapshot_paths)}개 내보내는 중...", "취소", 0, len(snapshot_paths), self); self.batch_progress.setWindowModality(Qt.WindowModal); self.batch_progress.setMinimumDuration(0); self.batch_progress.setAutoClose(False); self.batch_progress.setAutoReset(False)
+        self.batch_thread = QThread(self); self.batch_worker = BatchPdfExportWorker(snapshot_paths, output_dir); self.batch_worker.moveToThread(self.batch_thread)
+        self.batch_progress.canceled.connect(self.batch_worker.cancel_token.cancel) # 아직 시작 안 한 파일은 건너뜀
+        self.batch_thread.started.connect(self.batch_worker.run); self.batch_worker.progress.connect(self._on_pdf_batch_progress); self.batch_worker.finished.connect(self._on_pdf_batch_finished)
+        self.batch_worker.finished.connect(self.batch_thread.quit); self.batch_worker.finished.connect(self.batch_worker.deleteLater)
+        self.batch_started = time.perf_counter(); self.batch_thread.start()
+
+    def _on_pdf_batch_progress(self, done, total, file_name):
+        self.batch_progress.setValue(done); self.batch_progress.setLabelText(f"PDF 내보내는 중... ({done}/{total})\n{file_name}")
+
+    def _on_pdf_batch_finished(self, results):
+        self.batch_progress.close(); elapsed = time.perf_counter() - self.batch_started
+        failures = [result for result in results if 'error' in result]; page_times = [ms for result in results for ms in result.get('page_ms', [])]
+        message = f"{len(results) - len(failures)}개 PDF, {len(page_times)}쪽 저장 ({elapsed:.1f}초"
+        message += f", 쪽당 평균 {sum(page_times) / len(page_times):.1f}ms)" if page_times else ")"
+        if failures: message += f"\n\n실패 {len(failures)}개:\n" + "\n".join(f"- {os.path.basename(result['snapshot_path'])}: {result['error']}" for result in failures[:10])
+        (QMessageBox.warning if failures else QMessageBox.information)(self, "PDF 일괄 내보내기 완료", message)
+
+    def collect_blob_garbage(self):
+        from blob_store import get_default_blob_store
+        store = get_default_blob_store()
+        live_hashes = store.mark_reachable_snapshots([entry['file_path'] for entry in self.library.search(limit=-1)]) # 색인에서 지우기 전에 (옮긴 파일을 찾을 폴더 목록)
+        removed_entries = self.library.remove_missing()
+        removed_blobs, freed_bytes = store.collect_garbage(live_hashes=live_hashes)
+        stats = store.stats()
+        QMessageBox.information(self, "저장소 정리 완료", f"사라진 스냅샷 색인 {removed_entries}개, 쓰이는 blob {len(live_hashes)}개\n삭제한 blob {removed_blobs}개 ({freed_bytes / 1024:.1f}KB 확보)\n남은 blob {stats['blobs']}개, {stats['stored_bytes'] / 1024:.1f}KB")
+        self.refresh_filters(); self.refresh_results()
+
+    def open_selected(self):
+        row = self.table.currentRow()
+        if row < 0: QMessageBox.information(self, "선택 필요", "열 스냅샷을 선택해주세요."); return
+        self.selected_snapshot_id = self.table.item(row, 0).data(Qt.UserRole); self.accept()
+
+    def open_selected_in_tabs(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        if len(rows) < 2: QMessageBox.information(self, "선택 필요", "비교할 스냅샷을 두 개 이상 선택해주세요 (Ctrl/Shift+클릭)."); return
+        self.selected_snapshot_ids = [self.table.item(row, 0).data(Qt.UserRole) for row in rows]; self.accept()
+
+
+# ---------------------------------------------------------------------
+# 옵션으로 아이템 찾기 다이얼로그 (로컬 아이템 저장소의 옵션 역색인 검색, 크롤링 없음)
+# ---------------------------------------------------------------------
+class ModSearchDialog(QDialog):
+    def __init__(self, parent, search_index):
+        super().__init__(parent)
+        self.setWindowTitle("옵션으로 아이템 찾기"); self.resize(900, 600)
+        self.search_index = search_index; self.selected_item_text = None
+        layout = QVBoxLayout(self)
+        query_hbox = QHBoxLayout(); lbl_query = QLabel("옵션 조건:"); self.edit_query = QLineEdit(); self.edit_query.setPlaceholderText("예: 최대 에너지 보호막 >= 50 & 카오스 저항 | 모든 원소 저항")
+        self.edit_query.setToolTip("& = 그리고, | = 또는 (|가 먼저 묶임), 옵션 문구 뒤에 >= 값, <= 값, = 값으로 굴림 범위 조건")
+        self.query_timer = QTimer(self); self.query_timer.setSingleShot(True); self.query_timer.setInterval(250); self.query_timer.timeout.connect(self.refresh_results); self.edit_query.textChanged.connect(self.query_timer.start)
+        query_hbox.addWidget(lbl_query); query_hbox.addWidget(self.edit_query, 1); layout.addLayout(query_hbox)
+        self.table = QTableWidget(0, 3); self.table.setHorizontalHeaderLabels(["아이템", "유형", "조건에 맞는 옵션"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows); self.table.setSelectionMode(QAbstractItemView.SingleSelection); self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents); self.table.horizontalHeader().setStretchLastSection(True); self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(lambda row, column: self.use_selected()); layout.addWidget(self.table, 1)
+        self.lbl_status = QLabel(f"아이템 {len(search_index)}개, 옵션 템플릿 {len(search_index.templates)}개에서 찾습니다."); layout.addWidget(self.lbl_status)
+        buttons_hbox = QHBoxLayout(); buttons_hbox.addStretch(1)
+        btn_use = QPushButton("이 아이템으로 가이드 입력"); btn_use.clicked.connect(self.use_selected); buttons_hbox.addWidget(btn_use)
+        btn_close = QPushButton("닫기"); btn_close.clicked.connect(self.reject); buttons_hbox.addWidget(btn_close)
+        layout.addLayout(buttons_hbox)
+
+    def refresh_results(self):
+        from mod_search import ModQueryError
+        query_text = self.edit_query.text().strip()
+        if not query_text: self.table.setRowCount(0); self.lbl_status.setText(f"아이템 {len(self.search_index)}개, 옵션 템플릿 {len(self.search_index.templates)}개에서 찾습니다."); return
+        try: results, total, query_ms = self.search_index.search_text(query_text)
+        except ModQueryError as e: self.table.setRowCount(0); self.lbl_status.setText(str(e)); return
+        self.table.setUpdatesEnabled(False); self.table.setRowCount(len(results))
+        for row_index, entry in enumerate(results):
+            name_cell = QTableWidgetItem(entry['name']); name_cell.setData(Qt.UserRole, entry['url'] if entry['url'] and "poedb.tw" in entry['url'] else entry['name']) # URL이 있으면 이름 매핑 없이 바로 크롤링
+            self.table.setItem(row_index, 0, name_cell); self.table.setItem(row_index, 1, QTableWidgetItem(entry['type'] or "")); self.table.setItem(row_index, 2, QTableWidgetItem(" / ".join(entry['matched_mods'])))
+        self.table.setUpdatesEnabled(True)
+        self.lbl_status.setText(f"{total}개 일치" + (f" (앞의 {len(results)}개 표시)" if total > len(results) else "") + f" (조회 {query_ms:.1f}ms)")
+
+    def use_selected(self):
+        row = self.table.currentRow()
+        if row < 0: QMessageBox.information(self, "선택 필요", "가이드를 만들 아이템을 선택해주세요."); return
+        self.selected_item_text = self.table.item(row, 0).data(Qt.UserRole); self.accept()
+
+
+# ---------------------------------------------------------------------
+# 현재 리그 정보를 백그라운드에서 가져오는 일꾼 (창 생성이 네트워크를 기다리지 않도록)
+# ---------------------------------------------------------------------
+class LeagueInfoWorker(QObject):
+    finished = pyqtSignal(object)
+
+    def __init__(self, server_client=None):
+        super().__init__()
+        self.server_client = server_client # 가이드 서버를 쓰면 서버가 캐시해 둔 리그 정보
+
+    def run(self):
+        league_info = None
+        try:
+            if self.server_client: league_info = self.server_client.league_info()
+            else:
+                from crawler import get_current_league_info_from_poedb
+                league_info = get_current_league_info_from_poedb()
+        except Exception as e: print(f"현재 리그 정보 로드 중 오류: {e}")
+        self.finished.emit(league_info)
+
+
+# ---------------------------------------------------------------------
+# PDF 저장 일꾼 (가이드 하나: 일꾼 스레드 / 여러 스냅샷: 일꾼 스레드가 프로세스 풀을 관리)
+# ---------------------------------------------------------------------
+class PdfExportWorker(QObject):
+    finished = pyqtSignal(object, str) # (측정값 dict, 오류 메시지)
+
+    def __init__(self, snapshot_data, output_path):
+        super().__init__()
+        self.snapshot_data = snapshot_data; self.output_path = output_path
+
+    def run(self):
+        try:
+            from pdf_export import render_markdown_to_pdf, snapshot_to_markdown # QtPrintSupport는 처음 PDF를 저장할 때 임포트
+            result = render_markdown_to_pdf(snapshot_to_markdown(self.snapshot_data), self.output_path, title=os.path.splitext(os.path.basename(self.output_path))[0])
+            self.finished.emit(result, "")
+        except Exception as e: self.finished.emit(None, f"PDF 저장 중 오류 발생:\n{e}")
+
+
+class BatchPdfExportWorker(QObject):
+    progress = pyqtSignal(int, int, str) # (완료 수, 전체 수, 방금 끝난 파일)
+    finished = pyqtSignal(object) # 결과 dict 목록
+
+    def __init__(self, snapshot_paths, output_dir):
+        super().__init__()
+        self.snapshot_paths = snapshot_paths; self.output_dir = output_dir
+        self.cancel_token = CancelToken()
+
+    def run(self):
+        results = []
+        try:
+            from pdf_export import export_snapshots_to_pdf
+            results = export_snapshots_to_pdf(self.snapshot_paths, self.output_dir, cancel_token=self.cancel_token,
+                                              progress_callback=lambda done, total, result: self.progress.emit(done, total, os.path.basename(result.get('output_path') or result['snapshot_path'])))
+        except Exception as e: results = [{'snapshot_path': '', 'error': f"일괄 내보내기 실패: {e}"}]
+        self.finished.emit(results)
+
+
+# ---------------------------------------------------------------------
+# 스냅샷 불러오기 일꾼 (파일 읽기/압축 풀기/검사는 GUI 스레드 밖에서, 여러 개면 동시에)
+# ---------------------------------------------------------------------
+class SnapshotLoadWorker(QObject):
+    """
+    file_paths의 스냅샷들을 작업 스레드 풀(최대 max_workers개)에서 동시에 읽는다. 신호의 첫 인자는 file_paths 안의 순서.
+    파일마다 헤더(조건/제목)가 읽히면 header_loaded, 본문까지 읽고 검사가 끝나면 loaded, 실패하면 failed. 모두 끝나면 finished.
+    cancel_token이 취소되면 아직 시작하지 않은 파일은 건너뛰고 더 이상 신호를 보내지 않는다.
+    """
+    header_loaded = pyqtSignal(int, str, object) # (순서, 경로, 헤더 dict)
+    loaded = pyqtSignal(int, str, object) # (순서, 경로, 스냅샷 dict)
+    failed = pyqtSignal(int, str, str, str) # (순서, 경로, 오류 제목, 오류 메시지)
+    finished = pyqtSignal()
+
+    def __init__(self, file_paths, max_workers=4):
+        super().__init__()
+        self.file_paths = list(file_paths); self.max_workers = max_workers
+        self.cancel_token = CancelToken()
+
+    def run(self):
+        from concurrent.futures import ThreadPoolExecutor
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self.file_paths))), thread_name_prefix="snapshot-load") as executor:
+                for index, file_path in enumerate(self.file_paths): executor.submit(self._load_one, index, file_path)
+        finally: self.finished.emit()
+
+    def _load_one(self, index, file_path):
+        if self.cancel_token.is_cancelled: return
+        try:
+            for stage, data in read_snapshot_stages(file_path):
+                if self.cancel_token.is_cancelled: return
+                (self.header_loaded if stage == 'header' else self.loaded).emit(index, file_path, data)
+        except FileNotFoundError: self.failed.emit(index, file_path, "파일 오류", "선택한 파일을 찾을 수 없습니다.")
+        except SnapshotFormatError as e: self.failed.emit(index, file_path, "호환되지 않는 스냅샷", str(e))
+        except Exception as e: self.failed.emit(index, file_path, "불러오기 오류", f"스냅샷 불러오는 중 오류 발생:\n{e}")
+
+
+# ---------------------------------------------------------------------
+# 스냅샷 여러 개를 탭으로 비교하는 창 (SnapshotLoadWorker로 동시에 불러옴)
+# ---------------------------------------------------------------------
+class SnapshotTabsWindow(QWidget):
+    """
+    스냅샷마다 탭 하나. 탭은 바로 만들어 두고 헤더가 읽히는 대로 제목/조건을 채우며, 본문은 탭마다 GuideRenderer가 조금씩 그린다.
+    loaded(경로, 스냅샷 dict) 신호로 다 읽힌 스냅샷을 알린다 (메인 창이 라이브러리 색인에 반영).
+    """
+    loaded = pyqtSignal(str, object)
+
+    def __init__(self, parent, file_paths):
+        super().__init__(parent, Qt.Window)
+        self.setAttribute(Qt.WA_DeleteOnClose); self.setWindowTitle(f"스냅샷 비교 ({len(file_paths)}개)"); self.resize(900, 700)
+        layout = QVBoxLayout(self)
+        self.tabs = QTabWidget(); self.tabs.setTabsClosable(True); self.tabs.tabCloseRequested.connect(self._close_tab); layout.addWidget(self.tabs, 1)
+        self.lbl_status = QLabel(""); layout.addWidget(self.lbl_status)
+        self.renderers = [] # 순서 -> (탭 위젯, GuideRenderer), 닫은 탭은 (None, None)
+        for file_path in file_paths:
+            browser = QTextBrowser(); browser.setOpenExternalLinks(True); renderer = GuideRenderer(browser)
+            renderer.show(f"**불러오는 중...** {os.path.basename(file_path)}\n", ""); self.tabs.addTab(browser, os.path.basename(file_path)); self.tabs.setTabToolTip(self.tabs.count() - 1, file_path)
+            self.renderers.append((browser, renderer))
+        self.done = 0; self._update_status()
+        # 스레드는 메인 창에 붙여 둔다 (이 창을 먼저 닫아도 읽던 스레드가 끝날 때까지 살아있도록)
+        self.load_thread = QThread(parent); self.load_worker = SnapshotLoadWorker(file_paths); self.load_cancel_token = self.load_worker.cancel_token
+        self.load_worker.moveToThread(self.load_thread); self.load_thread.started.connect(self.load_worker.run); self.load_thread.finished.connect(self.load_thread.deleteLater)
+        self.load_worker.header_loaded.connect(self._on_header_loaded); self.load_worker.loaded.connect(self._on_loaded); self.load_worker.failed.connect(self._on_failed)
+        self.load_worker.finished.connect(self.load_thread.quit); self.load_worker.finished.connect(self.load_worker.deleteLater)
+        self.load_thread.start()
+
+    def _tab(self, index): # 닫힌 탭이면 None
+        return self.renderers[index]
+
+    def _close_tab(self, tab_index): # 탭만 떼면 브라우저/렌더러가 살아남아 계속 그리므로, 렌더러를 멈추고 위젯째 지운다
+        browser = self.tabs.widget(tab_index)
+        for index, (tab_browser, renderer) in enumerate(self.renderers):
+            if tab_browser is browser: renderer.clear(); self.renderers[index] = (None, None)
+        self.tabs.removeTab(tab_index); browser.deleteLater() # 렌더러는 브라우저의 자식이라 같이 지워짐
+
+    def _on_header_loaded(self, index, file_path, header_data):
+        browser, renderer = self._tab(index)
+        if browser is None: return
+        inputs = header_data.get("query_inputs") or {}
+        self.tabs.setTabText(self.tabs.indexOf(browser), f"{header_data.get('item_name') or inputs.get('item_input_text') or '일반가이드'} ({(inputs.get('base_class') or '').split(' (')[0]})")
+        header_markdown, _ = snapshot_markdown_parts(header_data)
+        renderer.set_header(header_markdown + "\n**가이드 본문을 불러오는 중...**\n")
+
+    def _on_loaded(self, index, file_path, snapshot_data):
+        self.done += 1; self._update_status(); self.loaded.emit(file_path, snapshot_data)
+        browser, renderer = self._tab(index)
+        if browser is None: return
+        renderer.show(*snapshot_markdown_parts(snapshot_data)) # 긴 본문도 프레임마다 나눠 그림
+
+    def _on_failed(self, index, file_path, title, message):
+        self.done += 1; self._update_status()
+        browser, renderer = self._tab(index)
+        if browser is not None: renderer.show(f"**{title}:** {os.path.basename(file_path)}\n\n{message}\n", "")
+
+    def _update_status(self):
+        self.lbl_status.setText(f"불러옴 {self.done}/{len(self.renderers)}" if self.done < len(self.renderers) else f"스냅샷 {len(self.renderers)}개를 모두 불러왔습니다.")
+
+    def closeEvent(self, event): # 창을 닫으면 아직 읽는 중인 파일은 버린다
+        self.load_cancel_token.cancel()
+        super().closeEvent(event)
+
+
 # ---------------------------------------------------------------------
 # 일꾼 클래스(GuideWorker) 정의 (사용자 노트 내용 프롬프트에 반영)
 # ---------------------------------------------------------------------
 class GuideWorker(QObject):
     finished = pyqtSignal(str, object) 
     progress = pyqtSignal(int, str)
+    guide_chunk = pyqtSignal(str) # LLM 스트리밍 응답 조각
 
     def __init__(self, item_query_text, selected_llm_type, 
                  selected_char_class, selected_ascendancy,
                  league_mode, league_season, 
                  chatgpt_model_id_to_use, gemini_model_id_to_use,
-                 user_notes_text): # 사용자 노트 인자 추가!
+                 user_notes_text, item_prefetcher=None, guide_cache=None): # 사용자 노트 인자 추가!
         super().__init__()
         self.item_query = item_query_text; self.selected_llm = selected_llm_type
         self.character_class = selected_char_class; self.ascendancy_class = selected_ascendancy
         self.league_mode = league_mode; self.league_season = league_season
         self.chatgpt_model_id = chatgpt_model_id_to_use; self.gemini_model_id = gemini_model_id_to_use
         self.user_notes = user_notes_text # 사용자 노트 저장
-        self.is_cancelled = False 
+        self.cancel_token = CancelToken() # 크롤러/LLM 호출까지 내려보내는 취소 토큰
+        self.item_prefetcher = item_prefetcher # 입력 중에 미리 받아둔 아이템 정보 캐시 (없으면 직접 크롤링)
+        self.guide_cache = guide_cache # (LLM, 모델, 프롬프트)가 같으면 LLM을 다시 부르지 않는 가이드 캐시 (가이드 서버가 요청끼리 공유)
+        self.guide_from_cache = None # 가이드 캐시에서 꺼냈으면 True, LLM을 불렀으면 False (LLM 단계 전에 끝나면 None)
+        self.timings = {} # 단계별 소요 시간(초): map, crawl_wait, crawl, parse, prompt, llm_first_chunk, llm (결과 dict의 'timings'로도 전달)
+        self.trace = start_request_trace('guide_request', item=item_query_text, llm=selected_llm_type) # config.ini [TRACING]이 꺼져 있으면 빈 트레이스
+        self._run_started = None
+        self.finished.connect(self._record_metrics, Qt.DirectConnection) # GUI 없이 쓸 때도 기록되도록 finished를 보내는 스레드에서 바로
+
+    @property
+    def is_cancelled(self):
+        return self.cancel_token.is_cancelled
+
+    def cancel(self):
+        # GUI 스레드에서 직접 호출됨. 진행 중인 HTTP 연결/LLM 스트림이 즉시 닫힌다.
+        self.cancel_token.cancel()
+
+    def _take_prefetched(self, prefetch_key):
+        # 미리 가져온(또는 가져오는 중인) 정보가 있으면 그것을 사용. 없으면 None -> 직접 크롤링
+        if not self.item_prefetcher: return None
+        with self.trace.span('prefetch.take', key=prefetch_key) as prefetch_span:
+            item_data = self.item_prefetcher.take(prefetch_key, cancel_token=self.cancel_token); prefetch_span.set(hit=bool(item_data))
+        if item_data: print(f"미리 가져온 아이템 정보 사용: '{prefetch_key}'")
+        return item_data
 
     def run(self):
+        self._run_started = time.perf_counter()
+        with use_trace(self.trace): self._run() # 크롤러 등 이 스레드에서 부르는 함수의 구간도 이 요청의 트레이스에 기록
+
+    def _record_metrics(self, status, result_data): # 상태별 요청 수 + 단계별 지연 시간 히스토그램
+        GUIDE_REQUESTS.inc(status=status); observe_stage_timings(self.timings)
+        if self._run_started is not None: STAGE_SECONDS.observe(time.perf_counter() - self._run_started, stage='worker')
+
+    def _run(self):
         try:
+            from crawler import get_item_details_from_poedb # 보통은 시작 직후 백그라운드에서 이미 임포트되어 있음
             class_display_for_progress = self.character_class
             if self.ascendancy_class and self.ascendancy_class != "전직 선택 안함": class_display_for_progress += f" ({self.ascendancy_class})"
             elif self.character_class == "클래스 선택 안함": class_display_for_progress = "클래스 미지정"
@@ -116,13 +496,14 @@ class GuideWorker(QObject):
             if self.item_query: 
                 if self.item_query.startswith("http") and "poedb.tw" in self.item_query:
                     self.progress.emit(15, f"URL에서 '{self.item_query}' 정보 가져오는 중...")
-                    item_data_worker = get_item_details_from_poedb(self.item_query)
+                    item_data_worker = self._take_prefetched(self.item_query) or get_item_details_from_poedb(self.item_query, cancel_token=self.cancel_token, timings=self.timings)
                 else:
                     self.progress.emit(10, f"'{self.item_query}' 아이템 이름으로 URL 식별자 찾는 중...")
-                    poedb_id = get_poedb_identifier(self.item_query)
+                    stage_started = time.perf_counter(); poedb_id = get_poedb_identifier(self.item_query); stage_ended = time.perf_counter()
+                    self.timings['map'] = stage_ended - stage_started; self.trace.add_span('map', stage_started, stage_ended, poedb_id=poedb_id)
                     if poedb_id:
                         self.progress.emit(20, f"'{poedb_id}' 정보 poedb.tw에서 가져오는 중...")
-                        item_data_worker = get_item_details_from_poedb(poedb_id)
+                        item_data_worker = self._take_prefetched(poedb_id) or get_item_details_from_poedb(poedb_id, cancel_token=self.cancel_token, timings=self.timings)
                     else:
                         self.progress.emit(20, f"'{self.item_query}'에 대한 URL 식별자 찾기 실패.")
                         item_data_worker = {'name': self.item_query, 'type': '(정보 부족)', 'mods': ['(상세 옵션 정보 없음)'], 'url': None, 'notice': 'mapper_failed'}
@@ -130,7 +511,7 @@ class GuideWorker(QObject):
                 item_data_worker = {'name': '(아이템 지정 안함)', 'type': '', 'mods': [], 'url': None, 'notice': 'no_item_specified'}
             
             if self.is_cancelled: self.finished.emit("cancelled", "작업이 취소되었습니다."); return
-            self.progress.emit(50, "정보 분석 완료, LLM 프롬프트 구성 중...")
+            self.progress.emit(50, "정보 분석 완료, LLM 프롬프트 구성 중..."); stage_started = time.perf_counter()
 
             if not item_data_worker or (self.item_query and not item_data_worker.get('name')):
                 self.finished.emit("error_crawl", f"'{self.item_query}'에 대한 아이템 정보를 가져오지 못했습니다.")
@@ -158,6 +539,16 @@ class GuideWorker(QObject):
                 """
             # --- ---
 
+            # --- 로컬 아이템 저장소(item_store.jsonl)에서 옵션이 비슷한 아이템을 찾아 추천 근거로 넣음 (저장소가 없으면 건너뜀) ---
+            similar_items_section_for_prompt = ""
+            if self.item_query and item_data_worker.get('notice') != 'mapper_failed':
+                from mod_stats import similar_items_for_prompt # NumPy 임포트가 무거우므로 여기서 (창이 뜬 뒤 미리 데워둠)
+                with self.trace.span('similar_items') as similar_span:
+                    similar_items = similar_items_for_prompt(item_data_worker); similar_span.set(count=len(similar_items))
+                if similar_items:
+                    similar_lines = "\n".join(f"- {entry['name']} ({entry['type']}): 공통 옵션 {', '.join(entry['shared_mods'][:3])}" for entry in similar_items)
+                    similar_items_section_for_prompt = f"\n참고로, 아이템 데이터에서 옵션 구성이 비슷한 고유 아이템은 다음과 같습니다 (옵션 유사도 순). 4번 추천에 참고해주세요:\n{similar_lines}\n"
+
             prompt_for_llm_worker = ""; query_subject_worker = ""
             base_questions = """
             1. 이 아이템(또는 현재 제 상황)이 저 같은 초보자에게 그리고 제 클래스/전직 및 현재 리그 환경에 유용한가요?
@@ -167,19 +558,31 @@ class GuideWorker(QObject):
             """
             if self.item_query: 
                 query_subject_worker = f"아이템: '{item_name_prompt}' ({item_type_prompt}), 옵션: {mods_string_prompt}\n"
-                prompt_for_llm_worker = f"당신은 Path of Exile 게임의 숙련된 전문가입니다. 초보 유저가 질문합니다.\n{query_subject_worker}저는 초보자이고, {league_context_prompt}에서 {class_context_prompt}를 키우려고 합니다.\n{user_notes_section_for_prompt}\n위 모든 정보(아이템, 사용자 상황, 사용자 노트)를 종합적으로 고려하여 다음 질문에 답변해주세요:\n{base_questions}\nMarkdown으로 친절하고 자세하게 답변해주세요."
+                prompt_for_llm_worker = f"당신은 Path of Exile 게임의 숙련된 전문가입니다. 초보 유저가 질문합니다.\n{query_subject_worker}저는 초보자이고, {league_context_prompt}에서 {class_context_prompt}를 키우려고 합니다.\n{user_notes_section_for_prompt}{similar_items_section_for_prompt}\n위 모든 정보(아이템, 사용자 상황, 사용자 노트)를 종합적으로 고려하여 다음 질문에 답변해주세요:\n{base_questions}\nMarkdown으로 친절하고 자세하게 답변해주세요."
             else: 
                 query_subject_worker = "(특정 아이템 없이 일반 빌드 조언 요청)\n"
                 prompt_for_llm_worker = f"당신은 Path of Exile 게임의 숙련된 전문가입니다. 초보 유저가 질문합니다.\n{query_subject_worker}저는 초보자이고, {league_context_prompt}에서 {class_context_prompt}를 키우려고 합니다. \n{user_notes_section_for_prompt}\n위 모든 정보(사용자 상황, 사용자 노트)를 종합적으로 고려하여 다음 질문에 답변해주세요. (특정 아이템에 대한 질문이 아닙니다.):\n{base_questions.replace('이 아이템', '제 상황')}\nMarkdown으로 친절하고 자세하게 답변해주세요." # "이 아이템" 부분을 "제 상황"으로 변경
             
             progress_message_llm = f"'{item_name_prompt if self.item_query else '(아이템 없음)'}' ({class_display_for_progress}, {league_info_for_progress}) 정보로 {llm_name_for_display_worker}에게 가이드 요청 중..."
             if item_data_worker.get('notice') == 'mapper_failed': progress_message_llm = f"'{item_data_worker.get('name', self.item_query)}' (상세정보 부족...) {llm_name_for_display_worker}에게 가이드 요청 중..."
+            stage_ended = time.perf_counter(); self.timings['prompt'] = stage_ended - stage_started; self.trace.add_span('prompt', stage_started, stage_ended, chars=len(prompt_for_llm_worker))
             self.progress.emit(60, progress_message_llm)
             
-            guide_text_worker = ""; 
-            if self.selected_llm == "ChatGPT": guide_text_worker = generate_guide_with_chatgpt(item_data_worker, prompt_override=prompt_for_llm_worker, model_id_to_use=self.chatgpt_model_id)
-            elif self.selected_llm == "Gemini": guide_text_worker = generate_guide_with_gemini(item_data_worker, prompt_override=prompt_for_llm_worker, model_id_to_use=self.gemini_model_id)
+            guide_text_worker = ""; llm_started = time.perf_counter()
+            def on_llm_chunk(chunk_text):
+                if 'llm_first_chunk' not in self.timings: self.timings['llm_first_chunk'] = time.perf_counter() - llm_started; self.trace.mark('llm.first_chunk')
+                self.guide_chunk.emit(chunk_text)
+            if self.selected_llm == "ChatGPT": generate_guide = generate_guide_with_chatgpt; model_id_for_llm = self.chatgpt_model_id
+            elif self.selected_llm == "Gemini": generate_guide = generate_guide_with_gemini; model_id_for_llm = self.gemini_model_id
             else: self.finished.emit("error_llm_selection", f"내부 오류: 알 수 없는 LLM ({self.selected_llm})"); return
+            guide_cache_key = (self.selected_llm, model_id_for_llm, prompt_for_llm_worker)
+            cached_guide_text = self.guide_cache.get(guide_cache_key) if self.guide_cache else None; self.guide_from_cache = cached_guide_text is not None
+            if cached_guide_text is not None: guide_text_worker = cached_guide_text; on_llm_chunk(cached_guide_text) # 같은 조건으로 이미 받은 가이드를 한 조각으로
+            else:
+                llm_outcome, guide_text_worker = generate_guide(item_data_worker, prompt_override=prompt_for_llm_worker, model_id_to_use=model_id_for_llm, cancel_token=self.cancel_token, on_chunk=on_llm_chunk)
+                if self.guide_cache and llm_outcome == 'success' and not self.is_cancelled: self.guide_cache.put(guide_cache_key, guide_text_worker) # 오류 메시지(스트림 도중 끊긴 경우 포함)는 캐시하지 않음
+            llm_ended = time.perf_counter(); self.timings['llm'] = llm_ended - llm_started
+            self.trace.add_span('llm', llm_started, llm_ended, llm=self.selected_llm, chars=len(guide_text_worker or ""), cached=cached_guide_text is not None)
             
             if self.is_cancelled: self.finished.emit("cancelled", "작업이 취소되었습니다."); return
             self.progress.emit(95, f"{llm_name_for_display_worker} 응답 수신 완료, 결과 표시 준비 중...")
@@ -188,11 +591,40 @@ class GuideWorker(QObject):
                                            'used_llm': llm_name_for_display_worker, 
                                            'char_class': self.character_class, 'ascendancy': self.ascendancy_class, 
                                            'league_mode': self.league_mode, 'league_season': self.league_season,
-                                           'user_notes': self.user_notes }) # 사용자 노트도 결과에 포함
+                                           'user_notes': self.user_notes, 'timings': dict(self.timings) }) # 사용자 노트도 결과에 포함
         except Exception as e:
             self.progress.emit(0, "오류 발생!"); self.finished.emit("error_unknown", f"가이드 생성 중 예기치 않은 오류 발생: {e}")
 
 
+class RemoteGuideWorker(GuideWorker):
+    """
+    config.ini [SERVER] URL이 있을 때 쓰는 일꾼. poedb/LLM을 직접 부르지 않고 가이드 서버(guide_server.py)에 요청해서,
+    서버가 스트리밍으로 보내는 진행 상황/가이드 조각/결과를 GuideWorker와 같은 시그널로 넘긴다.
+    """
+    def __init__(self, server_client, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.server_client = server_client
+
+    def _run(self):
+        request = {'item': self.item_query, 'llm': self.selected_llm, 'char_class': self.character_class, 'ascendancy': self.ascendancy_class,
+                   'league_mode': self.league_mode, 'league_season': self.league_season, 'notes': self.user_notes}
+        self.progress.emit(5, f"가이드 서버({self.server_client.base_url})에 요청 중..."); started = time.perf_counter()
+        def on_server_event(event, data):
+            if event == 'queued': self.progress.emit(5, f"가이드 서버가 바빠서 대기 중... ({data.get('position')}번째)")
+            elif event == 'progress': self.progress.emit(int(data.get('percent', 0)), data.get('message', ""))
+            elif event == 'chunk':
+                if 'server_first_chunk' not in self.timings: self.timings['server_first_chunk'] = time.perf_counter() - started; self.trace.mark('llm.first_chunk')
+                self.guide_chunk.emit(data.get('text', ""))
+        try:
+            with self.trace.span('server.guide', url=self.server_client.base_url):
+                status, result_data = self.server_client.stream_guide(request, cancel_token=self.cancel_token, on_event=on_server_event)
+        except GuideServerError as e: self.progress.emit(0, "오류 발생!"); self.finished.emit("error_server", str(e)); return
+        except Exception as e: self.progress.emit(0, "오류 발생!"); self.finished.emit("error_unknown", f"가이드 서버 요청 중 예기치 않은 오류 발생: {e}"); return
+        self.timings['server'] = time.perf_counter() - started
+        if self.is_cancelled: status, result_data = "cancelled", "작업이 취소되었습니다."
+        self.finished.emit(status, result_data)
+
+
 # ---------------------------------------------------------------------
 # 메인 애플리케이션 클래스(PoEPlannerApp) 정의
 # ---------------------------------------------------------------------
@@ -207,17 +639,49 @@ class PoEPlannerApp(QWidget):
         self.current_item_query = ""; self.current_item_data = {}; self.current_char_class = ""
         self.current_ascendancy = ""; self.current_league_mode = ""; self.current_league_season = ""
         self.current_selected_llm = ""; self.current_guide_text = ""; self.current_user_notes = ""
+        self.streamed_guide_parts = [] # 현재 생성 중인 가이드의 스트리밍 조각들
+        self.snapshot_library = None # 처음 사용할 때 연다 (_get_snapshot_library)
+        self.pdf_thread = None; self.pdf_worker = None
+        self.snapshot_load_worker = None; self.snapshot_load_previous = None; self.snapshot_load_announce = False # 메인 화면으로 불러오는 중인 스냅샷
+        self.guide_server = None # config.ini [SERVER] URL이 있으면 GuideServerClient (poedb/LLM 대신 가이드 서버에 요청)
+        self.item_prefetcher = ItemPrefetcher(fetch_item=self._fetch_item_for_prefetch) # 입력 중 아이템 정보 미리 가져오기
+        self.record_requests = False; self.popularity_log = None; self.cache_warmer = None # config.ini [WARMER] (_configure_cache_warmer)
         self._ensure_config_files_exist() 
         self.chatgpt_model_id = ""; self.gemini_model_id = "" 
         self._load_app_config()
-        self.fetched_current_league_name = "시즌"; 
-        try:
-            league_info = get_current_league_info_from_poedb()
-            if league_info and league_info.get("name"):
-                self.fetched_current_league_name = league_info["name"]
-                if league_info.get("version"): self.fetched_current_league_name += f" ({league_info['version']})"
-        except: pass 
-        self.initUI(); self.check_api_keys()
+        self.fetched_current_league_name = "시즌"; self.league_info_loading = True
+        self.initUI()
+        self._start_league_info_loading(); QTimer.singleShot(0, self._warm_heavy_modules_in_background)
+        self.league_info_timer = QTimer(self); self.league_info_timer.timeout.connect(self._start_league_info_loading); self.league_info_timer.start(LEAGUE_INFO_RECHECK_INTERVAL_MS)
+        self.check_api_keys()
+
+    def _start_league_info_loading(self): # poedb 리그 정보는 창이 뜬 뒤 백그라운드에서 가져와 콤보박스만 갱신
+        if getattr(self, 'league_info_thread', None) is not None: return # 이전 확인이 아직 안 끝남
+        self.league_info_thread = QThread(self); self.league_info_worker = LeagueInfoWorker(self.guide_server)
+        self.league_info_worker.moveToThread(self.league_info_thread); self.league_info_thread.started.connect(self.league_info_worker.run)
+        self.league_info_worker.finished.connect(self._on_league_info_loaded); self.league_info_worker.finished.connect(self.league_info_thread.quit)
+        self.league_info_worker.finished.connect(self.league_info_worker.deleteLater); self.league_info_thread.finished.connect(self.league_info_thread.deleteLater)
+        self.league_info_thread.start()
+
+    def _on_league_info_loaded(self, league_info):
+        self.league_info_loading = False; self.league_info_thread = None
+        get_league_version_tracker().update(league_info) # 새 패치면 이전 버전 아이템 캐시를 비우고 최근 아이템을 다시 가져온다
+        if not league_info and self.fetched_current_league_name != "시즌": return # 주기적 재확인이 실패하면 이전 값을 그대로 보여준다
+        if league_info and league_info.get("name"):
+            self.fetched_current_league_name = league_info["name"]
+            if league_info.get("version"): self.fetched_current_league_name += f" ({league_info['version']})"
+        self.combo_league_season.setItemText(0, self._current_league_combo_text())
+
+    def _current_league_combo_text(self):
+        if self.league_info_loading: return "시즌 (불러오는 중...)"
+        return f"{self.fetched_current_league_name} (현재)" if self.fetched_current_league_name != "시즌" else "시즌 (자동로드 실패)"
+
+    def _warm_heavy_modules_in_background(self):
+        def warm():
+            for module_name in BACKGROUND_WARM_MODULES:
+                try: importlib.import_module(module_name)
+                except Exception as e: print(f"알림: '{module_name}' 미리 임포트 실패 (실제 사용 시 다시 시도): {e}")
+        threading.Thread(target=warm, name="module-warmup", daemon=True).start()
 
     def _ensure_config_files_exist(self): # 이전과 동일
         example_config_path = resource_path('config.example.ini')
@@ -232,18 +696,41 @@ class PoEPlannerApp(QWidget):
         elif not os.path.exists(API_KEYS_FILE_PATH) and not os.path.exists(example_api_keys_path): print(f"경고: API 키 파일 및 예시 파일 모두 없음...")
         
     def _load_app_config(self): # 이전과 동일
-        config = configparser.ConfigParser(); default_chatgpt_model = "gpt-4o-mini"; default_gemini_model = "models/gemini-1.5-flash-latest"
+        config = get_settings_file(CONFIG_FILE_PATH).config(); default_chatgpt_model = "gpt-4o-mini"; default_gemini_model = "models/gemini-1.5-flash-latest"
         self.chatgpt_model_id = default_chatgpt_model; self.gemini_model_id = default_gemini_model
-        if os.path.exists(CONFIG_FILE_PATH):
-            config.read(CONFIG_FILE_PATH, encoding='utf-8')
-            if 'LLM_MODELS' in config:
-                self.chatgpt_model_id = config['LLM_MODELS'].get('CHATGPT_MODEL', default_chatgpt_model).strip()
-                self.gemini_model_id = config['LLM_MODELS'].get('GEMINI_MODEL', default_gemini_model).strip()
-                if not self.chatgpt_model_id: self.chatgpt_model_id = default_chatgpt_model
-                if not self.gemini_model_id: self.gemini_model_id = default_gemini_model
+        if 'LLM_MODELS' in config:
+            self.chatgpt_model_id = config['LLM_MODELS'].get('CHATGPT_MODEL', default_chatgpt_model).strip()
+            self.gemini_model_id = config['LLM_MODELS'].get('GEMINI_MODEL', default_gemini_model).strip()
+            if not self.chatgpt_model_id: self.chatgpt_model_id = default_chatgpt_model
+            if not self.gemini_model_id: self.gemini_model_id = default_gemini_model
+        try: configure_tracing(config.getboolean('TRACING', 'ENABLED', fallback=False), config.get('TRACING', 'OUTPUT_DIR', fallback='').strip() or None, config.getfloat('TRACING', 'SLOW_THRESHOLD_MS', fallback=0))
+        except ValueError as e: print(f"경고: config.ini [TRACING] 설정 값 오류, 트레이싱을 끕니다: {e}"); configure_tracing(False)
+        try: configure_metrics_exporters(config.getint('METRICS', 'HTTP_PORT', fallback=0), config.get('METRICS', 'HTTP_HOST', fallback='127.0.0.1').strip() or '127.0.0.1', config.get('METRICS', 'DUMP_FILE', fallback='').strip() or None, config.getfloat('METRICS', 'DUMP_INTERVAL_SECONDS', fallback=60))
+        except ValueError as e: print(f"경고: config.ini [METRICS] 설정 값 오류, 지표 내보내기를 끕니다: {e}"); configure_metrics_exporters()
+        self._configure_cache_warmer(config)
+        server_url = config.get('SERVER', 'URL', fallback='').strip()
+        self.guide_server = GuideServerClient(server_url, config.get('SERVER', 'TOKEN', fallback='').strip()) if server_url else None
+        if self.guide_server: print(f"가이드 서버 사용: {server_url} (poedb/LLM 요청은 서버가 대신함)")
         print(f"앱 설정 로드: ChatGPT 모델='{self.chatgpt_model_id}', Gemini 모델='{self.gemini_model_id}'")
         if hasattr(self, 'combo_llm_select'): self.combo_llm_select.setItemText(0, f"ChatGPT ({self.chatgpt_model_id})"); self.combo_llm_select.setItemText(1, f"Gemini ({self.gemini_model_id})")
     
+    def _configure_cache_warmer(self, config): # 인기 요청 기록 + 한가할 때 인기 아이템 정보 미리 가져오기 (앱에는 가이드 캐시가 없으므로 아이템만)
+        try:
+            self.record_requests = config.getboolean('WARMER', 'RECORD_REQUESTS', fallback=True); warmer_enabled = config.getboolean('WARMER', 'ENABLED', fallback=False)
+            top_n = config.getint('WARMER', 'TOP_N', fallback=10); interval_seconds = config.getfloat('WARMER', 'INTERVAL_SECONDS', fallback=300)
+        except ValueError as e: print(f"경고: config.ini [WARMER] 설정 값 오류, 요청 기록/캐시 데우기를 끕니다: {e}"); self.record_requests = warmer_enabled = False
+        if self.cache_warmer: self.cache_warmer.stop(); self.cache_warmer = None
+        if not warmer_enabled: return
+        if self.popularity_log is None: self.popularity_log = PopularityLog()
+        self.cache_warmer = CacheWarmer(self.popularity_log, self.item_prefetcher.warm, is_idle=lambda: self.worker is None, top_n=max(1, top_n), interval_seconds=max(10, interval_seconds))
+        self.cache_warmer.start()
+
+    def _record_guide_request(self, item_query, char_class, ascendancy, league_mode, league_season, llm, has_notes): # 익명 인기 요청 기록 (매핑 테이블에 있는 아이템만 식별자로)
+        if not (self.record_requests or self.cache_warmer): return
+        if self.popularity_log is None: self.popularity_log = PopularityLog() # 처음 기록할 때 연다 (창 생성 시간에 넣지 않음)
+        poedb_id = self.item_prefetcher.resolve_prefetch_key(item_query)
+        self.popularity_log.record(poedb_id if poedb_id and not poedb_id.startswith("http") else None, char_class, ascendancy, league_mode, league_season, llm, has_notes=has_notes)
+
     def settings_updated_actions(self): # 이전과 동일
         self._load_app_config(); print("LLM 모델 설정이 앱에 다시 로드되었습니다.")
 
@@ -258,6 +745,8 @@ class PoEPlannerApp(QWidget):
         item_input_hbox = QHBoxLayout(); lbl_item_input = QLabel('아이템 이름/URL (선택):'); lbl_item_input.setFixedWidth(160)
         self.edit_item_input = QLineEdit(); self.edit_item_input.setPlaceholderText("아이템 지정 시 입력, 없으면 일반 가이드")
         self.edit_item_input.returnPressed.connect(self.generate_guide_action)
+        self.prefetch_debounce_timer = QTimer(self); self.prefetch_debounce_timer.setSingleShot(True); self.prefetch_debounce_timer.setInterval(500) # 입력이 멈추고 0.5초 뒤에 미리 가져오기
+        self.prefetch_debounce_timer.timeout.connect(self.prefetch_item_from_input); self.edit_item_input.textChanged.connect(self.prefetch_debounce_timer.start)
         item_input_hbox.addWidget(lbl_item_input); item_input_hbox.addWidget(self.edit_item_input); top_controls_layout.addLayout(item_input_hbox)
         class_asc_hbox = QHBoxLayout(); base_class_vbox = QVBoxLayout(); lbl_base_class_select = QLabel('기본 클래스:')
         self.combo_base_class = QComboBox(); self.combo_base_class.addItems(self.BASE_CLASSES); self.combo_base_class.currentTextChanged.connect(self.update_ascendancy_combo); base_class_vbox.addWidget(lbl_base_class_select); base_class_vbox.addWidget(self.combo_base_class); class_asc_hbox.addLayout(base_class_vbox)
@@ -266,7 +755,7 @@ class PoEPlannerApp(QWidget):
         mid_controls_hbox = QHBoxLayout(); league_mode_vbox = QVBoxLayout(); lbl_league_mode = QLabel('리그 유형:'); self.combo_league_mode = QComboBox(); self.combo_league_mode.addItems(self.LEAGUE_MODES); self.combo_league_mode.setCurrentText("소프트코어"); league_mode_vbox.addWidget(lbl_league_mode); league_mode_vbox.addWidget(self.combo_league_mode); mid_controls_hbox.addLayout(league_mode_vbox)
         league_season_vbox = QVBoxLayout(); lbl_league_season = QLabel('리그 종류:')
         self.combo_league_season = QComboBox()
-        dynamic_league_seasons = [f"{self.fetched_current_league_name} (현재)" if self.fetched_current_league_name != "시즌" else "시즌 (자동로드 실패)", "스탠다드"]
+        dynamic_league_seasons = [self._current_league_combo_text(), "스탠다드"]
         self.combo_league_season.addItems(dynamic_league_seasons); self.combo_league_season.setCurrentIndex(0)
         league_season_vbox.addWidget(lbl_league_season); league_season_vbox.addWidget(self.combo_league_season); mid_controls_hbox.addLayout(league_season_vbox)
         llm_select_vbox = QVBoxLayout(); lbl_llm_select = QLabel('사용 LLM:'); self.combo_llm_select = QComboBox()
@@ -276,13 +765,19 @@ class PoEPlannerApp(QWidget):
         main_vbox.addLayout(mid_controls_hbox)
         bottom_buttons_hbox = QHBoxLayout(); self.btn_settings = QPushButton('LLM 모델 설정'); self.btn_settings.setFixedHeight(40); self.btn_settings.clicked.connect(self.open_settings_dialog); bottom_buttons_hbox.addWidget(self.btn_settings)
         self.btn_load_snapshot = QPushButton('스냅샷 불러오기'); self.btn_load_snapshot.setFixedHeight(40); self.btn_load_snapshot.clicked.connect(self.load_snapshot_action); bottom_buttons_hbox.addWidget(self.btn_load_snapshot)
+        self.btn_snapshot_library = QPushButton('스냅샷 라이브러리'); self.btn_snapshot_library.setFixedHeight(40); self.btn_snapshot_library.clicked.connect(self.open_snapshot_library_dialog); bottom_buttons_hbox.addWidget(self.btn_snapshot_library)
+        self.btn_mod_search = QPushButton('옵션으로 아이템 찾기'); self.btn_mod_search.setFixedHeight(40); self.btn_mod_search.clicked.connect(self.open_mod_search_dialog); bottom_buttons_hbox.addWidget(self.btn_mod_search)
         self.btn_save_snapshot = QPushButton('현재 내용 스냅샷 저장'); self.btn_save_snapshot.setFixedHeight(40); self.btn_save_snapshot.clicked.connect(self.save_snapshot_action); self.btn_save_snapshot.setEnabled(False); bottom_buttons_hbox.addWidget(self.btn_save_snapshot)
         self.btn_save_pdf = QPushButton('가이드 PDF로 저장'); self.btn_save_pdf.setFixedHeight(40); self.btn_save_pdf.clicked.connect(self.save_guide_as_pdf); self.btn_save_pdf.setEnabled(False); bottom_buttons_hbox.addWidget(self.btn_save_pdf)
         main_vbox.addLayout(bottom_buttons_hbox)
-        self.btn_generate_guide = QPushButton('빌드 가이드 생성'); self.btn_generate_guide.setFixedHeight(50); self.btn_generate_guide.clicked.connect(self.generate_guide_action); main_vbox.addWidget(self.btn_generate_guide)
+        generate_buttons_hbox = QHBoxLayout()
+        self.btn_generate_guide = QPushButton('빌드 가이드 생성'); self.btn_generate_guide.setFixedHeight(50); self.btn_generate_guide.clicked.connect(self.generate_guide_action); generate_buttons_hbox.addWidget(self.btn_generate_guide, 1)
+        self.btn_cancel_guide = QPushButton('작업 취소'); self.btn_cancel_guide.setFixedHeight(50); self.btn_cancel_guide.clicked.connect(self.cancel_guide_action); self.btn_cancel_guide.setEnabled(False); generate_buttons_hbox.addWidget(self.btn_cancel_guide)
+        main_vbox.addLayout(generate_buttons_hbox)
         lbl_guide_output = QLabel('LLM 생성 가이드:'); main_vbox.addWidget(lbl_guide_output)
         self.browser_guide_output = QTextBrowser(); self.browser_guide_output.setPlaceholderText("아이템(선택), 클래스, 리그 등을 선택하고 버튼을 누르세요...")
         self.browser_guide_output.setOpenExternalLinks(True); main_vbox.addWidget(self.browser_guide_output, 1)
+        self.guide_renderer = GuideRenderer(self.browser_guide_output) # 헤더만 따로 갱신 + 본문 점진 추가 (초당 30회 제한)
         lbl_user_notes = QLabel('나만의 빌드 노트:'); main_vbox.addWidget(lbl_user_notes)
         self.edit_user_notes = QTextEdit(); self.edit_user_notes.setPlaceholderText("LLM 가이드에 대한 보충 설명, 아이디어, 수정 계획 등을 기록하세요...") 
         self.edit_user_notes.setFixedHeight(150); main_vbox.addWidget(self.edit_user_notes, 0)
@@ -294,6 +789,7 @@ class PoEPlannerApp(QWidget):
         else: self.combo_ascendancy_class.addItem("기본 클래스 오류"); self.combo_ascendancy_class.setEnabled(False)
 
     def check_api_keys(self): # 이전과 동일
+        if self.guide_server: return # 가이드 서버를 쓰면 API 키는 서버 쪽에 있음
         chatgpt_key = load_api_key('OPENAI'); gemini_key = load_api_key('GEMINI'); missing_keys = []
         if not chatgpt_key: missing_keys.append("OpenAI")
         if not gemini_key: missing_keys.append("Gemini")
@@ -307,45 +803,77 @@ class PoEPlannerApp(QWidget):
         selected_base_class = self.combo_base_class.currentText(); selected_ascendancy = ""
         if self.combo_ascendancy_class.isEnabled() and self.combo_ascendancy_class.currentText() not in ["전직 선택 안함", "전직 정보 없음"]: selected_ascendancy = self.combo_ascendancy_class.currentText()
         selected_league_mode = self.combo_league_mode.currentText(); selected_league_season_display = self.combo_league_season.currentText()
-        actual_league_name_for_worker = self.fetched_current_league_name.split(" (")[0] if "(현재)" in selected_league_season_display else ("시즌" if "자동로드 실패" in selected_league_season_display else selected_league_season_display)
+        actual_league_name_for_worker = self.fetched_current_league_name.split(" (")[0] if "(현재)" in selected_league_season_display else ("시즌" if ("자동로드 실패" in selected_league_season_display or "불러오는 중" in selected_league_season_display) else selected_league_season_display)
         if selected_base_class == "클래스 선택 안함" and not item_query: QMessageBox.information(self, "선택 필요", "아이템 미입력 시, 최소 '기본 클래스' 선택 필요."); return
         
         user_notes_content = self.edit_user_notes.toPlainText().strip() # 사용자 노트 내용 가져오기!
 
-        self.btn_generate_guide.setEnabled(False); self.btn_save_pdf.setEnabled(False); self.btn_save_snapshot.setEnabled(False)
+        self.btn_generate_guide.setEnabled(False); self.btn_save_pdf.setEnabled(False); self.btn_save_snapshot.setEnabled(False); self.btn_cancel_guide.setEnabled(True)
         
         query_display_name = f"'{item_query}'" if item_query else "(아이템 미지정)"; class_info_for_msg = selected_base_class; 
         if selected_ascendancy: class_info_for_msg += f" ({selected_ascendancy})"
         if selected_base_class == "클래스 선택 안함": class_info_for_msg = "클래스 미지정"
         league_info_for_msg = f"{actual_league_name_for_worker} {selected_league_mode}"
         current_model_id_for_display = chatgpt_model_to_use if llm_type_to_use == "ChatGPT" else gemini_model_to_use
-        self.browser_guide_output.setMarkdown(f"{query_display_name} ({class_info_for_msg}, {league_info_for_msg}, {llm_type_to_use}: {current_model_id_for_display} 사용) 가이드 생성 요청 접수... (0%)") 
-        QCoreApplication.processEvents()
-
-        self.thread = QThread()
-        self.worker = GuideWorker(item_query, llm_type_to_use, 
-                                  selected_base_class, selected_ascendancy,
-                                  selected_league_mode, actual_league_name_for_worker,
-                                  chatgpt_model_to_use, gemini_model_to_use,
-                                  user_notes_content) # 사용자 노트 내용 전달!
-        self.worker.moveToThread(self.thread); self.thread.started.connect(self.worker.run); self.worker.progress.connect(self.update_guide_progress); self.worker.finished.connect(self.handle_guide_finished)
+        if self.guide_server: current_model_id_for_display = "가이드 서버 설정 모델"
+        self.guide_renderer.clear(); self.streamed_guide_parts = []
+        self.guide_renderer.set_header(f"{query_display_name} ({class_info_for_msg}, {league_info_for_msg}, {llm_type_to_use}: {current_model_id_for_display} 사용) 가이드 생성 요청 접수... (0%)") 
+
+        self.thread = QThread(self) # 부모를 지정해 둬야 self.thread = None 이후에도 quit 완료 전까지 객체가 살아있음
+        worker_args = (item_query, llm_type_to_use, 
+                       selected_base_class, selected_ascendancy,
+                       selected_league_mode, actual_league_name_for_worker,
+                       chatgpt_model_to_use, gemini_model_to_use,
+                       user_notes_content) # 사용자 노트 내용 전달!
+        self.worker = RemoteGuideWorker(self.guide_server, *worker_args) if self.guide_server else GuideWorker(*worker_args, item_prefetcher=self.item_prefetcher)
+        self._record_guide_request(item_query, selected_base_class, selected_ascendancy, selected_league_mode, actual_league_name_for_worker, llm_type_to_use, bool(user_notes_content))
+        self.guide_renderer.set_trace(self.worker.trace) # 스트리밍 중 렌더링도 이 요청의 트레이스에 기록
+        self.worker.moveToThread(self.thread); self.thread.started.connect(self.worker.run); self.worker.progress.connect(self.update_guide_progress); self.worker.guide_chunk.connect(self.append_guide_chunk); self.worker.finished.connect(self.handle_guide_finished)
         self.worker.finished.connect(self.thread.quit); self.worker.finished.connect(self.worker.deleteLater); self.thread.finished.connect(self.thread.deleteLater); self.thread.start()
 
+    def cancel_guide_action(self): # 진행 중인 크롤링/LLM 호출을 즉시 끊음
+        if self.worker:
+            self.btn_cancel_guide.setEnabled(False)
+            self.guide_renderer.set_header("**작업 취소 중...**")
+            self.worker.cancel()
+
+    def prefetch_item_from_input(self): # 디바운스된 입력으로 아이템 정보를 백그라운드에서 미리 가져옴
+        self.item_prefetcher.prefetch(self.edit_item_input.text())
+
+    def _fetch_item_for_prefetch(self, key, cancel_token): # 가이드 서버를 쓰면 서버 캐시를 미리 데우는 용도 (가이드 생성도 서버가 하므로)
+        if self.guide_server: return self.guide_server.fetch_item(key, cancel_token=cancel_token)
+        from crawler import get_item_details_from_poedb
+        return get_item_details_from_poedb(key, cancel_token=cancel_token)
+
+    def closeEvent(self, event): # 창을 닫을 때 진행 중인 작업도 함께 취소
+        if self.worker: self.worker.cancel()
+        if self.snapshot_load_worker is not None: self.snapshot_load_worker.cancel_token.cancel()
+        if self.pdf_thread and self.pdf_thread.isRunning(): self.pdf_thread.wait() # 쓰다 만 PDF가 남지 않도록 저장 중인 파일은 끝까지 쓴다
+        if self.cache_warmer: self.cache_warmer.stop()
+        self.item_prefetcher.shutdown(); shutdown_metrics_exporters() # 덤프 파일은 마지막 값으로 한 번 더 쓴다
+        super().closeEvent(event)
+
     def update_guide_progress(self, percentage, message_text): # 이전과 동일
-        self.browser_guide_output.setMarkdown(f"**{message_text} ({percentage}%)**\n\n(다른 작업을 계속할 수 있습니다...)")
-        QCoreApplication.processEvents()
+        self.guide_renderer.set_header(f"**{message_text} ({percentage}%)**\n\n(다른 작업을 계속할 수 있습니다...)") # 본문(스트리밍 중인 가이드)은 그대로 두고 헤더만 갱신
+
+    def append_guide_chunk(self, chunk_text): # LLM 스트리밍 조각을 본문 끝에 이어 붙임
+        self.streamed_guide_parts.append(chunk_text); self.guide_renderer.append_body(chunk_text)
+
+    def _populate_inputs_from_snapshot(self, snapshot_data): # 입력칸/콤보박스만 (헤더 dict로도 됨). (리그 시즌, LLM 이름)을 돌려준다
+        inputs = snapshot_data.get("query_inputs", {}) or {}; self.edit_item_input.setText(inputs.get("item_input_text", "")); self.combo_base_class.setCurrentText(inputs.get("base_class", self.BASE_CLASSES[0])); QCoreApplication.processEvents(); self.combo_ascendancy_class.setCurrentText(inputs.get("ascendancy_class", "")); self.combo_league_mode.setCurrentText(inputs.get("league_mode", self.LEAGUE_MODES[0]))
+        loaded_league_season = inputs.get("league_season", self.fetched_current_league_name.split(" (")[0]); season_to_select = ""; 
+        for i in range(self.combo_league_season.count()):
+            if loaded_league_season in self.combo_league_season.itemText(i): season_to_select = self.combo_league_season.itemText(i); break
+        if season_to_select: self.combo_league_season.setCurrentText(season_to_select)
+        else: self.combo_league_season.setCurrentIndex(0)
+        saved_llm_name = inputs.get("selected_llm", "ChatGPT")
+        if saved_llm_name == "Gemini": self.combo_llm_select.setCurrentIndex(1) 
+        else: self.combo_llm_select.setCurrentIndex(0)
+        return loaded_league_season, saved_llm_name
 
     def _populate_ui_from_snapshot_data(self, snapshot_data): # 이전과 동일 (user_notes_text 복원 포함)
         try:
-            inputs = snapshot_data.get("query_inputs", {}); self.edit_item_input.setText(inputs.get("item_input_text", "")); self.combo_base_class.setCurrentText(inputs.get("base_class", self.BASE_CLASSES[0])); QCoreApplication.processEvents(); self.combo_ascendancy_class.setCurrentText(inputs.get("ascendancy_class", "")); self.combo_league_mode.setCurrentText(inputs.get("league_mode", self.LEAGUE_MODES[0]))
-            loaded_league_season = inputs.get("league_season", self.fetched_current_league_name.split(" (")[0]); season_to_select = ""; 
-            for i in range(self.combo_league_season.count()):
-                if loaded_league_season in self.combo_league_season.itemText(i): season_to_select = self.combo_league_season.itemText(i); break
-            if season_to_select: self.combo_league_season.setCurrentText(season_to_select)
-            else: self.combo_league_season.setCurrentIndex(0)
-            saved_llm_name = inputs.get("selected_llm", "ChatGPT")
-            if saved_llm_name == "Gemini": self.combo_llm_select.setCurrentIndex(1) 
-            else: self.combo_llm_select.setCurrentIndex(0)
+            inputs = snapshot_data.get("query_inputs", {}); loaded_league_season, saved_llm_name = self._populate_inputs_from_snapshot(snapshot_data)
             self.current_item_query = inputs.get("item_input_text", ""); self.current_item_data = snapshot_data.get("crawled_item_data", {}); self.current_char_class = inputs.get("base_class", self.BASE_CLASSES[0]); self.current_ascendancy = inputs.get("ascendancy_class", ""); self.current_league_mode = inputs.get("league_mode", self.LEAGUE_MODES[0]); self.current_league_season = loaded_league_season; self.current_selected_llm = saved_llm_name; self.current_guide_text = snapshot_data.get("generated_guide_text_markdown", "")
             self.current_user_notes = snapshot_data.get("user_notes_text", ""); self.edit_user_notes.setPlainText(self.current_user_notes) 
             self._display_loaded_guide(); self.btn_save_pdf.setEnabled(bool(self.current_guide_text.strip())); self.btn_save_snapshot.setEnabled(bool(self.current_guide_text.strip()) or (self.current_item_data and self.current_item_data.get('notice') == 'no_item_specified')); return True
@@ -366,10 +894,10 @@ class PoEPlannerApp(QWidget):
         elif item_info.get('notice') == 'mapper_failed': summary_body += "**알림:** 아이템 상세 정보를 찾지 못해, 이름 기반으로 추론합니다.\n"
         elif item_info.get('notice') == 'no_item_specified' and self.current_item_query: summary_body = f"**알림:** '{self.current_item_query}' 아이템 정보를 찾을 수 없었습니다.\n"
         elif item_info.get('notice') == 'no_item_specified': summary_body = "**알림:** 특정 아이템 없이 일반적인 빌드 가이드를 요청한 결과입니다.\n"
-        final_markdown_output = title_line + summary_body + f"\n---\n### {used_llm} 생성 가이드 (스냅샷에서 불러옴)\n---\n" + guide_text; self.browser_guide_output.setMarkdown(final_markdown_output)
+        header_markdown = title_line + summary_body + f"\n---\n### {used_llm} 생성 가이드 (스냅샷에서 불러옴)\n---\n"; self.guide_renderer.show(header_markdown, guide_text)
 
     def handle_guide_finished(self, status, result_data): # 새 가이드 생성 시 노트 초기화
-        item_name_for_title = self.worker.item_query if self.worker and self.worker.item_query else "(아이템 미지정)"
+        item_name_for_title = self.worker.item_query if self.worker and self.worker.item_query else "(아이템 미지정)"; trace = self.worker.trace if self.worker else NULL_TRACE
         if isinstance(result_data, dict):
             self.current_item_query = self.worker.item_query if self.worker else ""; self.current_item_data = result_data.get('item_info', {})
             self.current_char_class = result_data.get('char_class', "클래스 선택 안함"); self.current_ascendancy = result_data.get('ascendancy', "")
@@ -401,54 +929,152 @@ class PoEPlannerApp(QWidget):
             elif item_info.get('notice') == 'mapper_failed': summary_body += "**알림:** 아이템 상세 정보를 찾지 못해, 이름 기반으로 추론합니다.\n"
             elif item_info.get('notice') == 'no_item_specified' and self.current_item_query: summary_body = f"**알림:** '{self.current_item_query}' 아이템 정보를 찾을 수 없었습니다.\n"
             elif item_info.get('notice') == 'no_item_specified': summary_body = "**알림:** 특정 아이템 없이 일반적인 빌드 가이드를 요청한 결과입니다.\n"
-            final_markdown_output = title_line + summary_body + f"\n---\n### {used_llm} 생성 가이드 (완료!)\n---\n" + guide_text
-            self.browser_guide_output.setMarkdown(final_markdown_output)
+            header_markdown = title_line + summary_body + f"\n---\n### {used_llm} 생성 가이드 (완료!)\n---\n"
+            if "".join(self.streamed_guide_parts) == guide_text: self.guide_renderer.set_header(header_markdown); self.guide_renderer.finish() # 본문은 이미 스트리밍으로 그려짐
+            else: self.guide_renderer.show(header_markdown, guide_text)
+            self.guide_renderer.notify_when_rendered(lambda: self._finish_guide_request(trace, status)) # 트레이스/렌더 시간 기록은 화면에 다 그린 뒤
             QMessageBox.information(self, "가이드 생성 완료", f"'{item_name_for_title}' 가이드 생성이 완료되었습니다.")
             self.btn_save_pdf.setEnabled(True); self.btn_save_snapshot.setEnabled(True)
 
         else: # 실패 또는 취소 시
             self.btn_save_pdf.setEnabled(False); self.btn_save_snapshot.setEnabled(False)
-            # ... (오류 메시지 final_markdown_output 구성은 이전과 동일)
-        self.btn_generate_guide.setEnabled(True); self.thread = None; self.worker = None
+            if status == "cancelled": self.guide_renderer.show(f"**{result_data}**", "")
+            elif isinstance(result_data, str): self.guide_renderer.show(f"**오류 ({status}):** {result_data}", "")
+            self._finish_guide_request(trace, status)
+        self.btn_generate_guide.setEnabled(True); self.btn_cancel_guide.setEnabled(False); self.thread = None; self.worker = None
 
-    def save_guide_as_pdf(self): # ... (이전과 동일) ...
-        pass
+    def _finish_guide_request(self, trace, status): # 렌더링 시간을 지표에 넣고, 요청 트레이스를 닫아 (켜져 있으면) 파일로 저장
+        if status == "success": STAGE_SECONDS.observe(self.guide_renderer.stats['total_ms'] / 1000, stage='render')
+        if self.guide_renderer.trace is trace: self.guide_renderer.set_trace(None)
+        trace.finish(status)
+
+    def _current_snapshot_data(self, user_notes_text): # 현재 화면 내용을 스냅샷 dict로 (스냅샷 저장, PDF 저장에서 공용)
+        return { "snapshot_version": SNAPSHOT_VERSION, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "query_inputs": { "item_input_text": self.current_item_query, "base_class": self.current_char_class, "ascendancy_class": self.current_ascendancy, "league_mode": self.current_league_mode, "league_season": self.current_league_season, "selected_llm": self.current_selected_llm  }, "crawled_item_data": self.current_item_data if self.current_item_data else {'name': '(아이템 지정 안함)', 'type': '', 'mods': [], 'url': None, 'notice': 'no_item_specified'}, "generated_guide_text_markdown": self.current_guide_text, "user_notes_text": user_notes_text }
+
+    def _default_export_basename(self): # 저장 대화상자 기본 파일 이름 (아이템_클래스_전직_리그_유형)
+        item_name = self.current_item_query.replace(" ", "_").replace("/", "_").replace(":", "_"); safe_item_name = "".join(c if c.isalnum() or c in ['_', '-'] else '_' for c in item_name); safe_item_name = safe_item_name if safe_item_name else ("아이템없음" if self.current_item_query else "일반가이드"); base_class = self.current_char_class.split(" (")[0]; base_class = "모든클래스" if base_class == "클래스 선택 안함" else base_class; asc_class_raw = self.current_ascendancy; asc_class = "_" + asc_class_raw.split(" (")[0] if asc_class_raw and asc_class_raw not in ["전직 선택 안함", "전직 정보 없음", ""] else ""; league_season_for_filename = self.current_league_season.split(" (")[0].replace(" ", "_") if self.current_league_season else "시즌"
+        return f"{safe_item_name}_{base_class}{asc_class}_{league_season_for_filename}_{self.current_league_mode}"
+
+    def save_guide_as_pdf(self): # PDF는 일꾼 스레드에서 별도 QTextDocument로 그림 (긴 가이드도 창이 멈추지 않음)
+        if not self.current_guide_text.strip(): QMessageBox.information(self, "저장할 내용 없음", "PDF로 저장할 가이드가 없습니다."); return
+        if self.pdf_thread and self.pdf_thread.isRunning(): QMessageBox.information(self, "알림", "PDF 저장이 이미 진행 중입니다."); return
+        file_path, _ = QFileDialog.getSaveFileName(self, "가이드 PDF로 저장", f"{self._default_export_basename()}_가이드.pdf", "PDF 파일 (*.pdf)")
+        if not file_path: return
+        if not file_path.lower().endswith(".pdf"): file_path += ".pdf"
+        markdown_snapshot = self._current_snapshot_data(self.edit_user_notes.toPlainText())
+        self.btn_save_pdf.setEnabled(False); self.btn_save_pdf.setText('PDF 저장 중...')
+        self.pdf_thread = QThread(self); self.pdf_worker = PdfExportWorker(markdown_snapshot, file_path)
+        self.pdf_worker.moveToThread(self.pdf_thread); self.pdf_thread.started.connect(self.pdf_worker.run)
+        self.pdf_worker.finished.connect(self.handle_pdf_finished); self.pdf_worker.finished.connect(self.pdf_thread.quit); self.pdf_worker.finished.connect(self.pdf_worker.deleteLater)
+        self.pdf_thread.start()
+
+    def handle_pdf_finished(self, result, error_message):
+        self.btn_save_pdf.setText('가이드 PDF로 저장'); self.btn_save_pdf.setEnabled(bool(self.current_guide_text.strip())); self.pdf_worker = None
+        if error_message: QMessageBox.critical(self, "PDF 저장 오류", error_message); return
+        print(f"PDF 저장: {result['pages']}쪽, 레이아웃 {result['layout_ms']:.0f}ms, 쪽당 최대 {max(result['page_ms'] or [0]):.1f}ms, 전체 {result['total_ms']:.0f}ms")
+        QMessageBox.information(self, "PDF 저장 완료", f"가이드 PDF 저장 완료 ({result['pages']}쪽):\n{result['output_path']}")
     def save_snapshot_action(self): # 사용자 노트 저장 추가! (이전과 동일)
         user_notes_to_save = self.edit_user_notes.toPlainText() # 현재 UI의 노트 내용을 가져옴!
         # ... (나머지 스냅샷 데이터 구성 및 저장은 이전 v1.3 코드와 동일하게 user_notes_to_save 포함)
         can_save = bool(self.current_guide_text.strip()); 
         if not can_save and self.current_item_data and self.current_item_data.get('notice') == 'no_item_specified' and self.current_char_class and self.current_char_class != "클래스 선택 안함": can_save = True
         if not can_save: QMessageBox.information(self, "저장할 내용 부족", "유효한 가이드 또는 (클래스 선택된) 일반 가이드 요청이 없어 스냅샷 저장 불가."); return
-        snapshot_data = { "snapshot_version": "1.3", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "query_inputs": { "item_input_text": self.current_item_query, "base_class": self.current_char_class, "ascendancy_class": self.current_ascendancy, "league_mode": self.current_league_mode, "league_season": self.current_league_season, "selected_llm": self.current_selected_llm  }, "crawled_item_data": self.current_item_data if self.current_item_data else {'name': '(아이템 지정 안함)', 'type': '', 'mods': [], 'url': None, 'notice': 'no_item_specified'}, "generated_guide_text_markdown": self.current_guide_text, "user_notes_text": user_notes_to_save }; item_name = self.current_item_query.replace(" ", "_").replace("/", "_").replace(":", "_"); safe_item_name = "".join(c if c.isalnum() or c in ['_', '-'] else '_' for c in item_name); safe_item_name = safe_item_name if safe_item_name else ("아이템없음" if self.current_item_query else "일반가이드"); base_class = self.current_char_class.split(" (")[0]; base_class = "모든클래스" if base_class == "클래스 선택 안함" else base_class; asc_class_raw = self.current_ascendancy; asc_class = "_" + asc_class_raw.split(" (")[0] if asc_class_raw and asc_class_raw not in ["전직 선택 안함", "전직 정보 없음", ""] else ""; league_season_for_filename = self.current_league_season.split(" (")[0].replace(" ", "_") if self.current_league_season else "시즌"; default_filename = f"{safe_item_name}_{base_class}{asc_class}_{league_season_for_filename}_{self.current_league_mode}_스냅샷.json"; options = QFileDialog.Options(); file_path, _ = QFileDialog.getSaveFileName(self, "빌드 스냅샷 저장", default_filename, "JSON 파일 (*.json);;모든 파일 (*)", options=options)
+        snapshot_data = self._current_snapshot_data(user_notes_to_save); default_filename = f"{self._default_export_basename()}_스냅샷{COMPACT_SNAPSHOT_EXTENSION}"; options = QFileDialog.Options(); standalone_filter = f"독립 압축 스냅샷 - 공유용 (*{COMPACT_SNAPSHOT_EXTENSION})"; file_path, selected_filter = QFileDialog.getSaveFileName(self, "빌드 스냅샷 저장", default_filename, f"압축 스냅샷 - 중복 제거 저장소 사용 (*{COMPACT_SNAPSHOT_EXTENSION});;{standalone_filter};;JSON 파일 (1.3 호환) (*.json);;모든 파일 (*)", options=options)
         if file_path: 
-            if not file_path.lower().endswith(".json"): file_path += ".json"
+            if not file_path.lower().endswith(SNAPSHOT_FILE_EXTENSIONS): file_path += COMPACT_SNAPSHOT_EXTENSION # 확장자로 형식 결정 (.poesnap 압축 / .json 1.3)
             try:
-                with open(file_path, 'w', encoding='utf-8') as f: json.dump(snapshot_data, f, ensure_ascii=False, indent=4)
+                blob_store = None
+                if selected_filter != standalone_filter and file_path.lower().endswith(COMPACT_SNAPSHOT_EXTENSION): # 아이템 상세/가이드 본문은 blob 저장소에 한 번만 저장 (2.1)
+                    from blob_store import get_default_blob_store
+                    blob_store = get_default_blob_store()
+                written_version = write_snapshot(file_path, snapshot_data, blob_store=blob_store); self._index_snapshot_in_library(file_path, {**snapshot_data, 'snapshot_version': written_version}) # 색인에는 실제로 쓴 버전 (1.3 / 2.0 / 2.1)
                 QMessageBox.information(self, "저장 완료", f"빌드 스냅샷 저장 완료:\n{file_path}")
             except Exception as e: QMessageBox.critical(self, "저장 오류", f"스냅샷 저장 중 오류 발생:\n{e}")
         else: QMessageBox.information(self, "저장 취소됨", "스냅샷 저장이 취소되었습니다.")
 
 
-    def load_snapshot_action(self): # 이전과 동일 (_populate_ui_from_snapshot_data가 노트 복원)
-        # ... (이전 전체 코드 답변에서 이 부분을 복사해서 사용하면 되네)
-        options = QFileDialog.Options(); file_path, _ = QFileDialog.getOpenFileName(self, "빌드 스냅샷 불러오기", "", "JSON 파일 (*.json);;모든 파일 (*)", options=options)
-        if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f: snapshot_data = json.load(f)
-                if not isinstance(snapshot_data, dict): QMessageBox.warning(self, "파일 형식 오류", "선택한 파일의 내용이 올바른 스냅샷 형식이 아닙니다."); return
-                supported_versions = ["1.1", "1.2", "1.3"] 
-                if snapshot_data.get("snapshot_version") not in supported_versions: QMessageBox.warning(self, "호환되지 않는 스냅샷", f"선택한 스냅샷 버전({snapshot_data.get('snapshot_version')})이 호환되지 않거나 필수 정보가 누락되었습니다.\n지원 버전: {', '.join(supported_versions)}"); return
-                if self._populate_ui_from_snapshot_data(snapshot_data): QMessageBox.information(self, "불러오기 완료", f"스냅샷을 성공적으로 불러왔습니다:\n{file_path}")
-                else: print("스냅샷 데이터로 UI 복원 중 문제가 발생했습니다 (세부 오류는 함수 내부 확인).")
-            except FileNotFoundError: QMessageBox.critical(self, "파일 오류", "선택한 파일을 찾을 수 없습니다.")
-            except json.JSONDecodeError: QMessageBox.critical(self, "파일 오류", "선택한 파일이 올바른 JSON 형식이 아닙니다.")
-            except Exception as e: QMessageBox.critical(self, "불러오기 오류", f"스냅샷 불러오는 중 오류 발생:\n{e}")
-        else: QMessageBox.information(self, "불러오기 취소됨", "스냅샷 불러오기가 취소되었습니다.")
+    def load_snapshot_action(self): # 파일 읽기/압축 풀기/검사는 SnapshotLoadWorker가 (여러 개를 고르면 새 창의 탭으로 비교)
+        options = QFileDialog.Options(); file_paths, _ = QFileDialog.getOpenFileNames(self, "빌드 스냅샷 불러오기 (여러 개를 고르면 탭으로 비교)", "", f"스냅샷 파일 (*{COMPACT_SNAPSHOT_EXTENSION} *.json);;모든 파일 (*)", options=options)
+        if not file_paths: QMessageBox.information(self, "불러오기 취소됨", "스냅샷 불러오기가 취소되었습니다."); return
+        if len(file_paths) > 1: self.open_snapshots_in_tabs(file_paths)
+        else: self._start_snapshot_load(file_paths[0], announce=True)
+
+    def _start_snapshot_load(self, file_path, announce=False): # 메인 화면으로 불러오기: 헤더가 읽히면 입력칸부터 채우고, 본문은 다 읽힌 뒤 GuideRenderer가 나눠 그림
+        if self.snapshot_load_worker is not None: self.snapshot_load_worker.cancel_token.cancel() # 나중에 고른 스냅샷이 이긴다
+        worker = SnapshotLoadWorker([file_path]); thread = QThread(self)
+        self.snapshot_load_worker = worker; self.snapshot_load_previous = None; self.snapshot_load_announce = announce
+        worker.moveToThread(thread); thread.started.connect(worker.run)
+        worker.header_loaded.connect(lambda index, path, header_data, worker=worker: self._on_snapshot_header_loaded(worker, header_data))
+        worker.loaded.connect(lambda index, path, snapshot_data, worker=worker: self._on_snapshot_loaded(worker, path, snapshot_data))
+        worker.failed.connect(lambda index, path, title, message, worker=worker: self._on_snapshot_load_failed(worker, title, message))
+        worker.finished.connect(thread.quit); worker.finished.connect(worker.deleteLater); thread.finished.connect(thread.deleteLater)
+        self.btn_load_snapshot.setEnabled(False); worker.finished.connect(lambda worker=worker: self.btn_load_snapshot.setEnabled(True) if worker is self.snapshot_load_worker else None)
+        self.guide_renderer.show(f"**스냅샷 불러오는 중...** {os.path.basename(file_path)}\n", "")
+        thread.start()
+
+    def _on_snapshot_header_loaded(self, worker, header_data):
+        if worker is not self.snapshot_load_worker: return # 그 사이 다른 스냅샷을 골랐음
+        self.snapshot_load_previous = self._current_snapshot_data(self.edit_user_notes.toPlainText()) # 본문에서 실패하면 입력칸을 되돌릴 값
+        header_markdown, _ = snapshot_markdown_parts(header_data); self.guide_renderer.show(header_markdown + "\n**가이드 본문을 불러오는 중...**\n", "")
+        self._populate_inputs_from_snapshot(header_data) # 안에서 processEvents를 부르므로 본문 완료 신호가 여기서 먼저 처리될 수 있다 (그래서 임시 헤더를 먼저 그림)
+
+    def _on_snapshot_loaded(self, worker, file_path, snapshot_data):
+        if worker is not self.snapshot_load_worker: return
+        self.snapshot_load_worker = None; self.btn_load_snapshot.setEnabled(True)
+        if self._populate_ui_from_snapshot_data(snapshot_data):
+            self._index_snapshot_in_library(file_path, snapshot_data)
+            if self.snapshot_load_announce: QMessageBox.information(self, "불러오기 완료", f"스냅샷을 성공적으로 불러왔습니다:\n{file_path}")
+        else: print("스냅샷 데이터로 UI 복원 중 문제가 발생했습니다 (세부 오류는 함수 내부 확인).")
+
+    def _on_snapshot_load_failed(self, worker, title, message):
+        if worker is not self.snapshot_load_worker: return
+        self.snapshot_load_worker = None; self.btn_load_snapshot.setEnabled(True)
+        if self.snapshot_load_previous is not None: self._populate_inputs_from_snapshot(self.snapshot_load_previous) # 헤더로 바꾼 입력칸을 되돌림
+        if self.current_guide_text: self._display_loaded_guide() # 원래 보던 가이드를 다시 표시
+        else: self.guide_renderer.show(f"**{title}**", "")
+        if title == "호환되지 않는 스냅샷": QMessageBox.warning(self, title, message)
+        else: QMessageBox.critical(self, title, message)
+
+    def open_snapshots_in_tabs(self, file_paths): # 여러 스냅샷을 동시에 불러와 새 창의 탭으로
+        window = SnapshotTabsWindow(self, file_paths); window.loaded.connect(self._index_snapshot_in_library); window.show()
+
+    def _get_snapshot_library(self):
+        if self.snapshot_library is None:
+            from snapshot_library import SnapshotLibrary
+            self.snapshot_library = SnapshotLibrary()
+        return self.snapshot_library
+
+    def _index_snapshot_in_library(self, file_path, snapshot_data): # 저장/불러온 스냅샷을 라이브러리 색인에 반영 (실패해도 저장 자체는 성공)
+        try: self._get_snapshot_library().add_snapshot(file_path, snapshot_data)
+        except Exception as e: print(f"경고: 스냅샷 라이브러리 색인 실패 ({file_path}): {e}")
+
+    def open_snapshot_library_dialog(self):
+        try: library = self._get_snapshot_library()
+        except Exception as e: QMessageBox.critical(self, "라이브러리 오류", f"스냅샷 라이브러리를 열 수 없습니다:\n{e}"); return
+        dialog = SnapshotLibraryDialog(self, library)
+        if dialog.exec_() != QDialog.Accepted: return
+        if dialog.selected_snapshot_ids: # 본문은 여기서 처음 읽음 (일꾼 스레드에서)
+            self.open_snapshots_in_tabs([entry['file_path'] for entry in map(library.get_entry, dialog.selected_snapshot_ids) if entry]); return
+        entry = library.get_entry(dialog.selected_snapshot_id) if dialog.selected_snapshot_id is not None else None
+        if entry is None: return
+        if not os.path.exists(entry['file_path']): QMessageBox.critical(self, "파일 오류", "스냅샷 파일이 이동되었거나 삭제되었습니다."); return
+        self._start_snapshot_load(entry['file_path'])
+
+    def open_mod_search_dialog(self): # 로컬 아이템 저장소에서 옵션 조건으로 아이템을 찾아 입력칸에 넣음
+        from mod_search import get_item_store_search_index
+        from mod_stats import ITEM_STORE_PATH
+        try: search_index = get_item_store_search_index()
+        except Exception as e: QMessageBox.critical(self, "아이템 저장소 오류", f"아이템 저장소를 읽을 수 없습니다:\n{e}"); return
+        if search_index is None:
+            QMessageBox.information(self, "아이템 저장소 없음", f"아이템 저장소({ITEM_STORE_PATH})가 아직 없습니다.\n\n명령 창에서 다음을 실행해 poedb 아이템을 한 번 모아두세요:\npython src/crawl_pipeline.py --all-known --output \"{ITEM_STORE_PATH}\""); return
+        dialog = ModSearchDialog(self, search_index)
+        if dialog.exec_() == QDialog.Accepted and dialog.selected_item_text: self.edit_item_input.setText(dialog.selected_item_text); self.edit_item_input.setFocus()
 
 # ---------------------------------------------------------------------
 # 프로그램 실행 부분 (수정된 부분!)
 # ---------------------------------------------------------------------
 if __name__ == '__main__':
+    multiprocessing.freeze_support() # PyInstaller 실행 파일에서 PDF 일괄 내보내기 프로세스를 띄울 수 있도록
     app = QApplication(sys.argv)
     
     # 필수 .py 모듈들은 파일 상단 try-except import에서 실패 시 이미 sys.exit() 처리됨.
@@ -0,0 +1,186 @@
+# src/blob_store.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from utils import resource_path
+from metrics import CACHE_LOOKUPS
+
+# 스냅샷이 공유하는 큰 값(크롤링한 아이템 상세, 가이드 본문)을 내용 해시로 한 번만 저장하는 저장소.
+# 같은 아이템으로 만든 스냅샷들, 일괄 실행에서 똑같이 나온 가이드 본문은 blob 하나를 함께 참조한다.
+#   objects/ab/abcdef...  : 값의 정규화 JSON을 zlib으로 압축한 파일 (이름 = 정규화 JSON의 SHA-256)
+#   refs.db               : blob별 참조 수 + 어떤 스냅샷 파일이 어떤 blob을 참조하는지
+BLOB_STORE_DIR = resource_path('snapshot_blobs')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER,
+    stored_size INTEGER,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at REAL
+);
+CREATE TABLE IF NOT EXISTS blob_refs (
+    snapshot_path TEXT NOT NULL,
+    field TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (snapshot_path, field)
+);
+CREATE INDEX IF NOT EXISTS idx_blob_refs_hash ON blob_refs(hash);
+"""
+
+class BlobNotFoundError(KeyError):
+    """참조한 blob이 저장소에 없을 때 (저장소를 지웠거나 다른 PC에서 가져온 스냅샷)."""
+    pass
+
+def encode_blob_value(value):
+    """값을 정규화 JSON 바이트열로 바꾼다. 키 순서가 달라도 같은 내용이면 같은 해시가 나오도록 정렬한다."""
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def blob_hash(value_bytes):
+    return hashlib.sha256(value_bytes).hexdigest()
+
+
+class BlobStore:
+    """
+    내용 주소(SHA-256) 기반 blob 저장소. put()은 같은 내용이 이미 있으면 파일을 다시 쓰지 않는다.
+    참조 수는 스냅샷 파일 단위로 관리한다: set_references()로 스냅샷이 가리키는 blob들을 등록/교체하고,
+    release_snapshot()으로 해제한 뒤 collect_garbage()가 참조 0인 blob을 지운다.
+    지운 파일은 mark_reachable_snapshots()가 정리한다: 알고 있는 폴더들을 뒤져 옮기거나 복사한 파일을 먼저 등록하고,
+    그래도 어디서도 찾지 못한 blob을 잡고 있던 사라진 경로의 참조만 해제한다. 그 결과(mark)를 collect_garbage(live_hashes=...)에 넘기면
+    참조 0이어도 지금 읽을 수 있는 파일이 쓰는 blob은 남는다.
+    """
+    def __init__(self, root_dir=BLOB_STORE_DIR):
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(root_dir, 'refs.db'), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL") # 스냅샷마다 하는 작은 커밋(참조 등록)을 싸게
+        with self._lock, self._conn: self._conn.executescript(_SCHEMA)
+        self.bytes_written = 0 # 이 인스턴스가 실제로 디스크에 쓴 blob 바이트 수 (중복이면 0)
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+    # --- blob 읽기/쓰기 ---
+    def put(self, value):
+        """값을 저장하고 해시를 반환한다. 이미 있는 내용이면 파일 쓰기 없이 해시만 반환한다. (참조 수는 set_references에서 센다)"""
+        value_bytes = encode_blob_value(value)
+        digest = blob_hash(value_bytes)
+        with self._lock:
+            path = self._object_path(digest)
+            exists = os.path.exists(path)
+            CACHE_LOOKUPS.inc(cache='blob_store', result='hit' if exists else 'miss') # hit: 같은 내용이 이미 있어 쓰기 생략
+            if not exists:
+                compressed = zlib.compress(value_bytes, 6)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = path + '.tmp'
+                with open(temp_path, 'wb') as f: f.write(compressed)
+                os.replace(temp_path, path) # 쓰다가 중단되어도 반쯤 쓴 blob이 남지 않도록
+                self.bytes_written += len(compressed)
+                with self._conn:
+                    self._conn.execute("INSERT OR IGNORE INTO blobs (hash, size, stored_size, refcount, created_at) VALUES (?, ?, ?, 0, ?)",
+                                       (digest, len(value_bytes), len(compressed), time.time()))
+        return digest
+
+    def get(self, digest):
+        try:
+            with open(self._object_path(digest), 'rb') as f: compressed = f.read()
+        except FileNotFoundError: raise BlobNotFoundError(digest)
+        return json.loads(zlib.decompress(compressed).decode('utf-8'))
+
+    def contains(self, digest):
+        return os.path.exists(self._object_path(digest))
+
+    # --- 참조 수 관리 ---
+    def set_references(self, snapshot_path, refs):
+        """스냅샷 파일이 참조하는 blob들({필드: 해시})을 등록한다. 같은 파일의 이전 참조는 교체된다."""
+        snapshot_path = os.path.abspath(snapshot_path)
+        with self._lock, self._conn:
+            self._release(snapshot_path)
+            for field, digest in refs.items():
+                self._conn.execute("INSERT INTO blob_refs (snapshot_path, field, hash) VALUES (?, ?, ?)", (snapshot_path, field, digest))
+                self._conn.execute("UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?", (digest,))
+
+    def release_snapshot(self, snapshot_path):
+        """스냅샷 파일을 지웠거나 독립 파일로 덮어쓸 때, 그 파일이 잡고 있던 참조를 해제한다."""
+        with self._lock, self._conn: self._release(os.path.abspath(snapshot_path))
+
+    def mark_reachable_snapshots(self, snapshot_paths=(), scan_dirs=()):
+        """
+        지금 읽을 수 있는 2.1 스냅샷들이 헤더에서 참조하는 blob 해시 집합을 돌려준다 (collect_garbage의 live_hashes).
+        snapshot_paths(예: 라이브러리 색인), 등록된 파일들, 그리고 그 파일들이 있는 폴더와 scan_dirs 안의 .poesnap을 본다.
+        아직 등록되지 않은 파일(복사본, 옮긴 파일)은 참조를 등록하고, 덮어써져 헤더가 등록된 참조와 다른 파일은 헤더에 맞게 교체한다.
+        그다음 사라진 경로 중, 참조하던 blob을 뒤진 파일 어디에서도 찾지 못한 것(지운 파일)은 참조를 해제한다.
+        모두 찾은 경로는 그대로 둔다 (찾은 파일이 같은 blob을 잡고 있으므로 해제해도 지워지지는 않음). 읽지 못한 파일의 참조도 그대로 둔다.
+        """
+        from snapshot_io import read_snapshot_blob_refs, COMPACT_SNAPSHOT_EXTENSION
+        with self._lock:
+            registered = {}
+            for row in self._conn.execute("SELECT snapshot_path, field, hash FROM blob_refs"): registered.setdefault(row['snapshot_path'], {})[row['field']] = row['hash']
+        candidates = {os.path.abspath(path) for path in snapshot_paths} | set(registered)
+        directories = {os.path.dirname(path) for path in candidates} | {os.path.abspath(directory) for directory in scan_dirs}
+        for directory in directories:
+            try: candidates.update(entry.path for entry in os.scandir(directory) if entry.is_file() and entry.name.lower().endswith(COMPACT_SNAPSHOT_EXTENSION))
+            except OSError: continue # 폴더째 옮겼거나 지움
+        live_hashes = set(); resynced = 0; missing = []
+        for path in candidates:
+            if not os.path.exists(path):
+                if path in registered: missing.append(path)
+                continue
+            refs = read_snapshot_blob_refs(path)
+            if not refs: continue # 읽지 못함(참조 유지) 또는 독립 파일
+            live_hashes.update(refs.values())
+            if registered.get(path) != refs: self.set_references(path, refs); resynced += 1
+        released = [path for path in missing if not set(registered[path].values()) <= live_hashes]
+        for path in released: self.release_snapshot(path)
+        if resynced or released: print(f"blob 참조 다시 맞춤: 스냅샷 {resynced}개 (새로 찾은 복사본/옮긴 파일, 덮어쓴 파일), 지워진 스냅샷 {len(released)}개 해제")
+        return live_hashes
+
+    def collect_garbage(self, min_age_seconds=3600, live_hashes=None):
+        """
+        참조 수가 0인 blob을 지우고 (지운 개수, 확보한 바이트)를 반환한다. live_hashes(mark_reachable_snapshots 결과)에 있는 blob은 남긴다.
+        막 put()만 하고 아직 set_references() 전인 blob을 지우지 않도록, min_age_seconds보다 오래된 것만 지운다.
+        """
+        removed = freed = 0
+        with self._lock, self._conn:
+            rows = self._conn.execute("SELECT hash, stored_size FROM blobs WHERE refcount <= 0 AND created_at < ?", (time.time() - min_age_seconds,)).fetchall()
+            for row in rows:
+                if live_hashes and row['hash'] in live_hashes: continue
+                try: os.remove(self._object_path(row['hash']))
+                except FileNotFoundError: pass
+                self._conn.execute("DELETE FROM blobs WHERE hash = ?", (row['hash'],))
+                removed += 1; freed += row['stored_size'] or 0
+        if removed: print(f"blob 저장소 정리: {removed}개 삭제, {freed / 1024:.1f}KB 확보")
+        return removed, freed
+
+    def stats(self):
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0), COALESCE(SUM(refcount), 0), COALESCE(SUM(refcount <= 0), 0) FROM blobs").fetchone()
+        return {'blobs': row[0], 'raw_bytes': row[1], 'stored_bytes': row[2], 'references': row[3], 'unreferenced': row[4]}
+
+    # --- 내부 구현 ---
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _release(self, snapshot_path):
+        for row in self._conn.execute("SELECT hash FROM blob_refs WHERE snapshot_path = ?", (snapshot_path,)).fetchall():
+            self._conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?", (row['hash'],))
+        self._conn.execute("DELETE FROM blob_refs WHERE snapshot_path = ?", (snapshot_path,))
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_default_blob_store():
+    """앱 전체가 함께 쓰는 저장소 (프로젝트 루트 / 실행 파일 옆의 snapshot_blobs 폴더). 처음 쓸 때 연다."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None: _default_store = BlobStore()
+        return _default_store
@@ -0,0 +1,61 @@
+# src/cancellation.py
+import threading
+from contextlib import contextmanager
+
+class CancelToken:
+    """
+    작업 취소 신호를 전달하는 토큰.
+    GuideWorker가 만들어서 크롤러(HTTP 세션)와 LLM 호출까지 그대로 내려보내고,
+    cancel()이 호출되면 그 시점에 등록된 콜백(응답 소켓 닫기, 스트림 닫기 등)을 즉시 실행한다.
+    덕분에 진행 중인 요청이 타임아웃까지 기다리지 않고 바로 끊어진다.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set(): return
+            self._event.set()
+            callbacks = list(self._callbacks); self._callbacks.clear()
+        for callback in callbacks:
+            try: callback()
+            except Exception as e: print(f"취소 콜백 실행 중 오류 (무시함): {e}")
+
+    def register(self, callback):
+        """
+        취소 시 실행할 콜백을 등록하고, 등록 해제용 함수를 반환한다.
+        이미 취소된 상태라면 콜백을 바로 실행한다.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks: self._callbacks.remove(callback)
+                return unregister
+        callback()
+        return lambda: None
+
+    def sleep(self, seconds):
+        """취소 가능한 대기(time.sleep 대체). 대기 중 취소되면 True를 반환한다."""
+        return self._event.wait(seconds)
+
+
+def is_cancelled(cancel_token):
+    """토큰이 없으면(None) 취소되지 않은 것으로 본다."""
+    return cancel_token is not None and cancel_token.is_cancelled
+
+@contextmanager
+def on_cancel(cancel_token, callback):
+    """with 블록이 실행되는 동안에만 취소 콜백을 등록해 둔다. 토큰이 None이면 아무것도 하지 않는다."""
+    if cancel_token is None:
+        yield; return
+    unregister = cancel_token.register(callback)
+    try: yield
+    finally: unregister()
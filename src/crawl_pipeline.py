@@ -0,0 +1,151 @@
+# src/crawl_pipeline.py
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+
+from cancellation import CancelToken
+
+# poedb 페이지를 수백 개씩 한꺼번에 가져올 때 쓰는 받기/파싱 2단 파이프라인.
+#   [받기 스레드 N개] --HTML bytes--> [파싱 프로세스 풀] --item_data--> 호출한 쪽 (끝난 순서대로)
+# get_item_details_from_poedb를 스레드 여러 개로 돌리면 BeautifulSoup 파싱(CPU 작업)이 GIL 하나를 두고 줄을 서서
+# 코어가 많아도 빨라지지 않고, 파싱하는 동안 네트워크 스레드까지 밀린다. 여기서는 받기는 스레드가, 파싱은 별도 프로세스가 맡는다.
+# 받기 중 + 파싱 중 + 호출한 쪽이 아직 가져가지 않은 결과의 합을 max_pending개로 묶어 두므로,
+# 파서가 밀리거나 결과를 늦게 가져가면 받기가 그만큼 멈춘다 (메모리에 HTML이 쌓이지 않음).
+# 단건 요청(가이드 생성, 미리 가져오기)은 프로세스를 띄우는 비용이 더 크므로 지금처럼 get_item_details_from_poedb를 쓴다.
+
+def _init_parse_process():
+    # 파싱 프로세스마다 한 번: bs4/lxml 임포트를 첫 페이지가 아니라 시작할 때 끝내 둔다
+    import crawler
+
+def _parse_item_page(html_content, target_url):
+    # 파싱 프로세스에서 실행된다. (item_data 또는 None, 파싱 시간(초))
+    from crawler import parse_item_details
+    started = time.perf_counter()
+    item_data = parse_item_details(html_content, target_url)
+    return item_data, time.perf_counter() - started
+
+
+class _RequestSpacing:
+    """받기 스레드가 여럿이어도 poedb 요청 시작 간격을 delay_seconds 이상으로 유지한다 (예의상 대기를 스레드끼리 나눠 씀)."""
+    def __init__(self, delay_seconds):
+        self.delay_seconds = max(0.0, delay_seconds)
+        self._lock = threading.Lock(); self._next_at = 0.0
+
+    def wait(self, cancel_token):
+        """차례가 올 때까지 기다린다. 기다리는 중에 취소되면 True."""
+        if self.delay_seconds <= 0: return cancel_token.is_cancelled
+        with self._lock:
+            now = time.monotonic(); start_at = max(now, self._next_at); self._next_at = start_at + self.delay_seconds
+        return cancel_token.sleep(start_at - now) if start_at > now else cancel_token.is_cancelled
+
+
+def crawl_items(identifiers, parse_workers=None, fetch_threads=2, max_pending=None, request_delay_seconds=None, cancel_token=None):
+    """
+    poedb 식별자(또는 URL) 목록을 받아서 가져오고 파싱한 결과를 끝난 순서대로 내놓는 제너레이터.
+    결과 dict: identifier, url, item_data (실패 시 None), error (실패 시에만), bytes, fetch_seconds, parse_seconds
+    parse_workers: 파싱 프로세스 수 (기본: CPU 코어 수), fetch_threads: 받기 스레드 수,
+    max_pending: 동시에 붙잡아 두는 페이지 수 (기본: 받기 스레드 수 + 파싱 프로세스 수 x 2),
+    request_delay_seconds: poedb 요청 시작 간격 (기본: crawler.REQUEST_DELAY_SECONDS).
+    cancel_token이 취소되거나 호출한 쪽이 반복을 멈추면 받기를 멈추고 아직 시작하지 않은 파싱은 버린다.
+    """
+    import crawler
+    identifiers = list(identifiers)
+    if not identifiers: return
+    parse_workers = parse_workers or os.cpu_count() or 1
+    fetch_threads = max(1, min(fetch_threads, len(identifiers)))
+    max_pending = max(1, max_pending or fetch_threads + parse_workers * 2)
+    spacing = _RequestSpacing(crawler.REQUEST_DELAY_SECONDS if request_delay_seconds is None else request_delay_seconds)
+    stop_token = CancelToken() # 이 파이프라인 안에서만 쓰는 중단 신호 (진행 중인 받기 소켓도 닫힌다)
+    unregister = cancel_token.register(stop_token.cancel) if cancel_token else None
+    work = queue.Queue()
+    for identifier in identifiers: work.put(identifier)
+    results = queue.Queue(); slots = threading.Semaphore(max_pending)
+    # Qt 앱(스레드 포함)이 떠 있는 프로세스를 fork하면 위험하므로 어느 OS에서든 spawn으로 새 프로세스를 띄운다 (pdf_export와 같음).
+    executor = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_parse_process)
+
+    def finish_parse(result, future):
+        try:
+            item_data, result['parse_seconds'] = future.result(); result['item_data'] = item_data
+            if item_data is None: result['error'] = "아이템 이름 정보를 찾지 못했습니다."; crawler.remember_unparsable_page(result['url'])
+            elif item_data.get('type'): crawler.learn_item_names(crawler.locale_page_urls(result['url'])[1], [item_data['name']]) # 일괄 크롤링은 기본 언어판만 받으므로 그 이름만
+        except CancelledError: result['error'] = "취소됨"
+        except Exception as e: result['error'] = f"파싱 실패: {e}"
+        results.put(result)
+
+    def fetch_loop():
+        while not stop_token.is_cancelled:
+            try: identifier = work.get_nowait()
+            except queue.Empty: return
+            while not slots.acquire(timeout=0.1): # 자리가 없으면 (파서/호출한 쪽이 밀리면) 여기서 멈춘다
+                if stop_token.is_cancelled: return
+            url = crawler.item_page_url(identifier)
+            result = {'identifier': identifier, 'url': url, 'item_data': None, 'bytes': 0, 'fetch_seconds': 0.0, 'parse_seconds': 0.0}
+            missing_reason = crawler.is_known_missing_page(url)
+            if missing_reason: result['error'] = f"최근에 없다고 확인된 페이지 ({missing_reason})"; results.put(result); continue
+            try:
+                if spacing.wait(stop_token): return
+                started = time.perf_counter(); html_content = crawler.fetch_poedb_page(url, stop_token); result['fetch_seconds'] = time.perf_counter() - started
+                if html_content is None: return # 취소됨
+                result['bytes'] = len(html_content)
+                executor.submit(_parse_item_page, html_content, url).add_done_callback(lambda future, result=result: finish_parse(result, future))
+            except Exception as e:
+                if stop_token.is_cancelled: return
+                if getattr(getattr(e, 'response', None), 'status_code', None) in (404, 410): crawler.remember_missing_page(url, "poedb에 없는 페이지")
+                result['error'] = f"받기 실패: {e}"; results.put(result)
+
+    threads = [threading.Thread(target=fetch_loop, name=f"crawl-fetch-{index}", daemon=True) for index in range(fetch_threads)]
+    try:
+        for thread in threads: thread.start()
+        for _ in range(len(identifiers)):
+            while True:
+                try: result = results.get(timeout=0.1); break
+                except queue.Empty:
+                    if stop_token.is_cancelled: return
+            slots.release() # 결과를 가져갔으니 받기 스레드가 다음 페이지를 받을 수 있다
+            yield result
+    finally:
+        stop_token.cancel()
+        if unregister: unregister()
+        for thread in threads: thread.join()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def main():
+    # 명령줄 일괄 크롤링: python src/crawl_pipeline.py Kaoms_Heart Headhunter ... 또는 --all-known, 결과는 JSON Lines
+    parser = argparse.ArgumentParser(description="poedb 아이템 페이지 일괄 크롤링 (받기 스레드 + 파싱 프로세스 풀)")
+    parser.add_argument('identifiers', nargs='*', help="poedb 식별자 또는 URL")
+    parser.add_argument('--all-known', action='store_true', help="매핑 테이블(item_name_mapper)에 있는 모든 아이템")
+    parser.add_argument('--parse-workers', type=int, help="파싱 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--fetch-threads', type=int, default=2)
+    parser.add_argument('--delay', type=float, help="poedb 요청 시작 간격(초). 기본은 crawler.REQUEST_DELAY_SECONDS")
+    parser.add_argument('--output', help="결과를 JSON Lines로 저장할 경로 (없으면 요약만 출력)")
+    args = parser.parse_args()
+    identifiers = list(args.identifiers)
+    if args.all_known:
+        from item_name_mapper import ITEM_NAME_TO_POEDB_ID
+        identifiers += sorted(set(ITEM_NAME_TO_POEDB_ID.values()))
+    if not identifiers: parser.error("가져올 식별자가 없습니다. 식별자를 적거나 --all-known을 주세요.")
+
+    started = time.perf_counter(); done = failed = 0
+    output_file = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for result in crawl_items(identifiers, parse_workers=args.parse_workers, fetch_threads=args.fetch_threads, request_delay_seconds=args.delay):
+            done += 1; failed += 'error' in result
+            print(f"[{done}/{len(identifiers)}] {result['identifier']}: " + (result.get('error') or f"{result['item_data']['name']} (옵션 {len(result['item_data']['mods'])}개)"))
+            if output_file: output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if output_file: output_file.close()
+    elapsed = time.perf_counter() - started
+    print(f"완료: {done - failed}/{len(identifiers)}개 성공, {elapsed:.1f}초 ({done / elapsed:.1f}페이지/초)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,132 +1,389 @@
 # src/crawler.py
+import os
+import re
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import time
+from cancellation import CancelToken, is_cancelled, on_cancel
+from tracing import current_trace
+from metrics import CRAWL_REQUESTS, CRAWL_RESPONSE_BYTES, CACHE_LOOKUPS
+from item_name_mapper import is_known_poedb_identifier, learn_item_names
+from league_version import get_league_version_tracker
 
 # poedb.tw 접속 시 사용할 기본 URL 및 헤더
-BASE_POEDB_URL_KR = "https://poedb.tw/kr/"
+# (환경 변수로 바꿀 수 있음: 벤치마크의 로컬 대역 서버나 미러를 가리킬 때. 끝의 '/'까지 포함)
+BASE_POEDB_URL_KR = os.environ.get("POEPLANNER_POEDB_BASE_URL", "https://poedb.tw/kr/")
+# 아이템 페이지를 함께 가져올 poedb 언어판 (첫 번째가 기본: 결과의 name/type/mods). kr만 두면 예전처럼 한국어 페이지만.
+# us 페이지의 영어 이름/옵션은 결과의 'locales'에 들어가고, 두 언어 이름은 item_name_mapper가 학습해서 다음부터 바로 찾는다.
+BASE_POEDB_URL_US = os.environ.get("POEPLANNER_POEDB_BASE_URL_US") or (BASE_POEDB_URL_KR[:-3] + "us/" if BASE_POEDB_URL_KR.endswith("/kr/") else None)
+POEDB_BASE_URLS = {'kr': BASE_POEDB_URL_KR, 'us': BASE_POEDB_URL_US}
+POEDB_LOCALES = [locale.strip() for locale in os.environ.get("POEPLANNER_POEDB_LOCALES", "kr,us").split(",") if POEDB_BASE_URLS.get(locale.strip())] or ['kr']
+REQUEST_DELAY_SECONDS = float(os.environ.get("POEPLANNER_POEDB_REQUEST_DELAY", "1.5")) # 아이템 요청 전 예의상 대기 시간
 HEADERS = {
     'User-Agent': 'PoEPlannerApp/0.1 (github.com/ShovelMaker/poeplanner; for a non-commercial build planning tool)'
 }
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+PROBE_READ_TIMEOUT = 3
+# 없는 페이지(404/410)는 이 시간 동안 다시 요청하지 않는다.
+# "Watcher's Eye" -> "Watchers_Eye"처럼 영어 자동 변환으로 추측한 식별자가 틀리면 다시 시도할 때마다
+# 예의상 대기 + 요청 + 파싱을 다 치르고 None을 받으므로. 시간 초과/접속 오류는 일시적일 수 있어서 기억하지 않는다.
+NEGATIVE_CACHE_TTL_SECONDS = float(os.environ.get("POEPLANNER_NEGATIVE_CACHE_TTL", "1800"))
+# 200으로 받았지만 아이템 정보를 찾지 못한 페이지는 훨씬 짧게만 기억한다. Cloudflare 확인 화면이나 일시적인 마크업 변경일 수도 있어서
+# (한 번의 이상한 응답이 진짜 아이템을 30분 동안, 가이드 서버에서는 모든 사용자에게 막지 않도록) 연달아 다시 요청하는 것만 막는다.
+PARSE_FAILURE_TTL_SECONDS = float(os.environ.get("POEPLANNER_PARSE_FAILURE_TTL", "60"))
+MAX_NEGATIVE_CACHE_ENTRIES = 1024
+_SESSION = None
+_negative_cache_lock = threading.Lock()
+_negative_cache = {} # URL -> (기억한 시각, 이유, 기억할 시간(초))
+_probe_supported = True # 서버가 HEAD를 지원하지 않으면(405/501) 이후로는 확인을 건너뛴다
+_locale_executor = None; _locale_executor_lock = threading.Lock() # 기본 언어 외 페이지를 동시에 받는 스레드들 (세션 공유)
 
-def get_item_details_from_poedb(identifier_or_url):
+def get_session():
+    """
+    모든 poedb.tw 요청이 함께 쓰는 requests 세션 (커넥션 재사용).
+    """
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = requests.Session()
+        _SESSION.headers.update(HEADERS)
+    return _SESSION
+
+def fetch_poedb_page(target_url, cancel_token=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+    """
+    공유 세션으로 페이지 원본(bytes)을 가져온다.
+    응답을 stream 모드로 받으면서 cancel_token에 소켓 종료 콜백을 등록해 두므로,
+    취소되면 소켓이 즉시 닫히고 None을 반환한다. (그 외 요청 오류는 그대로 raise)
+    """
+    if is_cancelled(cancel_token): return None
+    try:
+        response = get_session().get(target_url, timeout=timeout, stream=True)
+    except Exception as e:
+        CRAWL_REQUESTS.inc(outcome='cancelled' if is_cancelled(cancel_token) else _crawl_error_outcome(e)); raise
+    try:
+        with on_cancel(cancel_token, lambda: abort_response(response)):
+            response.raise_for_status()
+            chunks = []
+            for chunk in response.iter_content(chunk_size=16384):
+                if is_cancelled(cancel_token): CRAWL_REQUESTS.inc(outcome='cancelled'); return None
+                chunks.append(chunk)
+            if is_cancelled(cancel_token): CRAWL_REQUESTS.inc(outcome='cancelled'); return None # 헤더를 받는 사이 취소되어 소켓이 닫히면 본문 없이 끝난다
+            html_content = b"".join(chunks)
+            CRAWL_REQUESTS.inc(outcome='ok'); CRAWL_RESPONSE_BYTES.inc(len(html_content))
+            return html_content
+    except Exception as e:
+        if is_cancelled(cancel_token): CRAWL_REQUESTS.inc(outcome='cancelled'); return None # 취소로 소켓이 닫히면서 난 예외는 무시
+        CRAWL_REQUESTS.inc(outcome=_crawl_error_outcome(e)); raise
+    finally:
+        response.close()
+
+def _crawl_error_outcome(error):
+    # 요청 수 지표의 outcome 레이블
+    if isinstance(error, requests.exceptions.Timeout): return 'timeout'
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None: return f"http_{error.response.status_code}"
+    if isinstance(error, requests.exceptions.ConnectionError): return 'connection_error'
+    return 'error'
+
+def abort_response(response):
+    # 다른 스레드에서 close()만 하면 recv()에 막혀 있는 읽기가 깨어나지 않으므로, 소켓을 먼저 shutdown 한다.
+    # 헤더 수신 후에는 http.client가 커넥션에서 소켓을 떼어내므로 응답 파일 객체(SocketIO) 쪽에서 찾는다.
+    body_fp = getattr(getattr(response.raw, '_fp', None), 'fp', None)
+    sock = getattr(getattr(body_fp, 'raw', None), '_sock', None)
+    if sock is not None:
+        try: sock.shutdown(socket.SHUT_RDWR)
+        except OSError: pass
+    response.close()
+
+def is_known_missing_page(identifier_or_url):
+    """최근에 없다고 확인된 페이지면 그 이유(문장), 아니면 None."""
+    target_url = item_page_url(identifier_or_url)
+    with _negative_cache_lock:
+        entry = _negative_cache.get(target_url)
+        if entry is not None and time.monotonic() - entry[0] > entry[2]: del _negative_cache[target_url]; entry = None
+    CACHE_LOOKUPS.inc(cache='crawl_negative', result='hit' if entry is not None else 'miss')
+    return entry[1] if entry is not None else None
+
+def remember_missing_page(identifier_or_url, reason, ttl_seconds=None):
+    """없는 페이지로 기억한다 (ttl_seconds, 기본 NEGATIVE_CACHE_TTL_SECONDS 동안 요청하지 않음)."""
+    ttl_seconds = NEGATIVE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    if ttl_seconds <= 0: return
+    with _negative_cache_lock:
+        _negative_cache[item_page_url(identifier_or_url)] = (time.monotonic(), reason, ttl_seconds)
+        while len(_negative_cache) > MAX_NEGATIVE_CACHE_ENTRIES: del _negative_cache[next(iter(_negative_cache))] # 가장 먼저 넣은 것부터
+
+def remember_unparsable_page(identifier_or_url):
+    """받았지만 아이템 정보를 찾지 못한 페이지로 기억한다 (PARSE_FAILURE_TTL_SECONDS 동안만)."""
+    remember_missing_page(identifier_or_url, "아이템 정보가 없는 페이지", PARSE_FAILURE_TTL_SECONDS)
+
+def clear_negative_cache(*_):
+    """없는 페이지 기억을 모두 지운다 (새 패치에는 새 고유 아이템 페이지가 생기므로 리그 버전이 바뀔 때도 불림)."""
+    with _negative_cache_lock: _negative_cache.clear()
+
+get_league_version_tracker().add_listener(clear_negative_cache)
+
+def probe_poedb_page(target_url, cancel_token=None):
+    """
+    본문 없이 HEAD 요청으로 페이지가 있는지만 확인한다 (예의상 대기 없음, 짧은 제한 시간).
+    있으면 True, 없으면(404/410) False, 알 수 없으면(서버가 HEAD 미지원, 오류, 취소) None — 이때는 평소처럼 받아 본다.
+    취소는 fetch_poedb_page와 같이 본다: 취소된 토큰이면 보내지 않고, 기다리는 사이 취소되면 결과를 버리고 None ('probe_cancelled').
+    (HEAD는 본문이 없어 응답 소켓을 닫아 끊을 구간이 없고, 헤더를 기다리는 시간은 PROBE_READ_TIMEOUT으로 짧게 묶여 있다)
+    """
+    global _probe_supported
+    if not _probe_supported or is_cancelled(cancel_token): return None
+    try:
+        response = get_session().head(target_url, timeout=(CONNECT_TIMEOUT, PROBE_READ_TIMEOUT), allow_redirects=True)
+        response.close()
+    except requests.exceptions.RequestException as e:
+        CRAWL_REQUESTS.inc(outcome='probe_cancelled' if is_cancelled(cancel_token) else 'probe_' + _crawl_error_outcome(e)); return None
+    if is_cancelled(cancel_token): CRAWL_REQUESTS.inc(outcome='probe_cancelled'); return None # 응답을 기다리는 사이 취소됨 -> 결과를 쓰지 않는다
+    if response.status_code in (405, 501): _probe_supported = False; CRAWL_REQUESTS.inc(outcome='probe_unsupported'); return None
+    CRAWL_REQUESTS.inc(outcome=f"probe_http_{response.status_code}")
+    if response.status_code in (404, 410): return False
+    return True if response.ok else None
+
+# 아이템 페이지에서 쓰는 부분(아이템 헤더, 옵션 상자)만 트리로 만든다. 페이지 대부분(메뉴, 표, 스크립트)을 건너뛰어 파싱이 3배쯤 빠르다.
+# 헤더가 없는 페이지는 <title>로 이름을 찾아야 하므로 전체를 다시 파싱한다.
+ITEM_BOX_STRAINER = SoupStrainer('div', class_=['itemHeader doubleLine', re.compile(r'(^|\s)Stats(\s|$)')])
+
+def parse_item_details(html_content, target_url):
+    """
+    poedb.tw 아이템 페이지 HTML을 파싱해서 item_data 딕셔너리를 만든다.
+    이름을 찾지 못하면 None.
+    """
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=ITEM_BOX_STRAINER)
+    if not soup.find('div', class_='itemHeader doubleLine'): soup = BeautifulSoup(html_content, 'lxml')
+
+    item_data = {
+        'name': None,
+        'type': None,
+        'mods': [],
+        'url': target_url 
+    }
+
+    item_header_div = soup.find('div', class_='itemHeader doubleLine')
+    if item_header_div:
+        name_candidate_div = item_header_div.find('div', class_='itemName')
+        if name_candidate_div and 'typeLine' not in name_candidate_div.get('class', []):
+            name_span = name_candidate_div.find('span', class_='lc')
+            if name_span:
+                item_data['name'] = name_span.text.strip()
+        
+        type_div = item_header_div.find('div', class_='itemName typeLine')
+        if type_div:
+            type_span = type_div.find('span', class_='lc')
+            if type_span:
+                item_data['type'] = type_span.text.strip()
+    else:
+        page_title_tag = soup.find('title')
+        if page_title_tag:
+            page_title = page_title_tag.text.strip()
+            item_data['name'] = page_title.split("::")[0].strip() if "::" in page_title else page_title
+
+    stats_div = soup.find('div', class_='Stats') 
+    if stats_div:
+        for mod_div in stats_div.find_all('div', class_='explicitMod'):
+            mod_span = mod_div.find('span', class_='secondary')
+            mod_text = ""
+            if mod_span:
+                mod_text = mod_span.text.strip()
+            else:
+                mod_text = mod_div.text.strip() 
+            mod_text = mod_text.replace('[1]', '').strip()
+            if mod_text:
+                item_data['mods'].append(mod_text)
+    
+    if not item_data.get('name'):
+         print(f"주의: {target_url} 에서 아이템 이름 정보를 추출하지 못했습니다.")
+         return None 
+
+    return item_data
+
+def item_page_url(identifier_or_url):
+    """페이지 식별자(예: "Kaoms_Heart")면 poedb 아이템 페이지 URL로, 이미 완전한 URL이면 그대로."""
+    if identifier_or_url.startswith("http"): return identifier_or_url
+    return BASE_POEDB_URL_KR + identifier_or_url
+
+def locale_page_urls(identifier_or_url, locales=None):
+    """
+    식별자(또는 poedb 언어판 URL)의 언어판별 페이지 [(언어, URL), ...] (locales 순서, 기본 POEDB_LOCALES)와 페이지 식별자.
+    poedb 언어판 주소가 아닌 URL이면 [(None, URL)]과 None.
+    """
+    locales = POEDB_LOCALES if locales is None else locales
+    if identifier_or_url.startswith("http"):
+        page_id = next((identifier_or_url[len(base):] for base in POEDB_BASE_URLS.values() if base and identifier_or_url.startswith(base)), None)
+        if not page_id: return [(None, identifier_or_url)], None
+    else: page_id = identifier_or_url
+    urls = [(locale, POEDB_BASE_URLS[locale] + page_id) for locale in locales if POEDB_BASE_URLS.get(locale)]
+    return (urls or [('kr', BASE_POEDB_URL_KR + page_id)]), page_id
+
+def _get_locale_executor():
+    global _locale_executor
+    with _locale_executor_lock:
+        if _locale_executor is None: _locale_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="poedb-locale")
+        return _locale_executor
+
+def _fetch_locale_page(target_url, cancel_token):
+    # 언어판 스레드에서 실행: 받아서 파싱까지 (기본 언어 페이지를 받고 파싱하는 동안 같이 진행된다).
+    # (item_data 또는 None, 받기 시작, 받기 끝, 파싱 끝, 받은 바이트). 실패는 알리기만 하고 None (기본 언어 결과는 그대로 씀)
+    started = time.perf_counter()
+    try: html_content = fetch_poedb_page(target_url, cancel_token)
+    except requests.exceptions.RequestException as e:
+        if isinstance(e, requests.exceptions.HTTPError) and e.response is not None and e.response.status_code in (404, 410): remember_missing_page(target_url, "poedb에 없는 페이지")
+        if not is_cancelled(cancel_token): print(f"poedb.tw 다른 언어 페이지 요청 실패 ({target_url}): {e}")
+        html_content = None
+    fetched = time.perf_counter()
+    if html_content is None: return None, started, fetched, fetched, 0
+    try: item_data = parse_item_details(html_content, target_url)
+    except Exception as e: print(f"poedb.tw 다른 언어 페이지 파싱 오류 ({target_url}): {e}"); item_data = None
+    if item_data is None: remember_unparsable_page(target_url)
+    return item_data, started, fetched, time.perf_counter(), len(html_content)
+
+def _collect_locale_items(pending, cancel_token, trace, timings):
+    # 기본 언어 결과를 만든 뒤 다른 언어판 결과를 기다린다. [(언어, item_data), ...]
+    items = []; wait_started = time.perf_counter()
+    for locale, target_url, future in pending:
+        while True:
+            if is_cancelled(cancel_token): return items
+            try: item_data, fetch_started, fetch_ended, parse_ended, size = future.result(timeout=0.1); break
+            except FutureTimeoutError: continue
+        trace.add_span('crawl.network', fetch_started, fetch_ended, url=target_url, locale=locale, bytes=size)
+        if parse_ended > fetch_ended: trace.add_span('crawl.parse', fetch_ended, parse_ended, locale=locale, mods=len(item_data['mods']) if item_data else 0)
+        if item_data is not None: items.append((locale, item_data))
+    if timings is not None: timings['crawl_locales'] = time.perf_counter() - wait_started # 기본 언어 결과 뒤에 더 기다린 시간 (보통 0에 가깝다)
+    return items
+
+def merge_locale_items(locale_items, page_id=None):
+    """
+    언어판별 결과 [(언어, item_data), ...]를 하나로 합친다. 첫 번째가 기본(name/type/mods/url),
+    'locales'에 언어별 {name, type, mods, url}. page_id가 있으면 아이템 헤더가 있던 페이지의 이름들을 매퍼에 학습시킨다.
+    """
+    if not locale_items: return None
+    merged = dict(locale_items[0][1])
+    merged['locales'] = {locale: {field: item_data.get(field) for field in ('name', 'type', 'mods', 'url')} for locale, item_data in locale_items}
+    if page_id: learn_item_names(page_id, [item_data['name'] for _, item_data in locale_items if item_data.get('type')]) # 헤더 없이 <title>로 찾은 이름은 배우지 않음
+    return merged
+
+def get_item_details_from_poedb(identifier_or_url, cancel_token=None, timings=None, locales=None):
     """
     poedb.tw에서 아이템 상세 정보를 가져온다.
     인자로 페이지 식별자(예: "Kaoms_Heart") 또는 전체 URL을 받을 수 있다.
+    locales(기본 POEDB_LOCALES)의 언어판 페이지를 한 번의 예의상 대기 후 동시에 받아서, 첫 번째 언어 결과에
+    'locales'(언어별 name/type/mods/url)를 붙여 돌려준다 (merge_locale_items). 다른 언어판이 실패해도 첫 번째 언어 결과는 그대로.
+    cancel_token이 주어지면 대기/요청 도중에도 즉시 중단하고 None을 반환한다.
+    timings(dict)가 주어지면 단계별 소요 시간(초)을 기록한다: crawl_wait(예의상 대기), crawl(네트워크), parse(HTML 파싱),
+    crawl_locales(기본 언어 결과를 만든 뒤 다른 언어판을 더 기다린 시간).
     """
-    target_url = ""
-    if identifier_or_url.startswith("http"): # 완전한 URL이 직접 들어온 경우
-        target_url = identifier_or_url
-    else: # 페이지 식별자가 들어온 경우 (예: "Kaoms_Heart")
-        target_url = BASE_POEDB_URL_KR + identifier_or_url
-    
+    locale_urls, page_id = locale_page_urls(identifier_or_url, locales)
+    (primary_locale, target_url), other_urls = locale_urls[0], locale_urls[1:]
+    missing_reason = is_known_missing_page(target_url)
+    if missing_reason: print(f"최근에 없다고 확인된 페이지라 요청하지 않습니다 ({missing_reason}): {target_url}"); return None
     print(f"poedb.tw 아이템 크롤링 대상 URL: {target_url}")
+    trace = current_trace() # 요청 트레이스가 켜져 있으면 crawl.probe / crawl.sleep / crawl.network / crawl.parse 구간을 남긴다
     try:
-        time.sleep(1.5) # 서버 부하를 줄이기 위한 예의!
-        response = requests.get(target_url, headers=HEADERS, timeout=10)
-        response.raise_for_status() 
-
-        soup = BeautifulSoup(response.content, 'lxml')
-
-        item_data = {
-            'name': None,
-            'type': None,
-            'mods': [],
-            'url': target_url 
-        }
-
-        item_header_div = soup.find('div', class_='itemHeader doubleLine')
-        if item_header_div:
-            name_candidate_div = item_header_div.find('div', class_='itemName')
-            if name_candidate_div and 'typeLine' not in name_candidate_div.get('class', []):
-                name_span = name_candidate_div.find('span', class_='lc')
-                if name_span:
-                    item_data['name'] = name_span.text.strip()
-            
-            type_div = item_header_div.find('div', class_='itemName typeLine')
-            if type_div:
-                type_span = type_div.find('span', class_='lc')
-                if type_span:
-                    item_data['type'] = type_span.text.strip()
-        else:
-            page_title_tag = soup.find('title')
-            if page_title_tag:
-                page_title = page_title_tag.text.strip()
-                item_data['name'] = page_title.split("::")[0].strip() if "::" in page_title else page_title
-
-        stats_div = soup.find('div', class_='Stats') 
-        if stats_div:
-            for mod_div in stats_div.find_all('div', class_='explicitMod'):
-                mod_span = mod_div.find('span', class_='secondary')
-                mod_text = ""
-                if mod_span:
-                    mod_text = mod_span.text.strip()
-                else:
-                    mod_text = mod_div.text.strip() 
-                mod_text = mod_text.replace('[1]', '').strip()
-                if mod_text:
-                    item_data['mods'].append(mod_text)
-        
-        if not item_data.get('name'):
-             print(f"주의: {target_url} 에서 아이템 이름 정보를 추출하지 못했습니다.")
-             return None 
-
-        return item_data
+        if not is_known_poedb_identifier(identifier_or_url): # 매핑 테이블에 없는(추측한) 식별자나 URL은 받기 전에 있는지부터
+            stage_started = time.perf_counter(); exists = probe_poedb_page(target_url, cancel_token)
+            trace.add_span('crawl.probe', stage_started, time.perf_counter(), url=target_url, exists=exists)
+            if exists is False:
+                remember_missing_page(target_url, "poedb에 없는 페이지"); print(f"poedb.tw에 없는 페이지입니다: {target_url}"); return None
+        # 서버 부하를 줄이기 위한 예의! (취소되면 바로 깨어남)
+        stage_started = time.perf_counter()
+        if cancel_token is not None:
+            if cancel_token.sleep(REQUEST_DELAY_SECONDS): print(f"아이템 정보 요청 취소됨: {target_url}"); return None
+        elif REQUEST_DELAY_SECONDS > 0:
+            time.sleep(REQUEST_DELAY_SECONDS)
+        stage_ended = time.perf_counter(); trace.add_span('crawl.sleep', stage_started, stage_ended)
+        if timings is not None: timings['crawl_wait'] = stage_ended - stage_started
+        stage_started = stage_ended
+        other_token = CancelToken(); unregister = cancel_token.register(other_token.cancel) if cancel_token is not None else None
+        pending = [(locale, url, _get_locale_executor().submit(_fetch_locale_page, url, other_token)) for locale, url in other_urls if not is_known_missing_page(url)]
+        try: html_content = fetch_poedb_page(target_url, cancel_token)
+        except BaseException:
+            other_token.cancel()
+            if unregister: unregister()
+            raise
+        stage_ended = time.perf_counter(); trace.add_span('crawl.network', stage_started, stage_ended, url=target_url, bytes=len(html_content or b""))
+        if timings is not None: timings['crawl'] = stage_ended - stage_started
+        stage_started = stage_ended
+        try:
+            if html_content is None:
+                print(f"아이템 정보 요청 취소됨: {target_url}")
+                return None
+            item_data = parse_item_details(html_content, target_url)
+            stage_ended = time.perf_counter(); trace.add_span('crawl.parse', stage_started, stage_ended, mods=len(item_data['mods']) if item_data else 0)
+            if timings is not None: timings['parse'] = stage_ended - stage_started
+            if item_data is None: remember_unparsable_page(target_url); return None
+            if primary_locale is None: return item_data # poedb 언어판 주소가 아닌 URL
+            return merge_locale_items([(primary_locale, item_data)] + _collect_locale_items(pending, cancel_token, trace, timings), page_id)
+        finally:
+            other_token.cancel() # 기다리지 않게 된 다른 언어 요청은 끊는다 (이미 끝났으면 아무 일 없음)
+            if unregister: unregister()
 
     except requests.exceptions.Timeout:
         print(f"아이템 정보 요청 시간 초과: {target_url}")
         return None
     except requests.exceptions.RequestException as e:
+        if isinstance(e, requests.exceptions.HTTPError) and e.response is not None and e.response.status_code in (404, 410): remember_missing_page(target_url, "poedb에 없는 페이지")
         print(f"poedb.tw 아이템 요청 중 오류 발생 ({target_url}): {e}")
         return None
     except Exception as e: 
         print(f"아이템 정보 파싱 중 알 수 없는 오류 발생 ({target_url}): {e}")
         return None
 
+def parse_current_league_info(html_content):
+    """
+    poedb.tw 홈페이지 HTML에서 현재 진행 중인 주력 챌린지 리그의 이름과 버전을 찾는다.
+    {"name", "version"} 또는 찾지 못하면 None.
+    """
+    soup = BeautifulSoup(html_content, 'lxml')
+
+    league_cards = soup.find_all('div', class_='card mb-2')
+    
+    current_league_name = None
+    current_league_version = None
+
+    for card in league_cards:
+        # "Running for" 텍스트와 GGG API 링크를 가진 <a> 태그를 현재 리그 지표로 사용
+        active_league_link = card.find(
+            lambda tag: tag.name == 'a' and 
+                        "Running for" in tag.get_text(strip=True) and 
+                        tag.has_attr('href') and 
+                        'pathofexile.com/api/leagues/' in tag['href']
+        )
+
+        if active_league_link:
+            header = card.find('h5', class_='card-header')
+            if header:
+                if header.contents and header.contents[0].string:
+                    current_league_name = header.contents[0].string.strip()
+                
+                small_tag = header.find('small', class_='float-end')
+                if small_tag and small_tag.string:
+                    current_league_version = small_tag.string.strip()
+                
+                if current_league_name: # 이름이라도 찾았으면 성공
+                    break 
+
+    if not current_league_name: return None
+    return {"name": current_league_name, "version": current_league_version}
+
 # --- 현재 리그 정보 가져오는 새 함수! ---
 def get_current_league_info_from_poedb():
     """
     poedb.tw 홈페이지(또는 리그 페이지)를 크롤링하여 
     현재 진행 중인 주력 챌린지 리그의 이름과 버전을 가져온다.
     """
-    poedb_main_url = "https://poedb.tw/kr/" 
+    poedb_main_url = BASE_POEDB_URL_KR
     print(f"poedb.tw 현재 리그 정보 가져오기 시도: {poedb_main_url}")
 
     try:
-        response = requests.get(poedb_main_url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'lxml')
-
-        league_cards = soup.find_all('div', class_='card mb-2')
-        
-        current_league_name = None
-        current_league_version = None
-
-        for card in league_cards:
-            # "Running for" 텍스트와 GGG API 링크를 가진 <a> 태그를 현재 리그 지표로 사용
-            active_league_link = card.find(
-                lambda tag: tag.name == 'a' and 
-                            "Running for" in tag.get_text(strip=True) and 
-                            tag.has_attr('href') and 
-                            'pathofexile.com/api/leagues/' in tag['href']
-            )
-
-            if active_league_link:
-                header = card.find('h5', class_='card-header')
-                if header:
-                    if header.contents and header.contents[0].string:
-                        current_league_name = header.contents[0].string.strip()
-                    
-                    small_tag = header.find('small', class_='float-end')
-                    if small_tag and small_tag.string:
-                        current_league_version = small_tag.string.strip()
-                    
-                    if current_league_name: # 이름이라도 찾았으면 성공
-                        break 
+        league_info = parse_current_league_info(fetch_poedb_page(poedb_main_url))
         
-        if current_league_name:
-            print(f"poedb.tw에서 현재 리그 정보 찾음: {current_league_name} (버전: {current_league_version if current_league_version else 'N/A'})")
-            return {"name": current_league_name, "version": current_league_version}
+        if league_info:
+            print(f"poedb.tw에서 현재 리그 정보 찾음: {league_info['name']} (버전: {league_info['version'] if league_info['version'] else 'N/A'})")
+            return league_info
         else:
             print("알림: poedb.tw 홈페이지에서 현재 진행 중인 주력 리그 정보를 자동으로 찾지 못했습니다.")
             return None
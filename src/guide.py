@@ -1,23 +1,29 @@
 # src/guide.py
-import configparser
 import os
-import openai 
-import google.generativeai as genai
 from utils import resource_path
+from settings_store import get_settings_file
+from cancellation import is_cancelled, on_cancel
+from metrics import LLM_CALLS
 
 # API 키 파일 경로 (프로젝트 루트에 있는 api_keys.txt)
 # API_KEYS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_keys.txt')
-API_KEYS_FILE = resource_path('api_keys.txt')
+API_KEYS_FILE = os.environ.get("POEPLANNER_API_KEYS_FILE") or resource_path('api_keys.txt')
+# LLM 접속 주소 바꾸기 (벤치마크의 로컬 대역 서버, 프록시 등):
+# - OpenAI: openai SDK가 OPENAI_BASE_URL 환경 변수를 그대로 따름 (예: http://127.0.0.1:8080/v1)
+# - Gemini: 아래 환경 변수가 있으면 gRPC 대신 REST 전송으로 그 주소에 접속 (예: http://127.0.0.1:8080)
+GEMINI_API_ENDPOINT = os.environ.get("POEPLANNER_GEMINI_API_ENDPOINT")
 
 # config.ini 파일 경로는 이제 app_planner.py에서 관리하고, 모델 ID를 직접 받음
+# openai / google.generativeai SDK는 임포트만 1초 가까이 걸리므로, 실제로 호출할 때 함수 안에서 임포트한다.
+# (앱 시작 속도를 위해 모듈 최상단에서 임포트하지 말 것. 창이 뜬 뒤 app_planner가 백그라운드에서 미리 데워둠)
 
 def load_api_key(service_name):
-    # ... (이전과 동일한 API 키 로드 함수) ...
-    if not os.path.exists(API_KEYS_FILE):
+    # 가이드를 만들 때마다 불리므로 파일은 settings_store가 캐시해 둔 것을 쓴다 (파일이 바뀌었을 때만 다시 파싱)
+    api_keys_file = get_settings_file(API_KEYS_FILE)
+    if not api_keys_file.exists():
         print(f"API 키 파일({API_KEYS_FILE})을 찾을 수 없습니다...")
         return None
-    config = configparser.ConfigParser()
-    config.read(API_KEYS_FILE, encoding='utf-8')
+    config = api_keys_file.config()
     if service_name.upper() in config:
         key = config[service_name.upper()].get('API_KEY')
         if not key or "여기에_실제_" in key or key.strip() == "":
@@ -29,9 +35,20 @@ def load_api_key(service_name):
         return None
 
 # 이제 각 LLM 생성 함수는 사용할 model_id를 직접 인자로 받도록 수정!
-def generate_guide_with_chatgpt(item_data, prompt_override=None, model_id_to_use=None):
+# cancel_token이 주어지면 응답을 스트리밍으로 받으면서, 취소 시 연결/스트림을 바로 닫는다.
+# on_chunk가 주어지면 받은 조각을 그때그때 넘겨준다 (UI의 점진적 렌더링용).
+# 반환값은 (결과, 텍스트): 결과는 LLM_CALLS의 outcome과 같은 값('success', 'error', 'cancelled', ...)이고, 'success'일 때만 텍스트가 가이드다.
+# (오류 텍스트는 화면에 보여줄 수는 있지만 가이드 캐시에 넣으면 안 됨. 스트림 도중 끊겨도 조각은 이미 on_chunk로 나갔을 수 있다)
+GUIDE_CANCELLED_TEXT = "가이드 생성이 취소되었습니다."
+
+def _llm_result(provider, model, outcome, text):
+    LLM_CALLS.inc(provider=provider, model=model, outcome=outcome)
+    return outcome, text
+
+def generate_guide_with_chatgpt(item_data, prompt_override=None, model_id_to_use=None, cancel_token=None, on_chunk=None):
     api_key = load_api_key('OPENAI')
-    if not api_key: return "OpenAI API 키 오류..."
+    if not api_key: return _llm_result('openai', model_id_to_use or "", 'no_api_key', "OpenAI API 키 오류...")
+    import openai
     
     # 사용할 모델 ID 결정 (인자로 받은 것 우선, 없으면 기본값)
     final_model_id = model_id_to_use if model_id_to_use else "gpt-3.5-turbo" # 기본값
@@ -39,28 +56,49 @@ def generate_guide_with_chatgpt(item_data, prompt_override=None, model_id_to_use
         print(f"알림: ChatGPT 모델 ID가 지정되지 않아 기본 모델 '{final_model_id}'을 사용합니다.")
 
     try: client = openai.OpenAI(api_key=api_key)
-    except Exception as e: return f"OpenAI 클라이언트 초기화 오류: {e}"
+    except Exception as e: return _llm_result('openai', final_model_id, 'init_error', f"OpenAI 클라이언트 초기화 오류: {e}")
 
     prompt_to_use = prompt_override if prompt_override else _construct_default_prompt(item_data, "ChatGPT 내부 기본 프롬프트용 클래스 정보 (미지정)", "ChatGPT")
     
     try:
         print(f"\nOpenAI ({final_model_id}) API에 가이드 생성을 요청합니다...")
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a helpful Path of Exile expert assistant for beginners, providing advice in Korean and using Markdown for formatting."},
-                {"role": "user", "content": prompt_to_use}
-            ],
-            model=final_model_id # 전달받거나 설정된 모델 사용!
-        )
-        guide_text = chat_completion.choices[0].message.content
+        # 클라이언트는 이 호출 전용이므로, 취소되면 통째로 닫아서 응답 대기 중인 연결까지 끊는다.
+        with on_cancel(cancel_token, client.close):
+            stream = client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": "You are a helpful Path of Exile expert assistant for beginners, providing advice in Korean and using Markdown for formatting."},
+                    {"role": "user", "content": prompt_to_use}
+                ],
+                model=final_model_id, # 전달받거나 설정된 모델 사용!
+                stream=True
+            )
+            guide_parts = []
+            with on_cancel(cancel_token, stream.close):
+                try:
+                    for chunk in stream:
+                        if is_cancelled(cancel_token): break
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            guide_parts.append(chunk.choices[0].delta.content)
+                            if on_chunk: on_chunk(chunk.choices[0].delta.content)
+                finally:
+                    stream.close()
+        if is_cancelled(cancel_token):
+            print(f"OpenAI ({final_model_id}) 가이드 생성 취소됨.")
+            return _llm_result('openai', final_model_id, 'cancelled', GUIDE_CANCELLED_TEXT)
+        guide_text = "".join(guide_parts)
         print("OpenAI로부터 가이드 생성 완료!")
-        return guide_text
-    except Exception as e: return f"OpenAI API ({final_model_id}) 호출 중 오류: {e}"
+        return _llm_result('openai', final_model_id, 'success', guide_text)
+    except Exception as e:
+        if is_cancelled(cancel_token): return _llm_result('openai', final_model_id, 'cancelled', GUIDE_CANCELLED_TEXT) # 취소로 연결을 닫으면서 난 예외
+        return _llm_result('openai', final_model_id, 'error', f"OpenAI API ({final_model_id}) 호출 중 오류: {e}")
+    finally:
+        client.close()
 
 
-def generate_guide_with_gemini(item_data, prompt_override=None, model_id_to_use=None):
+def generate_guide_with_gemini(item_data, prompt_override=None, model_id_to_use=None, cancel_token=None, on_chunk=None):
     api_key = load_api_key('GEMINI')
-    if not api_key: return "Gemini API 키 오류..."
+    if not api_key: return _llm_result('gemini', model_id_to_use or "", 'no_api_key', "Gemini API 키 오류...")
+    import google.generativeai as genai
 
     # 사용할 모델 ID 결정 (인자로 받은 것 우선, 없으면 기본값)
     final_model_id = model_id_to_use if model_id_to_use else "models/gemini-1.5-flash-latest" # 자네가 확인한 기본값으로!
@@ -68,21 +106,41 @@ def generate_guide_with_gemini(item_data, prompt_override=None, model_id_to_use=
         print(f"알림: Gemini 모델 ID가 지정되지 않아 기본 모델 '{final_model_id}'을 사용합니다.")
         
     try:
-        genai.configure(api_key=api_key)
+        if GEMINI_API_ENDPOINT: genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+        else: genai.configure(api_key=api_key)
         model = genai.GenerativeModel(final_model_id) 
-    except Exception as e: return f"Gemini 클라이언트/모델 ('{final_model_id}') 초기화 오류: {e}"
+    except Exception as e: return _llm_result('gemini', final_model_id, 'init_error', f"Gemini 클라이언트/모델 ('{final_model_id}') 초기화 오류: {e}")
 
     prompt_to_use = prompt_override if prompt_override else _construct_default_prompt(item_data, "Gemini 내부 기본 프롬프트용 클래스 정보 (미지정)", "Gemini")
 
     try:
         print(f"\nGemini ({final_model_id}) API에 가이드 생성을 요청합니다...")
-        response = model.generate_content(prompt_to_use)
-        guide_text = response.text
+        if is_cancelled(cancel_token): return _llm_result('gemini', final_model_id, 'cancelled', GUIDE_CANCELLED_TEXT)
+        response = model.generate_content(prompt_to_use, stream=True)
+        guide_parts = []
+        with on_cancel(cancel_token, lambda: _cancel_gemini_stream(response)):
+            for chunk in response:
+                if is_cancelled(cancel_token): break
+                guide_parts.append(chunk.text)
+                if on_chunk: on_chunk(chunk.text)
+        if is_cancelled(cancel_token):
+            print(f"Gemini ({final_model_id}) 가이드 생성 취소됨.")
+            return _llm_result('gemini', final_model_id, 'cancelled', GUIDE_CANCELLED_TEXT)
+        guide_text = "".join(guide_parts)
         print("Gemini로부터 가이드 생성 완료!")
-        return guide_text
+        return _llm_result('gemini', final_model_id, 'success', guide_text)
     except genai.types.generation_types.BlockedPromptException as e:
-        return f"Gemini API 요청 차단됨 ({final_model_id}): {e}"
-    except Exception as e: return f"Gemini API ({final_model_id}) 호출 중 오류: {e}"
+        return _llm_result('gemini', final_model_id, 'blocked', f"Gemini API 요청 차단됨 ({final_model_id}): {e}")
+    except Exception as e:
+        if is_cancelled(cancel_token): return _llm_result('gemini', final_model_id, 'cancelled', GUIDE_CANCELLED_TEXT)
+        return _llm_result('gemini', final_model_id, 'error', f"Gemini API ({final_model_id}) 호출 중 오류: {e}")
+
+def _cancel_gemini_stream(response):
+    # google.generativeai는 스트림 닫기 API를 공개하지 않으므로, 내부 gRPC 스트림에 cancel()이 있으면 호출한다.
+    # (없으면 다음 청크에서 반복을 멈추는 것으로 대신함)
+    stream_iterator = getattr(response, '_iterator', None)
+    cancel_stream = getattr(stream_iterator, 'cancel', None)
+    if callable(cancel_stream): cancel_stream()
 
 
 def _construct_default_prompt(item_data, class_context, llm_type_for_log):
@@ -115,6 +173,7 @@ if __name__ == '__main__':
     # API_KEYS_FILE_PATH도 이 파일 내에서 올바르게 정의되어 있어야 load_api_key가 작동합니다.
     # (이전 전체 코드에서는 API_KEYS_FILE 전역 변수를 사용했었지)
 
+    import google.generativeai as genai
     gemini_api_key = load_api_key('GEMINI') 
     
     available_gemini_models_list = [] # 변수 이름 중복 피하기
@@ -0,0 +1,107 @@
+# src/guide_client.py
+import json
+
+from cancellation import is_cancelled, on_cancel
+
+# 가이드 서버(guide_server.py)에 요청하는 클라이언트. config.ini [SERVER] URL이 있으면 앱이 poedb/LLM 대신 이것을 쓴다.
+# requests는 무거우므로 실제로 요청할 때 임포트한다 (앱 시작 속도).
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 300 # 가이드 생성(대기열 + LLM)까지 기다리는 시간. 스트리밍이면 이벤트 사이 간격
+
+class GuideServerError(Exception):
+    """서버에 연결하지 못했거나 서버가 오류를 돌려줬을 때. 메시지는 그대로 사용자에게 보여줄 수 있는 문장이다."""
+    pass
+
+
+class GuideServerClient:
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url.rstrip('/')
+        self.token = token or None
+        self._session = None
+
+    def health(self):
+        return self._get_json('/api/health')
+
+    def league_info(self):
+        return self._get_json('/api/league') or None
+
+    def resolve(self, item_name):
+        return self._get_json('/api/resolve', params={'name': item_name})
+
+    def fetch_item(self, identifier_or_url, cancel_token=None):
+        """서버의 공유 캐시에서 아이템 정보를 가져온다. 서버도 못 가져왔으면 None."""
+        return self._get_json('/api/item', params={'id': identifier_or_url}, cancel_token=cancel_token, allow_not_found=True)
+
+    def search_snapshots(self, query_text="", item_text="", limit=100, **filters):
+        return self._get_json('/api/snapshots', params={'q': query_text, 'item': item_text, 'limit': limit, **filters})
+
+    def load_snapshot(self, snapshot_id):
+        return self._get_json(f'/api/snapshots/{int(snapshot_id)}')
+
+    def save_snapshot(self, snapshot_data):
+        """서버 라이브러리에 스냅샷을 올린다. {'id', 'file_path'}"""
+        return self._request_json('POST', '/api/snapshots', json_body=snapshot_data)
+
+    def stream_guide(self, request, cancel_token=None, on_event=None):
+        """
+        가이드 생성을 요청하고 서버가 보내는 이벤트를 on_event(이벤트, dict)로 넘긴다 ('queued', 'progress', 'chunk').
+        끝나면 (status, result) — GuideWorker.finished와 같은 값. 취소되면 ("cancelled", 메시지).
+        """
+        from crawler import abort_response
+        response = self._send('POST', '/api/guide', json_body=request, headers={'Accept': 'text/event-stream'}, stream=True, cancel_token=cancel_token)
+        if response is None: return "cancelled", "작업이 취소되었습니다."
+        try:
+            with on_cancel(cancel_token, lambda: abort_response(response)):
+                self._raise_for_error(response)
+                event_name = None; data_lines = []
+                for line in response.iter_lines():
+                    if is_cancelled(cancel_token): break
+                    line = line.decode('utf-8')
+                    if line.startswith('event:'): event_name = line[6:].strip()
+                    elif line.startswith('data:'): data_lines.append(line[5:].lstrip())
+                    elif not line and event_name: # 빈 줄에서 이벤트 하나가 끝남
+                        data = json.loads("\n".join(data_lines)) if data_lines else {}
+                        if event_name == 'done': return data.get('status', 'error_server'), data.get('result')
+                        if on_event: on_event(event_name, data)
+                        event_name = None; data_lines = []
+        except Exception as e:
+            if is_cancelled(cancel_token): return "cancelled", "작업이 취소되었습니다."
+            if isinstance(e, GuideServerError): raise
+            raise GuideServerError(f"가이드 서버 응답을 받는 중 연결이 끊겼습니다: {e}")
+        finally:
+            response.close()
+        if is_cancelled(cancel_token): return "cancelled", "작업이 취소되었습니다."
+        raise GuideServerError("가이드 서버가 결과를 보내기 전에 연결을 닫았습니다.")
+
+    # --- 내부 ---
+    def _get_json(self, path, params=None, cancel_token=None, allow_not_found=False):
+        return self._request_json('GET', path, params=params, cancel_token=cancel_token, allow_not_found=allow_not_found)
+
+    def _request_json(self, method, path, params=None, json_body=None, cancel_token=None, allow_not_found=False):
+        response = self._send(method, path, params=params, json_body=json_body, cancel_token=cancel_token)
+        if response is None: return None
+        try:
+            if allow_not_found and response.status_code == 404: return None
+            self._raise_for_error(response)
+            return response.json()
+        except ValueError as e: raise GuideServerError(f"가이드 서버 응답이 올바른 JSON이 아닙니다: {e}")
+        finally: response.close()
+
+    def _send(self, method, path, params=None, json_body=None, headers=None, stream=False, cancel_token=None):
+        # 요청을 보내고 응답을 돌려준다. 취소되면 None
+        import requests
+        if self._session is None: self._session = requests.Session()
+        if is_cancelled(cancel_token): return None
+        request_headers = dict(headers or {})
+        if self.token: request_headers['Authorization'] = f"Bearer {self.token}"
+        try:
+            return self._session.request(method, self.base_url + path, params=params, json=json_body, headers=request_headers, stream=stream, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        except requests.exceptions.RequestException as e:
+            if is_cancelled(cancel_token): return None
+            raise GuideServerError(f"가이드 서버({self.base_url})에 연결할 수 없습니다: {e}")
+
+    def _raise_for_error(self, response):
+        if response.status_code < 400: return
+        try: message = response.json().get('error')
+        except ValueError: message = None
+        raise GuideServerError(f"가이드 서버 오류 ({response.status_code}): {message or response.reason}")
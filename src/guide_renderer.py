@@ -0,0 +1,160 @@
+# src/guide_renderer.py
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QTextCursor, QTextDocument, QTextDocumentFragment, QTextFrameFormat, QTextBlockFormat, QTextCharFormat
+
+from render_cache import get_shared_render_cache
+from tracing import NULL_TRACE
+
+def split_markdown_blocks(text, max_chunk_chars, stream_finished):
+    """
+    붙일 수 있는 완성 블록(빈 줄로 끝나는 부분)을 최대 max_chunk_chars까지 잘라 (앞부분, 나머지)로 반환한다.
+    코드 블록(```) 안의 빈 줄에서는 자르지 않는다. (PDF 내보내기에서도 문서를 조각조각 채울 때 사용)
+    """
+    cut = 0; in_code_fence = False; position = 0
+    for line in text.splitlines(keepends=True):
+        position += len(line)
+        if line.lstrip().startswith("```"): in_code_fence = not in_code_fence
+        if not in_code_fence and not line.strip() and line.endswith("\n"):
+            cut = position
+            if cut >= max_chunk_chars: break
+    if stream_finished and (cut == 0 or len(text) <= max_chunk_chars): cut = len(text) # 더 올 내용이 없으면 꼬리까지 전부
+    return text[:cut], text[cut:]
+
+class GuideRenderer(QObject):
+    """
+    가이드 출력창(QTextBrowser)용 렌더링 계층.
+    문서를 '헤더 프레임'(진행 상황/제목/요약)과 '본문'(LLM 가이드)으로 나누고,
+    - 헤더는 바뀔 때 헤더 프레임만 다시 그린다.
+    - 본문은 완성된 마크다운 블록(빈 줄 단위)만 문서 끝에 이어 붙인다.
+    실제 문서 갱신은 타이머로 초당 max_fps번까지만 하고, 한 번에 time_budget_ms 이상 붙이지 않는다.
+    그래서 수십 KB짜리 가이드나 스트리밍 출력에서도 UI 스레드가 멈추지 않는다.
+    본문 블록의 마크다운 변환 결과는 render_cache에 저장해 두고, 같은 가이드를 다시 열 때 재사용한다.
+    set_trace()로 요청 트레이스를 붙이면 flush마다 'render.flush' 구간을 남긴다.
+    """
+    def __init__(self, text_browser, max_fps=30, time_budget_ms=8, max_chunk_chars=4000, render_cache=None):
+        super().__init__(text_browser)
+        self.browser = text_browser
+        self.render_cache = render_cache if render_cache is not None else get_shared_render_cache()
+        self.time_budget = time_budget_ms / 1000.0
+        self.max_chunk_chars = max_chunk_chars
+        self._flush_timer = QTimer(self); self._flush_timer.setSingleShot(True); self._flush_timer.setInterval(int(1000 / max_fps))
+        self._flush_timer.timeout.connect(self.flush)
+        self._pending_header = None
+        self._pending_body = ""
+        self._stream_finished = True
+        self._header_frame = None
+        self.stats = {}
+        self.trace = NULL_TRACE
+        self._rendered_callbacks = []
+        self.clear()
+
+    # --- 공개 API ---
+    def clear(self):
+        self._flush_timer.stop(); self._notify_rendered() # 그리던 내용을 버려도 기다리던 쪽에는 끝났다고 알린다
+        self._pending_header = None; self._pending_body = ""; self._stream_finished = True
+        self.browser.document().clear(); self._header_frame = None # 헤더 프레임은 처음 그릴 때 만든다 (빈 문서의 placeholder 유지)
+        self.stats = {'flushes': 0, 'total_ms': 0.0, 'max_flush_ms': 0.0, 'body_chars': 0}
+
+    def set_header(self, markdown_text):
+        """진행 상황/제목 부분만 교체 (다음 flush 때 반영)."""
+        self._pending_header = markdown_text
+        self._schedule_flush()
+
+    def append_body(self, markdown_chunk):
+        """스트리밍 본문 조각 추가. 완성된 블록만 먼저 그리고, 마지막 미완성 블록은 다음 조각을 기다린다."""
+        if not markdown_chunk: return
+        self._pending_body += markdown_chunk; self._stream_finished = False
+        self._schedule_flush()
+
+    def set_body(self, markdown_text):
+        """본문 전체 교체. 큰 문서도 여러 프레임에 나눠 조금씩 붙인다."""
+        self._remove_body(); self.stats['body_chars'] = 0
+        self._pending_body = markdown_text or ""; self._stream_finished = True
+        self._schedule_flush()
+
+    def show(self, header_markdown, body_markdown):
+        """헤더+본문으로 이루어진 문서를 처음부터 새로 표시."""
+        self.clear(); self.set_header(header_markdown); self.set_body(body_markdown)
+
+    def finish(self):
+        """스트리밍 종료. 남은 미완성 블록까지 모두 그린다."""
+        self._stream_finished = True
+        self._schedule_flush()
+
+    def set_trace(self, trace):
+        """이후 flush를 기록할 요청 트레이스 (None이면 기록 안 함)."""
+        self.trace = trace if trace is not None else NULL_TRACE
+
+    def notify_when_rendered(self, callback):
+        """지금까지 받은 내용이 모두 그려지면 callback()을 한 번 호출한다 (스트리밍 중이면 finish() 이후)."""
+        self._rendered_callbacks.append(callback)
+        self._schedule_flush()
+
+    def has_pending(self):
+        return self._pending_header is not None or bool(self._pending_body)
+
+    def flush_all(self):
+        """남은 내용을 한 번에 모두 반영 (PDF 저장 등 즉시 완성된 문서가 필요할 때)."""
+        self._flush_timer.stop()
+        while self.has_pending(): self.flush(time_budget=None)
+
+    # --- 내부 구현 ---
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive(): self._flush_timer.start()
+
+    def flush(self, time_budget=-1):
+        if time_budget == -1: time_budget = self.time_budget
+        started = time.perf_counter(); out_of_budget = False; appended = False; header_replaced = self._pending_header is not None; body_chars_before = self.stats['body_chars']
+        if self._pending_header is not None:
+            self._replace_header(self._pending_header); self._pending_header = None
+        while self._pending_body:
+            chunk, rest = self._split_ready_blocks(self._pending_body, self._stream_finished)
+            if not chunk: break # 미완성 블록만 남음 -> 다음 조각이 오면 다시 flush
+            self._append_fragment(chunk); self._pending_body = rest; self.stats['body_chars'] += len(chunk); appended = True
+            if time_budget is not None and time.perf_counter() - started > time_budget: out_of_budget = True; break
+        ended = time.perf_counter(); elapsed_ms = (ended - started) * 1000
+        self.trace.add_span('render.flush', started, ended, header=header_replaced, chars=self.stats['body_chars'] - body_chars_before)
+        self.stats['flushes'] += 1; self.stats['total_ms'] += elapsed_ms; self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed_ms)
+        if out_of_budget and self._pending_body: self._schedule_flush() # 나머지는 다음 프레임에
+        elif appended and not self.has_pending() and self._stream_finished:
+            print(f"가이드 렌더링 완료: {self.stats['body_chars']}자, flush {self.stats['flushes']}회, 총 {self.stats['total_ms']:.1f}ms, 최대 {self.stats['max_flush_ms']:.1f}ms / {self.render_cache.stats_summary()}")
+        if not self.has_pending() and self._stream_finished: self._notify_rendered()
+
+    def _notify_rendered(self):
+        callbacks = self._rendered_callbacks; self._rendered_callbacks = []
+        for callback in callbacks: callback()
+
+    def _split_ready_blocks(self, text, stream_finished):
+        return split_markdown_blocks(text, self.max_chunk_chars, stream_finished)
+
+    def _markdown_fragment(self, markdown_text):
+        scratch_document = QTextDocument(); scratch_document.setMarkdown(markdown_text)
+        return QTextDocumentFragment(scratch_document)
+
+    def _ensure_header_frame(self):
+        if self._header_frame is None:
+            header_frame_format = QTextFrameFormat(); header_frame_format.setBottomMargin(8)
+            self._header_frame = QTextCursor(self.browser.document()).insertFrame(header_frame_format)
+        return self._header_frame
+
+    def _replace_header(self, markdown_text):
+        self._ensure_header_frame()
+        cursor = self._header_frame.firstCursorPosition()
+        cursor.setPosition(self._header_frame.lastPosition(), QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        if markdown_text: cursor.insertFragment(self._markdown_fragment(markdown_text))
+
+    def _remove_body(self):
+        if self._header_frame is None: return
+        document = self.browser.document()
+        cursor = QTextCursor(document); cursor.setPosition(self._header_frame.lastPosition() + 1)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+
+    def _append_fragment(self, markdown_text):
+        self._ensure_header_frame()
+        cursor = QTextCursor(self.browser.document()); cursor.movePosition(QTextCursor.End)
+        if cursor.block().length() > 1: cursor.insertBlock(QTextBlockFormat(), QTextCharFormat()) # 이전 블록 서식이 이어지지 않게 새 블록에서 시작
+        cursor.insertFragment(self.render_cache.fragment_for(markdown_text))
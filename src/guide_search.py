@@ -0,0 +1,81 @@
+# src/guide_search.py
+import re
+
+# 가이드 본문(generated_guide_text_markdown)과 사용자 노트(user_notes_text) 전문 검색.
+# 한국어 형태소 분석기 없이도 검색되도록 글자 2-gram(바이그램)으로 쪼갠 문자열을 SQLite FTS5에 넣는다.
+# 예) "겨울의 낙인" -> "겨울 울의 낙인". 검색어도 같은 방식으로 쪼개서 '연속된 바이그램 구문'으로 찾으므로
+#     사실상 부분 문자열 검색이 되고, 순위는 FTS5의 bm25로 매긴다.
+# (파이썬 sqlite3에서는 FTS5 토크나이저를 직접 등록할 수 없어서, 미리 쪼갠 문자열을 저장하는 방식을 씀)
+
+_WORD_RUN_PATTERN = re.compile(r"[^\W_]+") # 글자/숫자가 이어진 구간 (한글, 영어, 숫자)
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS guide_fts USING fts5(guide, notes);
+"""
+
+def bigram_text(text):
+    """텍스트를 소문자 바이그램 토큰 문자열로 바꾼다. 한 글자짜리 구간은 그 글자 하나를 토큰으로 쓴다."""
+    tokens = []
+    for run in _WORD_RUN_PATTERN.findall((text or "").lower()):
+        if len(run) == 1: tokens.append(run)
+        else: tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return " ".join(tokens)
+
+def build_match_query(query_text):
+    """
+    검색어를 FTS5 MATCH 구문으로 바꾼다. 단어(구간)마다 바이그램 구문을 만들고 AND로 묶는다.
+    한 글자 검색어는 그 글자로 시작하는 바이그램의 접두어 검색으로 대신한다.
+    검색할 글자가 없으면 None.
+    """
+    clauses = []
+    for run in _WORD_RUN_PATTERN.findall((query_text or "").lower()):
+        if len(run) == 1: clauses.append(f'"{run}"*')
+        else: clauses.append('"' + " ".join(run[i:i + 2] for i in range(len(run) - 1)) + '"')
+    return " AND ".join(clauses) if clauses else None
+
+def make_snippet(text, query_text, context_chars=40):
+    """원문에서 검색어(없으면 가장 긴 단어)가 처음 나오는 곳 주변을 잘라 **굵게** 표시한 발췌문을 만든다."""
+    if not text: return ""
+    lowered = text.lower()
+    candidates = [query_text.strip().lower()] + sorted(_WORD_RUN_PATTERN.findall(query_text.lower()), key=len, reverse=True)
+    for candidate in candidates:
+        position = lowered.find(candidate) if candidate else -1
+        if position >= 0:
+            start = max(0, position - context_chars); end = min(len(text), position + len(candidate) + context_chars)
+            snippet = ("..." if start > 0 else "") + text[start:position] + "**" + text[position:position + len(candidate)] + "**" + text[position + len(candidate):end] + ("..." if end < len(text) else "")
+            return " ".join(snippet.split())
+    return " ".join(text[:context_chars * 2].split()) + "..."
+
+
+class GuideSearchIndex:
+    """
+    스냅샷 라이브러리 DB 안의 FTS5 색인. 문서 rowid는 snapshots.id와 같다.
+    SnapshotLibrary가 스냅샷을 색인할 때마다 index_document()로 함께 갱신한다(증분 갱신).
+    """
+    def __init__(self, conn):
+        self._conn = conn
+        self._conn.executescript(_SCHEMA)
+
+    def index_document(self, snapshot_id, guide_text, notes_text):
+        self._conn.execute("DELETE FROM guide_fts WHERE rowid = ?", (snapshot_id,))
+        self._conn.execute("INSERT INTO guide_fts (rowid, guide, notes) VALUES (?, ?, ?)", (snapshot_id, bigram_text(guide_text), bigram_text(notes_text)))
+
+    def remove_document(self, snapshot_id):
+        self._conn.execute("DELETE FROM guide_fts WHERE rowid = ?", (snapshot_id,))
+
+    def indexed_ids(self):
+        return {row[0] for row in self._conn.execute("SELECT rowid FROM guide_fts")}
+
+    def search(self, query_text, where_sql="", where_params=(), limit=50):
+        """
+        (snapshot 행 dict, 점수) 목록을 관련도 순으로 반환한다. 점수는 낮을수록(더 음수일수록) 관련도가 높다(bm25).
+        where_sql은 snapshots 테이블(s)에 대한 추가 조건 (메타데이터 필터).
+        """
+        match_query = build_match_query(query_text)
+        if match_query is None: return []
+        rows = self._conn.execute(f"""
+            SELECT s.*, bm25(guide_fts, 1.0, 0.5) AS score
+            FROM guide_fts JOIN snapshots s ON s.id = guide_fts.rowid
+            WHERE guide_fts MATCH ? {('AND ' + where_sql) if where_sql else ''}
+            ORDER BY score LIMIT ?""", (match_query, *where_params, limit)).fetchall()
+        return [(dict(row), row['score']) for row in rows]
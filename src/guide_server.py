@@ -0,0 +1,453 @@
+# src/guide_server.py
+import argparse
+import hashlib
+import hmac
+import importlib
+import json
+import os
+import queue
+import re
+import select
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from utils import resource_path
+from settings_store import get_settings_file
+from metrics import REGISTRY, CACHE_LOOKUPS, CACHE_EVICTIONS, PROMETHEUS_CONTENT_TYPE, configure_metrics_exporters, shutdown_metrics_exporters
+from tracing import configure_tracing
+from prefetch import ItemPrefetcher
+from league_version import get_league_version_tracker, UNKNOWN_NAMESPACE
+from popularity import PopularityLog, CacheWarmer
+from item_name_mapper import get_poedb_identifier, is_known_poedb_identifier, get_item_name_for_identifier
+from app_planner import GuideWorker, BACKGROUND_WARM_MODULES
+from PyQt5.QtCore import Qt
+
+# 가이드 생성 파이프라인을 로컬 HTTP로 여러 사람이 함께 쓰는 서버 모드 (창 없이 실행).
+#   python src/guide_server.py [--host 127.0.0.1] [--port 8765] [--workers 4] [--queue-size 16]
+# API 키(api_keys.txt)와 모델(config.ini [LLM_MODELS])은 서버 쪽 것을 쓰고, 아이템 정보/LLM 응답은 요청끼리 캐시를 공유한다.
+# 클라이언트(앱)는 config.ini [SERVER] URL에 이 서버 주소를 적으면 poedb/LLM 대신 여기로 요청한다 (guide_client.py).
+#
+#   GET  /api/health                  상태, 작업자/대기열 현황
+#   GET  /api/league                  현재 리그 정보 {name, version}
+#   GET  /api/resolve?name=...        아이템 이름 -> poedb 식별자 {query, poedb_id, known}
+#   GET  /api/item?id=...             아이템 상세 정보 (id는 poedb 식별자 또는 URL, name=으로 이름도 가능)
+#   POST /api/guide                   가이드 생성. 본문 JSON: item, llm, char_class, ascendancy, league_mode, league_season, notes
+#                                     Accept: text/event-stream (또는 ?stream=1)이면 progress/chunk/done 이벤트로 스트리밍
+#   GET  /api/snapshots?q=&item=...   스냅샷 라이브러리 검색 (q가 있으면 본문 검색), base_class 등 필터
+#   GET  /api/snapshots/<id>          스냅샷 전체 내용
+#   POST /api/snapshots               스냅샷 저장 (본문: 스냅샷 JSON) -> 서버의 server_snapshots 폴더 + 라이브러리 색인
+#   GET  /metrics                     Prometheus 지표
+# config.ini [SERVER] TOKEN이 있으면 모든 요청에 'Authorization: Bearer <TOKEN>' 헤더가 필요하다 (/metrics 포함, Prometheus는 scrape 설정의 authorization으로).
+CONFIG_FILE_PATH = resource_path('config.ini')
+SERVER_SNAPSHOT_DIR = resource_path('server_snapshots')
+SERVER_POPULARITY_LOG_PATH = resource_path('server_popularity_log.jsonl') # 앱의 popularity_log.jsonl과 따로 (서버를 쓰는 앱의 요청이 두 번 세어지지 않도록)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_REQUEST_BODY_BYTES = 4 * 1024 * 1024
+LEAGUE_INFO_TTL_SECONDS = 600
+CLIENT_POLL_SECONDS = 0.5 # 스트리밍이 아닌 가이드 요청을 기다리는 동안 클라이언트 연결을 확인하는 간격
+
+SERVER_REQUESTS = REGISTRY.counter('poeplanner_server_http_requests_total', "가이드 서버 HTTP 요청 수 (경로/상태 코드별)", ['route', 'code'])
+
+class ServerBusyError(Exception):
+    """작업자와 대기열이 모두 찬 상태. 클라이언트에는 503으로 전달된다."""
+    pass
+
+
+class SharedItemCache(ItemPrefetcher):
+    """
+    여러 클라이언트가 함께 쓰는 아이템 정보 캐시 (GuideWorker의 item_prefetcher 자리에 넣는다).
+    앱의 미리 가져오기와 달리 take()에서 없는 항목을 바로 가져오기 시작하고, 같은 항목을 동시에 요청하면 한 번만 가져와서 나눠 준다.
+    가져오기는 작업 스레드 하나에서 차례로 하므로 poedb에는 한 번에 한 요청만 간다.
+    한 클라이언트가 취소해도 가져오기 자체는 끝까지 해서 캐시에 넣는다 (기다리던 다른 요청을 위해).
+    """
+    metrics_cache_name = 'server_item'
+
+    def take(self, key, cancel_token=None):
+        if key: self._start_fetch(key)
+        return super().take(key, cancel_token)
+
+
+class GuideCache:
+    """
+    LLM 응답 공유 캐시. (LLM, 모델, 프롬프트 전체)가 같은 요청에는 LLM을 다시 부르지 않고 저장된 가이드를 돌려준다.
+    가이드는 만든 시점의 리그 버전과 함께 저장되고 다른 버전에서는 쓰지 않는다. 새 버전이 감지되면 이전 버전 가이드는 버린다
+    (LLM 호출은 비싸므로 다시 만들어 두지는 않음).
+    """
+    def __init__(self, cache_ttl_seconds=3600, max_cached_guides=256, version_tracker=None):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cached_guides = max_cached_guides
+        self.version_tracker = version_tracker or get_league_version_tracker()
+        self._lock = threading.Lock()
+        self._cache = OrderedDict() # 키 해시 -> (저장 시각, 가이드 본문, 리그 버전)
+        self.version_tracker.add_listener(self.on_league_version_changed)
+
+    def get(self, key):
+        digest = self._digest(key); namespace = self.version_tracker.namespace()
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is not None and (time.monotonic() - entry[0] > self.cache_ttl_seconds or entry[2] != namespace): del self._cache[digest]; entry = None
+            if entry is not None: self._cache.move_to_end(digest)
+        CACHE_LOOKUPS.inc(cache='server_guide', result='hit' if entry is not None else 'miss')
+        return entry[1] if entry is not None else None
+
+    def put(self, key, guide_text):
+        if not guide_text: return
+        digest = self._digest(key)
+        with self._lock:
+            self._cache[digest] = (time.monotonic(), guide_text, self.version_tracker.namespace()); self._cache.move_to_end(digest)
+            while len(self._cache) > self.max_cached_guides: self._cache.popitem(last=False)
+
+    def on_league_version_changed(self, previous_version, new_version):
+        """리그 버전 리스너. 이전 버전 가이드를 버린다 (처음 알게 된 버전이면 버전 모름 가이드는 그 버전 것으로 본다)."""
+        with self._lock:
+            if previous_version is None:
+                for digest, (stored_at, guide_text, namespace) in list(self._cache.items()):
+                    if namespace == UNKNOWN_NAMESPACE: self._cache[digest] = (stored_at, guide_text, new_version)
+                return
+            stale = [digest for digest, entry in self._cache.items() if entry[2] != new_version]
+            for digest in stale: del self._cache[digest]
+        if stale: CACHE_EVICTIONS.inc(len(stale), cache='server_guide'); print(f"리그 버전 {new_version}: 가이드 캐시 {len(stale)}개 비움")
+
+    def _digest(self, key):
+        return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode('utf-8')).hexdigest() # 프롬프트가 길어서 해시만 키로 보관
+
+
+class GuideService:
+    """
+    서버가 요청을 처리하는 부분 (HTTP와 무관). 가이드 생성은 GuideWorker를 작업자 수가 정해진 스레드 풀에서 그대로 돌리고,
+    작업자 + 대기열 자리가 모두 차면 ServerBusyError로 바로 거절한다.
+    """
+    def __init__(self, chatgpt_model_id, gemini_model_id, max_workers=4, max_queued=16):
+        self.chatgpt_model_id = chatgpt_model_id; self.gemini_model_id = gemini_model_id
+        self.max_workers = max_workers; self.max_queued = max_queued
+        self.item_cache = SharedItemCache(cache_ttl_seconds=1800, max_cached_bytes=32 * 1024 * 1024)
+        self.guide_cache = GuideCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="guide-worker")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._lock = threading.Lock(); self.active = 0; self.queued = 0
+        self._league_lock = threading.Lock(); self._league_info = None; self._league_fetched_at = None
+        self.version_tracker = get_league_version_tracker(); self._league_watch_stop = threading.Event()
+        self._library = None; self._library_lock = threading.Lock()
+        self.popularity_log = None; self.cache_warmer = None # start_cache_warmer / main에서 config.ini [WARMER]에 따라
+
+    def status(self):
+        with self._lock: return {'status': 'ok', 'workers': self.max_workers, 'active': self.active, 'queued': self.queued, 'max_queued': self.max_queued}
+
+    def shutdown(self):
+        self._league_watch_stop.set(); self.item_cache.shutdown(); self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache_warmer: self.cache_warmer.stop()
+
+    def is_idle(self):
+        with self._lock: return self.active == 0 and self.queued == 0
+
+    # --- 아이템 ---
+    def resolve(self, item_name):
+        poedb_id = get_poedb_identifier(item_name)
+        return {'query': item_name, 'poedb_id': poedb_id, 'known': bool(poedb_id) and is_known_poedb_identifier(poedb_id)}
+
+    def fetch_item(self, identifier_or_url):
+        return self.item_cache.take(identifier_or_url)
+
+    def league_info(self):
+        with self._league_lock: # 여러 요청이 동시에 와도 poedb 홈페이지는 한 번만
+            if self._league_fetched_at is None or time.monotonic() - self._league_fetched_at > LEAGUE_INFO_TTL_SECONDS:
+                from crawler import get_current_league_info_from_poedb
+                league_info = get_current_league_info_from_poedb()
+                if league_info: self._league_info = league_info; self._league_fetched_at = time.monotonic() # 실패하면 이전 값을 주고 다음 요청에서 다시 시도
+            league_info = self._league_info
+        self.version_tracker.update(league_info) # 새 패치면 이 스레드에서 캐시를 비우고 아이템을 다시 가져오기 시작
+        return league_info
+
+    def start_league_watch(self, interval_seconds=LEAGUE_INFO_TTL_SECONDS):
+        """리그 정보를 시작할 때 한 번, 이후 interval_seconds마다 백그라운드에서 다시 가져온다 (요청이 없어도 패치 날 캐시가 바뀌도록)."""
+        def watch():
+            while True:
+                try: self.league_info()
+                except Exception as e: print(f"리그 정보 확인 중 오류: {e}")
+                if self._league_watch_stop.wait(interval_seconds): return
+        threading.Thread(target=watch, name="league-watch", daemon=True).start()
+
+    # --- 가이드 ---
+    def submit_guide(self, request, on_event):
+        """
+        가이드 생성을 풀에 넣고 GuideWorker를 돌려준다 (취소용). 진행 상황은 on_event(이벤트, dict)로 작업자 스레드에서 전달된다:
+        'queued' {position}, 'progress' {percent, message}, 'chunk' {text}, 'done' {status, result}
+        """
+        if not self._slots.acquire(blocking=False): raise ServerBusyError(f"서버가 바쁩니다 (작업 {self.max_workers}개, 대기 {self.max_queued}개가 모두 찼습니다). 잠시 후 다시 시도해주세요.")
+        self._record_request(request)
+        worker = GuideWorker(request['item'], request['llm'], request['char_class'], request['ascendancy'], request['league_mode'], request['league_season'],
+                             self.chatgpt_model_id, self.gemini_model_id, request['notes'], item_prefetcher=self.item_cache, guide_cache=self.guide_cache)
+        worker.progress.connect(lambda percent, message: on_event('progress', {'percent': percent, 'message': message}), Qt.DirectConnection)
+        worker.guide_chunk.connect(lambda text: on_event('chunk', {'text': text}), Qt.DirectConnection)
+        worker.finished.connect(lambda status, result: on_event('done', {'status': status, 'result': result}), Qt.DirectConnection)
+        with self._lock:
+            self.queued += 1; position = self.queued + self.active - self.max_workers
+        if position > 0: on_event('queued', {'position': position})
+        try: self._executor.submit(self._run_worker, worker)
+        except RuntimeError: # 종료 중
+            with self._lock: self.queued -= 1
+            self._slots.release(); raise ServerBusyError("서버가 종료 중입니다.")
+        return worker
+
+    def _record_request(self, request):
+        # 인기 요청 기록 (익명: 매핑 테이블에 있는 아이템만 식별자로, 노트는 유무만)
+        if self.popularity_log is None: return
+        poedb_id = self.resolve(request['item'])['poedb_id'] if request['item'] and not request['item'].startswith("http") else None
+        self.popularity_log.record(poedb_id if poedb_id and is_known_poedb_identifier(poedb_id) else None, request['char_class'], request['ascendancy'],
+                                   request['league_mode'], request['league_season'], request['llm'], has_notes=bool(request['notes']))
+
+    # --- 인기 요청 캐시 데우기 ---
+    def start_cache_warmer(self, popularity_log, top_n=10, llm_budget_per_day=0, interval_seconds=300):
+        """한가할 때 인기 상위 아이템 정보를 다시 가져오고, LLM 예산 안에서 인기 가이드를 미리 만들어 두는 스레드를 시작한다."""
+        self.popularity_log = popularity_log
+        self.cache_warmer = CacheWarmer(popularity_log, self.item_cache.warm, self.warm_guide if llm_budget_per_day > 0 else None, self.is_idle,
+                                        top_n=top_n, llm_budget_per_day=llm_budget_per_day, interval_seconds=interval_seconds)
+        self.version_tracker.add_listener(lambda previous_version, new_version: previous_version and self.cache_warmer.wake()) # 새 패치로 캐시가 비면 바로 다시 데움
+        self.cache_warmer.start()
+
+    def warm_guide(self, key):
+        """기록해 둔 요청 키 하나로 가이드를 만들어 가이드 캐시에 넣는다 (노트 없이). LLM을 실제로 불렀으면 True."""
+        item_query = (get_item_name_for_identifier(key['item']) or "") if key.get('item') else ""
+        if not item_query and key.get('item'): return False # 매핑 테이블에서 빠진 아이템
+        if not self._slots.acquire(blocking=False): return False # 작업자 자리를 하나 차지해서 서버 용량 계산을 맞춘다
+        try:
+            worker = GuideWorker(item_query, key['llm'] or "ChatGPT", key['char_class'] or "클래스 선택 안함", key['ascendancy'], key['league_mode'] or "소프트코어", key['league_season'] or "시즌",
+                                 self.chatgpt_model_id, self.gemini_model_id, "", item_prefetcher=self.item_cache, guide_cache=self.guide_cache)
+            worker.run()
+            return worker.guide_from_cache is False
+        finally: self._slots.release()
+
+    def _run_worker(self, worker):
+        with self._lock: self.queued -= 1; self.active += 1
+        try: worker.run()
+        finally:
+            with self._lock: self.active -= 1
+            self._slots.release()
+
+    # --- 스냅샷 ---
+    def snapshot_library(self):
+        with self._library_lock:
+            if self._library is None:
+                from snapshot_library import SnapshotLibrary
+                self._library = SnapshotLibrary()
+            return self._library
+
+    def save_snapshot(self, snapshot_data):
+        """클라이언트가 보낸 스냅샷을 서버 폴더에 2.1 형식(blob 저장소 공유)으로 저장하고 라이브러리에 색인한다. (스냅샷 id, 경로)"""
+        from snapshot_io import validate_snapshot_data, write_snapshot, COMPACT_SNAPSHOT_EXTENSION
+        from blob_store import get_default_blob_store
+        validate_snapshot_data(snapshot_data)
+        item_name = ((snapshot_data.get('crawled_item_data') or {}).get('name') or (snapshot_data.get('query_inputs') or {}).get('item_input_text') or "일반가이드")
+        safe_item_name = re.sub(r'[\\/*?:"<>|\s]+', "_", str(item_name))[:40]
+        os.makedirs(SERVER_SNAPSHOT_DIR, exist_ok=True)
+        file_path = os.path.join(SERVER_SNAPSHOT_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{safe_item_name}{COMPACT_SNAPSHOT_EXTENSION}")
+        written_version = write_snapshot(file_path, snapshot_data, blob_store=get_default_blob_store())
+        return self.snapshot_library().add_snapshot(file_path, {**snapshot_data, 'snapshot_version': written_version}), file_path
+
+
+def guide_request_from_json(body):
+    """POST /api/guide 본문을 GuideWorker 인자로 정리한다. 형식이 틀리면 ValueError."""
+    if not isinstance(body, dict): raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+    request = {'item': body.get('item') or "", 'llm': body.get('llm') or "ChatGPT", 'char_class': body.get('char_class') or "클래스 선택 안함",
+               'ascendancy': body.get('ascendancy') or "", 'league_mode': body.get('league_mode') or "소프트코어",
+               'league_season': body.get('league_season') or "시즌", 'notes': body.get('notes') or ""}
+    if any(not isinstance(value, str) for value in request.values()): raise ValueError("요청 값은 모두 문자열이어야 합니다.")
+    if request['llm'] not in ("ChatGPT", "Gemini"): raise ValueError(f"알 수 없는 LLM입니다: {request['llm']} (ChatGPT 또는 Gemini)")
+    if request['char_class'] == "클래스 선택 안함" and not request['item'].strip(): raise ValueError("아이템이 없으면 char_class(기본 클래스)를 지정해야 합니다.")
+    request['item'] = request['item'].strip()
+    return request
+
+
+class GuideRequestHandler(BaseHTTPRequestHandler):
+    server_version = "PoEPlannerGuideServer/1.0"
+    ROUTES = ('GET /api/health', 'GET /api/league', 'GET /api/resolve', 'GET /api/item', 'POST /api/guide',
+              'GET /api/snapshots', 'GET /api/snapshots/<id>', 'POST /api/snapshots', 'GET /metrics')
+
+    def log_message(self, format, *args): pass # 요청마다 찍지 않음 (지표로 확인)
+
+    def do_GET(self): self._dispatch('GET')
+    def do_POST(self): self._dispatch('POST')
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path); path = url.path.rstrip('/') or '/'; query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = f"{method} {re.sub(r'/[0-9]+$', '/<id>', path)}"
+        self.response_code = None
+        try:
+            if not self._authorized(): self._send_json(401, {'error': "인증 토큰이 필요합니다 (Authorization: Bearer <TOKEN>)."}); return
+            handler = {
+                'GET /api/health': lambda: self._send_json(200, self.server.service.status()),
+                'GET /api/league': lambda: self._send_json(200, self.server.service.league_info() or {}),
+                'GET /api/resolve': lambda: self._handle_resolve(query),
+                'GET /api/item': lambda: self._handle_item(query),
+                'POST /api/guide': lambda: self._handle_guide(query),
+                'GET /api/snapshots': lambda: self._handle_snapshot_search(query),
+                'GET /api/snapshots/<id>': lambda: self._handle_snapshot_get(int(path.rsplit('/', 1)[1])),
+                'POST /api/snapshots': self._handle_snapshot_save,
+                'GET /metrics': self._handle_metrics,
+            }.get(route)
+            if handler is None: self._send_json(404, {'error': f"없는 경로입니다: {method} {path}"}); return
+            handler()
+        except ValueError as e: self._send_json(400, {'error': str(e)})
+        except ServerBusyError as e: self._send_json(503, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError): self.response_code = self.response_code or 499 # 클라이언트가 먼저 끊음
+        except Exception as e:
+            print(f"가이드 서버 요청 처리 중 오류 ({route}): {e}")
+            if self.response_code is None: self._send_json(500, {'error': f"서버 내부 오류: {e}"})
+        finally:
+            SERVER_REQUESTS.inc(route=route if route in self.ROUTES else 'unknown', code=self.response_code or 0) # 없는 경로는 한 레이블로 (지표 종류가 끝없이 늘지 않도록)
+
+    def _client_disconnected(self):
+        # 요청 본문은 다 읽었으므로, 소켓이 읽기 가능한데 읽을 것이 없으면(EOF) 클라이언트가 끊은 것이다
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+        except (OSError, ValueError): return True # 이미 닫힌 소켓
+
+    def _authorized(self):
+        token = self.server.token
+        return not token or hmac.compare_digest(self.headers.get('Authorization', '').encode('utf-8'), f"Bearer {token}".encode('utf-8')) # 비교 시간으로 토큰이 새지 않도록
+
+    # --- 응답 쓰기 ---
+    def _send_json(self, code, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.response_code = code
+        self.send_response(code); self.send_header("Content-Type", "application/json; charset=utf-8"); self.send_header("Content-Length", str(len(body)))
+        if code == 503: self.send_header("Retry-After", "5")
+        self.end_headers(); self.wfile.write(body)
+
+    def _read_json_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BODY_BYTES: raise ValueError(f"요청 본문이 너무 큽니다 ({length} > {MAX_REQUEST_BODY_BYTES} 바이트).")
+        try: return json.loads(self.rfile.read(length).decode('utf-8')) if length else {}
+        except (json.JSONDecodeError, UnicodeDecodeError) as e: raise ValueError(f"요청 본문이 올바른 JSON이 아닙니다: {e}")
+
+    # --- 경로별 처리 ---
+    def _handle_resolve(self, query):
+        if not query.get('name', '').strip(): raise ValueError("name 파라미터가 필요합니다.")
+        self._send_json(200, self.server.service.resolve(query['name'].strip()))
+
+    def _handle_item(self, query):
+        identifier = query.get('id', '').strip()
+        if not identifier and query.get('name', '').strip(): identifier = self.server.service.resolve(query['name'].strip())['poedb_id'] or ""
+        if not identifier: raise ValueError("id(poedb 식별자/URL) 또는 name 파라미터가 필요합니다.")
+        item_data = self.server.service.fetch_item(identifier)
+        if item_data: self._send_json(200, item_data)
+        else: self._send_json(404, {'error': f"'{identifier}' 아이템 정보를 가져오지 못했습니다."})
+
+    def _handle_guide(self, query):
+        request = guide_request_from_json(self._read_json_body())
+        stream = query.get('stream') == '1' or 'text/event-stream' in self.headers.get('Accept', '')
+        events = queue.Queue()
+        worker = self.server.service.submit_guide(request, lambda event, data: events.put((event, data)))
+        if not stream: # 끝날 때까지 기다렸다가 한 번에 (기다리는 동안 클라이언트가 끊으면 SSE와 같이 작업도 멈춘다)
+            while True:
+                try: event, data = events.get(timeout=CLIENT_POLL_SECONDS)
+                except queue.Empty:
+                    if self._client_disconnected(): worker.cancel(); raise ConnectionResetError("가이드를 기다리던 클라이언트가 연결을 끊었습니다.")
+                    continue
+                if event == 'done': self._send_json(200, data); return
+        self.response_code = 200
+        self.send_response(200); self.send_header("Content-Type", "text/event-stream; charset=utf-8"); self.send_header("Cache-Control", "no-cache"); self.end_headers()
+        try:
+            while True:
+                event, data = events.get()
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')); self.wfile.flush()
+                if event == 'done': return
+        except (BrokenPipeError, ConnectionResetError):
+            worker.cancel(); raise # 클라이언트가 끊으면 크롤링/LLM 호출도 바로 멈춘다
+
+    def _handle_snapshot_search(self, query):
+        from snapshot_library import FILTER_COLUMNS
+        library = self.server.service.snapshot_library(); limit = min(int(query.get('limit') or 100), 1000)
+        filters = {column: query[column] for column in FILTER_COLUMNS if query.get(column)}
+        if query.get('q', '').strip(): entries = library.search_text(query['q'].strip(), limit=limit, item_text=query.get('item', '').strip(), **filters)
+        else: entries = library.search(item_text=query.get('item', '').strip(), limit=limit, **filters)
+        self._send_json(200, {'count': library.count(), 'entries': entries})
+
+    def _handle_snapshot_get(self, snapshot_id):
+        from snapshot_io import SnapshotFormatError
+        library = self.server.service.snapshot_library()
+        if library.get_entry(snapshot_id) is None: self._send_json(404, {'error': f"스냅샷 {snapshot_id}이(가) 없습니다."}); return
+        try: snapshot_data = library.load_snapshot(snapshot_id)
+        except (OSError, SnapshotFormatError) as e: self._send_json(410, {'error': f"스냅샷 파일을 읽을 수 없습니다: {e}"}); return
+        self._send_json(200, snapshot_data)
+
+    def _handle_snapshot_save(self):
+        from snapshot_io import SnapshotFormatError
+        try: snapshot_id, file_path = self.server.service.save_snapshot(self._read_json_body())
+        except SnapshotFormatError as e: raise ValueError(str(e))
+        self._send_json(201, {'id': snapshot_id, 'file_path': file_path})
+
+    def _handle_metrics(self):
+        body = REGISTRY.render_prometheus().encode('utf-8')
+        self.response_code = 200
+        self.send_response(200); self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE); self.send_header("Content-Length", str(len(body))); self.end_headers()
+        self.wfile.write(body)
+
+
+class GuideServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, token=None):
+        super().__init__(address, GuideRequestHandler)
+        self.service = service; self.token = token or None
+
+
+def load_server_config(config_path=CONFIG_FILE_PATH):
+    """config.ini에서 서버가 쓸 값(모델, [SERVER], 트레이싱/지표 설정)을 읽는다."""
+    config = get_settings_file(config_path).config()
+    try: configure_tracing(config.getboolean('TRACING', 'ENABLED', fallback=False), config.get('TRACING', 'OUTPUT_DIR', fallback='').strip() or None, config.getfloat('TRACING', 'SLOW_THRESHOLD_MS', fallback=0))
+    except ValueError as e: print(f"경고: config.ini [TRACING] 설정 값 오류, 트레이싱을 끕니다: {e}"); configure_tracing(False)
+    try: configure_metrics_exporters(0, dump_file=config.get('METRICS', 'DUMP_FILE', fallback='').strip() or None, dump_interval_seconds=config.getfloat('METRICS', 'DUMP_INTERVAL_SECONDS', fallback=60)) # HTTP 지표는 서버의 /metrics로
+    except ValueError as e: print(f"경고: config.ini [METRICS] 설정 값 오류, 지표 내보내기를 끕니다: {e}"); configure_metrics_exporters()
+    return {'chatgpt_model': config.get('LLM_MODELS', 'CHATGPT_MODEL', fallback='').strip() or "gpt-4o-mini",
+            'gemini_model': config.get('LLM_MODELS', 'GEMINI_MODEL', fallback='').strip() or "models/gemini-1.5-flash-latest",
+            'host': config.get('SERVER', 'HOST', fallback='').strip() or DEFAULT_HOST, 'port': config.getint('SERVER', 'PORT', fallback=DEFAULT_PORT),
+            'workers': config.getint('SERVER', 'WORKERS', fallback=4), 'queue_size': config.getint('SERVER', 'QUEUE_SIZE', fallback=16),
+            'token': config.get('SERVER', 'TOKEN', fallback='').strip() or None,
+            'record_requests': config.getboolean('WARMER', 'RECORD_REQUESTS', fallback=True), 'warmer_enabled': config.getboolean('WARMER', 'ENABLED', fallback=False),
+            'warmer_top_n': config.getint('WARMER', 'TOP_N', fallback=10), 'warmer_llm_budget_per_day': config.getint('WARMER', 'LLM_BUDGET_PER_DAY', fallback=0),
+            'warmer_interval_seconds': config.getfloat('WARMER', 'INTERVAL_SECONDS', fallback=300)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PoE 플래너 가이드 서버 (여러 사람이 캐시를 공유하며 쓰는 로컬 HTTP 모드)")
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help="설정 파일 (기본: 프로그램 폴더의 config.ini)")
+    parser.add_argument('--host', help=f"받을 주소 (기본: config.ini [SERVER] HOST 또는 {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, help=f"포트 (기본: config.ini [SERVER] PORT 또는 {DEFAULT_PORT})")
+    parser.add_argument('--workers', type=int, help="동시에 처리할 가이드 요청 수 (기본 4)")
+    parser.add_argument('--queue-size', type=int, help="작업자가 모두 바쁠 때 기다릴 수 있는 요청 수, 넘으면 503 (기본 16)")
+    args = parser.parse_args()
+    settings = load_server_config(args.config)
+    for key in ('host', 'port', 'workers', 'queue_size'):
+        if getattr(args, key) is not None: settings[key] = getattr(args, key)
+    if settings['host'] not in ("127.0.0.1", "localhost", "::1") and not settings['token']:
+        print(f"경고: {settings['host']}에서 인증 없이 받습니다. 같은 네트워크의 누구나 서버의 API 키로 가이드를 만들 수 있으니 [SERVER] TOKEN 설정을 권장합니다.")
+
+    for module_name in BACKGROUND_WARM_MODULES: # 첫 요청이 임포트를 기다리지 않도록 (crawler, LLM SDK)
+        try: importlib.import_module(module_name)
+        except Exception as e: print(f"알림: '{module_name}' 미리 임포트 실패 (실제 사용 시 다시 시도): {e}")
+    service = GuideService(settings['chatgpt_model'], settings['gemini_model'], max_workers=max(1, settings['workers']), max_queued=max(0, settings['queue_size']))
+    server = GuideServer((settings['host'], settings['port']), service, token=settings['token'])
+    service.start_league_watch()
+    if settings['warmer_enabled']:
+        service.start_cache_warmer(PopularityLog(SERVER_POPULARITY_LOG_PATH), top_n=max(1, settings['warmer_top_n']), llm_budget_per_day=max(0, settings['warmer_llm_budget_per_day']), interval_seconds=max(10, settings['warmer_interval_seconds']))
+        print(f"인기 요청 캐시 데우기 켜짐: 상위 {service.cache_warmer.top_n}개, 하루 LLM 예산 {service.cache_warmer.llm_budget_per_day}회, {service.cache_warmer.interval_seconds:.0f}초마다")
+    elif settings['record_requests']: service.popularity_log = PopularityLog(SERVER_POPULARITY_LOG_PATH)
+    print(f"가이드 서버 시작: http://{settings['host']}:{server.server_address[1]} (작업자 {service.max_workers}개, 대기열 {service.max_queued}개, "
+          f"ChatGPT='{settings['chatgpt_model']}', Gemini='{settings['gemini_model']}')")
+    try: server.serve_forever()
+    except KeyboardInterrupt: print("가이드 서버 종료 중...")
+    finally:
+        server.server_close(); service.shutdown(); shutdown_metrics_exporters()
+
+
+if __name__ == '__main__':
+    main()
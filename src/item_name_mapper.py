@@ -1,4 +1,9 @@
 # src/item_name_mapper.py
+import json
+import os
+import threading
+
+from utils import resource_path
 
 # 아이템 이름 <-> poedb.tw URL 식별자 매핑 테이블
 # 여기에 계속해서 주요 유니크 아이템들을 추가해주게.
@@ -34,6 +39,51 @@ ITEM_NAME_TO_POEDB_ID = {
     # 자네가 필요하다고 생각하는 다른 아이템들을 이 목록에 계속 추가해주게!
 }
 
+# 크롤러가 poedb kr/us 페이지를 함께 가져오면서 알게 된 이름(한글/영어) -> 식별자. 위 표에 손으로 넣지 않아도 다음부터 바로 찾는다.
+# 파일에는 원래 이름 그대로 {이름: 식별자}로 저장하고, 메모리에는 정규화한 이름으로 둔다.
+LEARNED_NAMES_PATH = resource_path('learned_item_names.json')
+_learned_lock = threading.Lock()
+_learned_names = None # 정규화한 이름 -> 식별자 (처음 쓸 때 파일에서 읽음)
+_learned_raw = {} # 원래 이름 -> 식별자 (파일에 쓸 내용)
+
+def _normalize_name(name):
+    return name.lower().replace("'", "").replace(" ", "")
+
+def _get_learned_names():
+    global _learned_names
+    with _learned_lock:
+        if _learned_names is None:
+            _learned_names = {}
+            try:
+                with open(LEARNED_NAMES_PATH, 'r', encoding='utf-8') as f: loaded = json.load(f)
+                if isinstance(loaded, dict):
+                    for name, poedb_id in loaded.items():
+                        if isinstance(name, str) and isinstance(poedb_id, str): _learned_raw[name] = poedb_id; _learned_names[_normalize_name(name)] = poedb_id
+            except FileNotFoundError: pass
+            except (OSError, ValueError) as e: print(f"경고: 학습한 아이템 이름 파일을 읽지 못했습니다 ({LEARNED_NAMES_PATH}): {e}")
+        return _learned_names
+
+def learn_item_names(poedb_id, names):
+    """
+    poedb 페이지에서 확인한 이름들(예: 한글/영어 아이템 이름)을 식별자와 함께 기억한다.
+    표나 이미 배운 이름과 겹치지 않는 이름만 추가하고 파일에 저장한다. 새로 배운 이름 목록을 돌려준다.
+    """
+    if not poedb_id: return []
+    learned = _get_learned_names()
+    static_names = {_normalize_name(name) for name in ITEM_NAME_TO_POEDB_ID}
+    with _learned_lock:
+        new_names = [name for name in dict.fromkeys(name.strip() for name in names if name and name.strip())
+                     if _normalize_name(name) not in static_names and learned.get(_normalize_name(name)) != poedb_id]
+        if not new_names: return []
+        for name in new_names: _learned_raw[name] = poedb_id; learned[_normalize_name(name)] = poedb_id
+        temp_path = f"{LEARNED_NAMES_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f: json.dump(_learned_raw, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, LEARNED_NAMES_PATH)
+        except OSError as e: print(f"경고: 학습한 아이템 이름 저장 실패 ({LEARNED_NAMES_PATH}): {e}")
+    print(f"아이템 이름 학습: {', '.join(new_names)} -> '{poedb_id}'")
+    return new_names
+
 def get_poedb_identifier(user_input_name):
     """
     사용자가 입력한 아이템 이름(한글 또는 영어)을 기반으로 
@@ -53,6 +103,12 @@ def get_poedb_identifier(user_input_name):
             print(f"매핑 성공: 입력 '{user_input_name}' -> 정규화된 키와 일치 ('{normalized_key_in_map}') -> ID '{poedb_id_value}'")
             return poedb_id_value # 일치하는 것을 찾으면 바로 반환
 
+    # 2-1. 표에 없으면 크롤러가 poedb 페이지에서 배운 이름 (learn_item_names)
+    learned_id = _get_learned_names().get(normalized_input)
+    if learned_id:
+        print(f"매핑 성공 (학습한 이름): 입력 '{user_input_name}' -> ID '{learned_id}'")
+        return learned_id
+
     # 3. (선택적 확장) 매핑에 없을 경우, 입력값이 영어 이름일 때 간단한 자동 변환 규칙 시도
     #    주의: 이 규칙은 매우 단순하며, 모든 poedb.tw URL 명명 규칙을 커버하지 못할 수 있음.
     #    한글 입력은 이 자동 변환 규칙의 대상이 아님.
@@ -77,6 +133,23 @@ def get_poedb_identifier(user_input_name):
     print(f"알림: '{user_input_name}'에 대한 poedb URL 식별자를 내부 매핑 및 자동 변환 규칙으로 찾지 못했습니다.")
     return None
 
+def is_known_poedb_identifier(poedb_id):
+    """
+    식별자가 매핑 테이블(또는 poedb 페이지에서 배운 이름)에 실제로 있는 값인지 확인한다.
+    (get_poedb_identifier의 영어 자동 변환으로 '추측'한 식별자와 구분할 때 사용)
+    """
+    return poedb_id in ITEM_NAME_TO_POEDB_ID.values() or poedb_id in _get_learned_names().values()
+
+def get_item_name_for_identifier(poedb_id):
+    """
+    poedb 식별자에 해당하는 매핑 테이블의 이름(처음 나오는 것)을 돌려준다. 없으면 None.
+    (기록해 둔 식별자로 get_poedb_identifier를 거치는 요청을 다시 만들 때 사용)
+    """
+    name = next((name for name, identifier in ITEM_NAME_TO_POEDB_ID.items() if identifier == poedb_id), None)
+    if name is None and poedb_id in _get_learned_names().values():
+        with _learned_lock: name = next((name for name, identifier in _learned_raw.items() if identifier == poedb_id), None)
+    return name
+
 if __name__ == '__main__':
     # 간단한 테스트 코드
     test_names = [
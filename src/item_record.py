@@ -0,0 +1,160 @@
+# src/item_record.py
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+# 아이템 정보를 메모리에 오래 많이 들고 있을 때 쓰는 압축 표현과, 항목 수가 아니라 잰 바이트로 크기를 제한하는 캐시.
+# 크롤러/스냅샷/GuideWorker가 주고받는 아이템 정보는 지금처럼 dict {'name', 'type', 'mods', 'url', ('notice'), ('locales')}이고,
+# 수만 개를 들고 있는 곳(아이템 저장소 읽기, 아이템 캐시)만 ItemRecord로 바꿔 둔다.
+#   - dict 대신 __slots__ (항목마다 해시 테이블이 없음)
+#   - 옵션 문장은 숫자를 뺀 틀(sys.intern, 같은 틀의 아이템 수천 개가 문자열 하나를 같이 씀)의 tuple + 아이템의 모든 숫자를 이은 ASCII 문자열 하나.
+#     "+(30–40) 최대 생명력" -> 틀 "+(\0–\0) 최대 생명력", 숫자 "30,40". mods를 읽을 때 원문 그대로 다시 만든다 (숫자 모양/공백을 바꾸지 않음).
+#     한글 문장은 글자당 2바이트에 문자열마다 머리 74바이트라, 옵션 줄마다 따로 들고 있는 것보다 훨씬 작다.
+#   - 아이템 종류도 sys.intern
+# to_dict()는 원래 dict 모양(스냅샷 'crawled_item_data'와 같음)으로 되돌리고, from_dict(to_dict())는 같은 값이 된다.
+# 메모리 비교는 benchmarks/item_memory_bench.py (아이템 5만 개에서 dict 대비).
+
+_FIELDS = ('name', 'type', 'mods', 'url', 'notice', 'locales')
+_PLACEHOLDER = "\0" # 옵션 틀에서 숫자 자리
+_NUMBER_PATTERN = re.compile(r"(\d+(?:\.\d+)?)") # split하면 [글자, 숫자, 글자, 숫자, ..., 글자]
+
+class ItemRecord:
+    """
+    아이템 정보 한 건. 읽기는 dict처럼(record['name'], record.get('mods'))도 되므로 item_data를 받는 함수에 그대로 넘길 수 있다.
+    mods는 읽을 때마다 만드는 tuple, locales는 ((언어, ItemRecord), ...) 또는 None. 알 수 없는 키는 extra(dict)에 그대로 둔다.
+    """
+    __slots__ = ('name', 'type', '_mod_templates', '_mod_numbers', 'url', 'notice', 'locales', 'extra')
+
+    def __init__(self, name, type=None, mods=(), url=None, notice=None, locales=None, extra=None):
+        self.name = name
+        self.type = sys.intern(type) if isinstance(type, str) else type
+        templates = []; numbers = []
+        for mod_text in mods or ():
+            if _PLACEHOLDER in mod_text: templates.append((mod_text,)); continue # 틀 자리 글자가 원문에 있으면 (원문,)으로 통째로
+            parts = _NUMBER_PATTERN.split(mod_text)
+            templates.append(sys.intern(_PLACEHOLDER.join(parts[0::2]))); numbers.extend(parts[1::2])
+        self._mod_templates = tuple(templates); self._mod_numbers = ",".join(numbers)
+        self.url = url; self.notice = notice; self.locales = locales; self.extra = extra
+
+    @property
+    def mods(self):
+        numbers = iter(self._mod_numbers.split(",")) if self._mod_numbers else None; mods = []
+        for template in self._mod_templates:
+            if isinstance(template, tuple): mods.append(template[0]); continue
+            parts = template.split(_PLACEHOLDER)
+            mods.append(parts[0] + "".join(next(numbers) + part for part in parts[1:]) if len(parts) > 1 else template)
+        return tuple(mods)
+
+    @classmethod
+    def from_dict(cls, item_data):
+        """item_data dict(크롤러 결과, 스냅샷의 crawled_item_data)에서. 이미 ItemRecord면 그대로, None이면 None."""
+        if item_data is None or isinstance(item_data, ItemRecord): return item_data
+        locales = item_data.get('locales')
+        if locales: locales = tuple((locale, cls.from_dict(locale_data)) for locale, locale_data in locales.items())
+        extra = {key: value for key, value in item_data.items() if key not in _FIELDS} or None
+        return cls(item_data.get('name'), item_data.get('type'), item_data.get('mods'), item_data.get('url'), item_data.get('notice'), locales or None, extra)
+
+    def to_dict(self):
+        """원래 dict 모양으로 (새 dict, mods는 list). notice/locales는 있을 때만 넣는다."""
+        item_data = {'name': self.name, 'type': self.type, 'mods': list(self.mods), 'url': self.url}
+        if self.notice is not None: item_data['notice'] = self.notice
+        if self.locales is not None: item_data['locales'] = {locale: record.to_dict() for locale, record in self.locales}
+        if self.extra: item_data.update(self.extra)
+        return item_data
+
+    # --- dict처럼 읽기 ---
+    def get(self, key, default=None):
+        try: return self[key]
+        except KeyError: return default
+
+    def __getitem__(self, key):
+        if key in _FIELDS:
+            value = self.mods if key == 'mods' else getattr(self, key)
+            if value is not None or key in ('name', 'type', 'mods', 'url'): return value
+        elif self.extra and key in self.extra: return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try: self[key]; return True
+        except KeyError: return False
+
+    def __eq__(self, other):
+        if isinstance(other, dict): return self.to_dict() == other
+        if not isinstance(other, ItemRecord): return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ItemRecord(name={self.name!r}, type={self.type!r}, mods={len(self.mods)}개)"
+
+
+def measured_size(value, _seen=None):
+    """
+    value가 차지하는 바이트 (sys.getsizeof를 안쪽 dict/list/tuple/문자열/ItemRecord까지 더함, 같은 객체는 한 번만).
+    ItemRecord의 옵션 틀과 아이템 종류는 여러 항목이 같이 쓰는 intern 문자열이므로 세지 않는다 (틀 tuple 자체는 셈).
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen: return 0
+    seen.add(id(value)); size = sys.getsizeof(value)
+    if isinstance(value, dict): size += sum(measured_size(key, seen) + measured_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)): size += sum(measured_size(item, seen) for item in value)
+    elif isinstance(value, ItemRecord):
+        size += sys.getsizeof(value._mod_templates) + sum(measured_size(template, seen) for template in value._mod_templates if isinstance(template, tuple))
+        size += sum(measured_size(getattr(value, slot), seen) for slot in ('name', '_mod_numbers', 'url', 'notice', 'locales', 'extra'))
+    return size
+
+
+class ByteBoundedCache:
+    """
+    잰 크기(sizeof, 기본 measured_size)의 합이 max_bytes를 넘지 않게 오래 안 쓴 것부터 버리는 LRU 캐시. 여러 스레드에서 같이 써도 된다.
+    혼자서 max_bytes를 넘는 값은 넣지 않는다. evicted: 자리가 모자라 버린 항목 수 (누적).
+    """
+    def __init__(self, max_bytes, sizeof=measured_size):
+        self.max_bytes = max_bytes; self.sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # 키 -> (값, 잰 바이트)
+        self._bytes = 0; self.evicted = 0
+
+    def __len__(self):
+        with self._lock: return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock: return key in self._entries
+
+    @property
+    def bytes(self):
+        with self._lock: return self._bytes
+
+    def keys(self):
+        with self._lock: return list(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return default
+            self._entries.move_to_end(key); return entry[0]
+
+    def put(self, key, value):
+        """넣고 True. 값 하나가 max_bytes보다 크면 넣지 않고 False (같은 키의 이전 값도 버린다)."""
+        size = self.sizeof(value)
+        with self._lock:
+            self._pop_locked(key)
+            if size > self.max_bytes: return False
+            self._entries[key] = (value, size); self._bytes += size
+            while self._bytes > self.max_bytes: self._pop_locked(next(iter(self._entries))); self.evicted += 1
+            return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._pop_locked(key)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock: self._entries.clear(); self._bytes = 0
+
+    def _pop_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None: self._bytes -= entry[1]
+        return entry
@@ -0,0 +1,63 @@
+# src/league_version.py
+import threading
+
+# 현재 리그(패치) 버전을 기억하고, 버전이 바뀌면 등록된 캐시들에 알린다.
+# poedb 아이템 정보와 LLM 가이드는 패치마다 달라지므로 캐시는 항목을 namespace()(= 리그 버전) 아래에 넣고,
+# 새 버전이 감지되면(on_league_version_changed) 이전 버전 항목을 버리고 필요하면 다시 데운다.
+# 버전은 crawler.get_current_league_info_from_poedb()의 {'name', 'version'}으로 알게 된다 (앱: 시작할 때 + 주기적으로, 가이드 서버: 리그 정보 갱신 때).
+UNKNOWN_NAMESPACE = "unknown" # 리그 정보를 아직 못 가져왔거나 버전이 없을 때
+
+class LeagueVersionTracker:
+    """
+    현재 리그 버전과 버전 변경 리스너 목록. 여러 스레드에서 같이 써도 된다.
+    리스너는 listener(이전 버전 또는 None, 새 버전)으로, 버전을 알아낸 스레드(update를 부른 스레드)에서 호출된다.
+    이전 버전이 None이면 처음 알게 된 것이다 (그 전에 넣은 UNKNOWN_NAMESPACE 항목은 새 버전 것으로 봐도 된다).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._listeners = []
+
+    @property
+    def version(self):
+        with self._lock: return self._version
+
+    def namespace(self):
+        """캐시 키 앞에 붙일 이름 (현재 리그 버전, 모르면 UNKNOWN_NAMESPACE)."""
+        with self._lock: return self._version or UNKNOWN_NAMESPACE
+
+    def add_listener(self, listener):
+        """버전 변경 리스너 등록. 등록 해제 함수를 돌려준다."""
+        with self._lock: self._listeners.append(listener)
+        def unregister():
+            with self._lock:
+                if listener in self._listeners: self._listeners.remove(listener)
+        return unregister
+
+    def update(self, league_info):
+        """
+        새로 가져온 리그 정보를 알려준다. 버전이 바뀌었으면 리스너를 부르고 True.
+        리그 정보가 없거나(가져오기 실패) 버전이 비어 있으면 아무것도 하지 않는다 (이전 버전을 계속 씀).
+        """
+        version = str((league_info or {}).get('version') or "").strip()
+        if not version: return False
+        with self._lock:
+            previous = self._version
+            if version == previous: return False
+            self._version = version; listeners = list(self._listeners)
+        if previous is not None: print(f"리그 버전 변경 감지: {previous} -> {version} (이전 버전 캐시를 비웁니다)")
+        for listener in listeners:
+            try: listener(previous, version)
+            except Exception as e: print(f"리그 버전 변경 처리 중 오류: {e}")
+        return True
+
+
+_default_tracker = None
+_default_tracker_lock = threading.Lock()
+
+def get_league_version_tracker():
+    """프로세스 전체가 함께 쓰는 리그 버전 추적기."""
+    global _default_tracker
+    with _default_tracker_lock:
+        if _default_tracker is None: _default_tracker = LeagueVersionTracker()
+        return _default_tracker
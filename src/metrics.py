@@ -0,0 +1,222 @@
+# src/metrics.py
+import bisect
+import os
+import threading
+
+# 프로세스 안의 지표(카운터/지연 시간 히스토그램) 모음. 여러 사람이 함께 쓰는 PC에서 돌릴 때 처리량과 꼬리 지연을 보려고 둔다.
+# Prometheus 텍스트 형식으로 내보낸다:
+#   - 로컬 HTTP 엔드포인트 (config.ini [METRICS] HTTP_PORT, 기본 꺼짐): http://127.0.0.1:<포트>/metrics
+#   - 주기적으로 덮어쓰는 파일 (DUMP_FILE): node_exporter의 textfile 수집기가 그대로 읽을 수 있는 .prom 형식
+# 지표 기록은 항상 켜져 있다 (잠금 한 번 + 덧셈 정도라 비용이 거의 없음). 내보내기만 설정으로 켠다.
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0) # 초
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels: return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+def _format_number(value):
+    if value == float('inf'): return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name; self.help_text = help_text; self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {} # 레이블 값 튜플 -> 값
+
+    def _label_key(self, labels):
+        if len(labels) != len(self.labelnames) or any(name not in labels for name in self.labelnames):
+            raise ValueError(f"지표 '{self.name}'의 레이블은 {list(self.labelnames)} 이어야 합니다: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock: self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {_escape_help(self.help_text)}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock: items = sorted(self._values.items())
+        for label_values, value in items: lines += self._render_sample(list(zip(self.labelnames, label_values)), value)
+        return lines
+
+
+class Counter(_Metric):
+    """늘어나기만 하는 값 (요청 수, 오류 수 등)."""
+    type_name = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        if not self.labelnames: self._values[()] = 0 # 레이블 없는 카운터는 처음부터 0으로 내보낸다
+
+    def inc(self, amount=1, **labels):
+        key = self._label_key(labels)
+        with self._lock: self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock: return self._values.get(self._label_key(labels), 0)
+
+    def _render_sample(self, labels, value):
+        return [f"{self.name}{_format_labels(labels)} {_format_number(value)}"]
+
+
+class Histogram(_Metric):
+    """관측값 분포 (지연 시간 등). 구간별 개수 + 합계 + 개수를 두고, p95/p99는 수집 쪽(histogram_quantile)에서 계산한다."""
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._label_key(labels); bucket_index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None: state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0] # 구간별 개수(마지막은 +Inf), 합계, 개수
+            state[0][bucket_index] += 1; state[1] += value; state[2] += 1
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._label_key(labels))
+            return state[2] if state else 0
+
+    def _render_sample(self, labels, state):
+        bucket_counts, total, count = state
+        lines = []; cumulative = 0
+        for upper_bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_number(upper_bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_number(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """지표 목록. 같은 이름으로 다시 만들면 이미 있는 지표를 돌려준다."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render_prometheus(self):
+        """모든 지표를 Prometheus 텍스트 형식 문자열로."""
+        with self._lock: metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics: lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, metric_class, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None: metric = self._metrics[name] = metric_class(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames): raise ValueError(f"이미 다른 형태로 등록된 지표입니다: {name}")
+            return metric
+
+
+REGISTRY = MetricsRegistry()
+
+# --- 앱이 기록하는 지표 ---
+CRAWL_REQUESTS = REGISTRY.counter('poeplanner_crawl_requests_total', "poedb.tw 페이지 요청 수 (결과별: ok, cancelled, timeout, connection_error, http_<상태코드>, error / 존재 확인 HEAD 요청은 probe_ 접두어)", ['outcome'])
+CRAWL_RESPONSE_BYTES = REGISTRY.counter('poeplanner_crawl_response_bytes_total', "poedb.tw에서 받은 응답 본문 바이트 수")
+CACHE_LOOKUPS = REGISTRY.counter('poeplanner_cache_lookups_total', "캐시 조회 수 (cache: item_prefetch, render, blob_store, server_item, server_guide, crawl_negative / result: hit, miss, pending)", ['cache', 'result'])
+CACHE_EVICTIONS = REGISTRY.counter('poeplanner_cache_league_evictions_total', "리그 버전이 바뀌어 버린 캐시 항목 수 (cache: item_prefetch, server_item, server_guide)", ['cache'])
+LLM_CALLS = REGISTRY.counter('poeplanner_llm_calls_total', "LLM 호출 수 (제공자/모델/결과별)", ['provider', 'model', 'outcome'])
+GUIDE_REQUESTS = REGISTRY.counter('poeplanner_guide_requests_total', "가이드 요청 수 (GuideWorker finished 상태별: success, cancelled, error_crawl, error_unknown ...)", ['status'])
+STAGE_SECONDS = REGISTRY.histogram('poeplanner_stage_duration_seconds', "가이드 요청 단계별 소요 시간(초): map, crawl_wait, crawl, parse, prompt, llm_first_chunk, llm, worker, render (가이드 서버 사용 시 server_first_chunk, server)", ['stage'])
+
+
+# ---------------------------------------------------------------------
+# 내보내기 (HTTP 엔드포인트 / 주기적 파일)
+# ---------------------------------------------------------------------
+_exporters_lock = threading.Lock()
+_http_server = None; _http_address = None
+_dump_thread = None; _dump_stop = None; _dump_settings = None
+
+def write_metrics_file(file_path, registry=REGISTRY):
+    """지표를 파일로 쓴다. 수집기가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 바꿔치기한다."""
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f: f.write(registry.render_prometheus())
+    os.replace(temp_path, file_path)
+
+def configure_metrics_exporters(http_port=0, http_host="127.0.0.1", dump_file=None, dump_interval_seconds=60):
+    """
+    설정에 맞춰 내보내기를 켜거나 끈다 (설정을 다시 읽을 때마다 호출해도 된다. 바뀐 것만 다시 시작).
+    http_port가 0이면 HTTP 엔드포인트 끔, dump_file이 비어 있으면 파일 덤프 끔.
+    """
+    with _exporters_lock:
+        _configure_http(http_host, int(http_port or 0))
+        _configure_dump(dump_file or None, max(1.0, float(dump_interval_seconds or 60)))
+
+def shutdown_metrics_exporters():
+    """앱 종료 시: HTTP 엔드포인트를 닫고, 덤프 파일을 마지막으로 한 번 더 쓴다."""
+    with _exporters_lock:
+        _configure_http(None, 0)
+        settings = _dump_settings
+        _configure_dump(None, 0)
+    if settings:
+        try: write_metrics_file(settings[0])
+        except OSError as e: print(f"경고: 지표 파일 쓰기 실패 ({settings[0]}): {e}")
+
+def _configure_http(host, port):
+    global _http_server, _http_address
+    if _http_address == (host, port) and (_http_server is not None or port == 0): return
+    if _http_server is not None:
+        _http_server.shutdown(); _http_server.server_close(); _http_server = None; _http_address = None
+    if port <= 0: return
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler # 엔드포인트를 켤 때만 임포트
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args): pass
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_response(404); self.send_header("Content-Length", "0"); self.end_headers(); return
+            body = REGISTRY.render_prometheus().encode('utf-8')
+            self.send_response(200); self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE); self.send_header("Content-Length", str(len(body))); self.end_headers()
+            self.wfile.write(body)
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler); server.daemon_threads = True
+    except OSError as e:
+        print(f"경고: 지표 HTTP 엔드포인트를 열지 못했습니다 ({host}:{port}): {e}"); return
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    _http_server = server; _http_address = (host, port)
+    print(f"지표 엔드포인트: http://{host}:{server.server_address[1]}/metrics")
+
+def _configure_dump(file_path, interval_seconds):
+    global _dump_thread, _dump_stop, _dump_settings
+    settings = (file_path, interval_seconds) if file_path else None
+    if settings == _dump_settings: return
+    if _dump_stop is not None: _dump_stop.set(); _dump_thread = None; _dump_stop = None
+    _dump_settings = settings
+    if settings is None: return
+    stop_event = threading.Event()
+
+    def dump_loop():
+        while not stop_event.wait(interval_seconds):
+            try: write_metrics_file(file_path)
+            except OSError as e: print(f"경고: 지표 파일 쓰기 실패 ({file_path}): {e}")
+
+    _dump_stop = stop_event; _dump_thread = threading.Thread(target=dump_loop, name="metrics-dump", daemon=True); _dump_thread.start()
+    print(f"지표 파일 덤프: {file_path} ({interval_seconds:.0f}초마다)")
+
+def observe_stage_timings(timings):
+    """GuideWorker.timings 같은 {단계: 초} dict를 단계별 히스토그램에 넣는다."""
+    for stage, seconds in timings.items(): STAGE_SECONDS.observe(seconds, stage=stage)
+
+def metrics_http_address():
+    """HTTP 엔드포인트가 실제로 열린 (host, port). 꺼져 있으면 None."""
+    return _http_server.server_address[:2] if _http_server is not None else None
@@ -0,0 +1,200 @@
+# src/mod_search.py
+import argparse
+import bisect
+import itertools
+import re
+import sys
+import time
+
+from mod_stats import parse_mod, get_item_store_index, ITEM_STORE_PATH
+
+# 옵션 조건으로 아이템 찾기: "최대 에너지 보호막 >= 50 & 카오스 저항" 같은 질문에 크롤링 없이 답한다.
+# 로컬 아이템 저장소(mod_stats.ITEM_STORE_PATH)의 옵션 줄을 템플릿으로 정규화해서 템플릿 -> 아이템 번호 역색인(포스팅 목록)을 만들고,
+# 포스팅마다 그 옵션의 굴림 범위(최소, 최대)를 함께 둔다. 포스팅 목록은 아이템 번호 순으로 정렬되어 있으므로
+# OR는 목록 합집합(정렬), AND는 짧은 목록부터 정렬 목록 교집합(길이 차이가 크면 이분 탐색)으로 계산한다.
+#
+# 검색어 문법 (GUI 검색창과 search_text()가 같이 씀):
+#   조건1 & 조건2     -> 둘 다 있는 아이템 (AND)
+#   조건1 | 조건2     -> 둘 중 하나라도 있는 아이템 (OR, &보다 먼저 묶임: "A | B & C" = "(A 또는 B) 그리고 C")
+#   조건 = 옵션 문구 [>= 최솟값] [<= 최댓값] [= 값]
+#     옵션 문구는 템플릿의 일부분이면 된다 ("카오스 저항"은 "카오스 저항 +#%", "카오스 저항 #% 증가" 등 모두와 일치).
+#     값 조건은 굴림 범위가 겹치면 통과한다 (30~60으로 굴리는 옵션은 ">= 50"을 만족할 수 있음).
+MAX_RESULTS = 500
+
+_COMPARISON_PATTERN = re.compile(r"(>=|<=|=)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+class ModQueryError(Exception):
+    """검색어를 해석할 수 없거나 저장소에 없는 옵션을 찾을 때. 메시지는 그대로 사용자에게 보여줄 수 있는 문장이다."""
+    pass
+
+
+def parse_mod_query(query_text):
+    """
+    검색어를 [[조건, ...], ...] (바깥 목록은 AND, 안쪽 목록은 OR)으로 바꾼다.
+    조건은 {'text': 옵션 문구, 'min': 최솟값 또는 None, 'max': 최댓값 또는 None}.
+    """
+    groups = []
+    for group_text in query_text.split('&'):
+        group = []
+        for term_text in group_text.split('|'):
+            term_text = term_text.strip(); minimum = maximum = None
+            if not term_text: continue
+            while True:
+                match = _COMPARISON_PATTERN.search(term_text)
+                if not match: break
+                operator, value = match.group(1), float(match.group(2)); term_text = term_text[:match.start()].rstrip()
+                if operator in ('>=', '='): minimum = value if minimum is None else max(minimum, value)
+                if operator in ('<=', '='): maximum = value if maximum is None else min(maximum, value)
+            if not term_text: raise ModQueryError(f"값 조건 앞에 옵션 문구가 없습니다: '{group_text.strip()}'")
+            if '<' in term_text or '>' in term_text: raise ModQueryError(f"값 조건은 >=, <=, = 만 쓸 수 있습니다: '{term_text}'")
+            if minimum is not None and maximum is not None and minimum > maximum: raise ModQueryError(f"최솟값이 최댓값보다 큽니다: '{term_text}'")
+            group.append({'text': term_text, 'min': minimum, 'max': maximum})
+        if group: groups.append(group)
+    if not groups: raise ModQueryError("찾을 옵션을 입력해주세요. 예: 최대 에너지 보호막 >= 50 & 카오스 저항")
+    return groups
+
+
+def _union(lists):
+    # 정렬된 목록들을 합쳐서 중복 없는 정렬 목록으로 (같은 템플릿 옵션이 두 줄인 아이템은 포스팅에 두 번 들어 있음).
+    # 짧은 문구("저항")는 템플릿 수백 개와 일치하므로 heapq.merge로 하나씩 병합하는 것보다 set + sort(C 구현)가 훨씬 빠르다
+    return sorted(set(itertools.chain.from_iterable(lists)))
+
+def _value_range(ranges):
+    # 숫자가 여러 개인 옵션("#~# 물리 피해 추가")은 최소/최대 각각의 평균을 범위로 (ModStatIndex의 크기와 같은 기준). 숫자가 없으면 (None, None)
+    if not ranges: return None, None
+    low = sum(low for low, _ in ranges) / len(ranges); high = sum(high for _, high in ranges) / len(ranges)
+    return min(low, high), max(low, high)
+
+def _in_range(low, high, minimum, maximum):
+    # 굴림 범위 [low, high]가 조건 [minimum, maximum]과 겹치면 True
+    if minimum is None and maximum is None: return True
+    if low is None: return False
+    return (minimum is None or high >= minimum) and (maximum is None or low <= maximum)
+
+def _intersect(small, large):
+    # 두 정렬 목록의 교집합. 길이 차이가 크면 짧은 쪽 원소마다 긴 쪽을 이분 탐색
+    if len(large) > 8 * len(small):
+        result = []; low = 0
+        for item_id in small:
+            low = bisect.bisect_left(large, item_id, low)
+            if low == len(large): break
+            if large[low] == item_id: result.append(item_id)
+        return result
+    result = []; i = j = 0
+    while i < len(small) and j < len(large):
+        if small[i] == large[j]: result.append(small[i]); i += 1; j += 1
+        elif small[i] < large[j]: i += 1
+        else: j += 1
+    return result
+
+
+class ModSearchIndex:
+    """
+    옵션 템플릿 -> 아이템 역색인. 포스팅 목록은 템플릿마다 아이템 번호/굴림 범위의 나란한 목록 (아이템 번호 순).
+    만든 뒤에는 읽기만 하므로 여러 스레드에서 같이 써도 된다.
+    """
+    def __init__(self, items):
+        self.items = [] # {'name', 'type', 'url', 'mods': [(원문, 템플릿, 최소, 최대), ...]}
+        self._postings = {} # 템플릿 -> (아이템 번호 목록, 최소 목록, 최대 목록)
+        for item_data in items:
+            if not item_data or not item_data.get('name'): continue
+            item_id = len(self.items); parsed_mods = [] # (원문, 템플릿, 최소, 최대)
+            for mod_text in item_data.get('mods') or []:
+                template, ranges = parse_mod(mod_text)
+                if not template: continue
+                low, high = _value_range(ranges); parsed_mods.append((mod_text, template, low, high))
+                item_ids, lows, highs = self._postings.setdefault(template, ([], [], []))
+                item_ids.append(item_id); lows.append(low); highs.append(high)
+            self.items.append({'name': item_data['name'], 'type': item_data.get('type'), 'url': item_data.get('url'), 'mods': parsed_mods})
+        self.templates = sorted(self._postings)
+        self._lowered_templates = [(template.lower(), template) for template in self.templates]
+
+    def __len__(self):
+        return len(self.items)
+
+    def matching_templates(self, text):
+        """옵션 문구가 들어 있는 템플릿 목록. 문구에 숫자가 있으면 #으로 바꿔서 찾는다 ("+50 최대 생명력" -> "+# 최대 생명력")."""
+        needle = parse_mod(text)[0].lower()
+        return [template for lowered, template in self._lowered_templates if needle in lowered]
+
+    def search(self, query, limit=MAX_RESULTS):
+        """
+        query(검색어 문자열 또는 parse_mod_query 결과)에 맞는 아이템을 저장소 순서대로 최대 limit개.
+        결과 dict: name, type, url, matched_mods(조건에 걸린 원문 옵션 줄). 저장소에 없는 옵션 문구가 있으면 ModQueryError.
+        """
+        resolved = self._resolve(parse_mod_query(query) if isinstance(query, str) else query)
+        return [self._result(item_id, resolved) for item_id in self._matching_item_ids(resolved)[:limit]]
+
+    def search_text(self, query_text, limit=MAX_RESULTS):
+        """검색창용: (결과 목록 최대 limit개, 전체 일치 수, 조회 시간(ms))."""
+        started = time.perf_counter()
+        resolved = self._resolve(parse_mod_query(query_text))
+        item_ids = self._matching_item_ids(resolved)
+        results = [self._result(item_id, resolved) for item_id in item_ids[:limit]] # 표시할 만큼만 결과 dict를 만든다
+        return results, len(item_ids), (time.perf_counter() - started) * 1000
+
+    # --- 내부 ---
+    def _resolve(self, groups):
+        # 조건마다 옵션 문구를 실제 템플릿 집합으로: [[(템플릿 집합, 최소, 최대), ...], ...]
+        resolved = []
+        for group in groups:
+            resolved_group = []
+            for term in group:
+                templates = self.matching_templates(term['text'])
+                if not templates: raise ModQueryError(f"'{term['text']}' 옵션을 가진 아이템이 저장소에 없습니다.")
+                resolved_group.append((set(templates), term.get('min'), term.get('max')))
+            resolved.append(resolved_group)
+        return resolved
+
+    def _matching_item_ids(self, resolved):
+        candidates = sorted((self._group_item_ids(group) for group in resolved), key=len) # 짧은 목록부터 교집합
+        item_ids = candidates[0]
+        for other in candidates[1:]:
+            if not item_ids: break
+            item_ids = _intersect(item_ids, other)
+        return item_ids
+
+    def _term_item_ids(self, templates, minimum, maximum):
+        lists = []
+        for template in templates:
+            item_ids, lows, highs = self._postings[template]
+            if minimum is not None or maximum is not None:
+                item_ids = [item_id for item_id, low, high in zip(item_ids, lows, highs) if _in_range(low, high, minimum, maximum)]
+            if item_ids: lists.append(item_ids)
+        return _union(lists) if lists else []
+
+    def _group_item_ids(self, group):
+        lists = [item_ids for item_ids in (self._term_item_ids(*term) for term in group) if item_ids]
+        return _union(lists) if lists else []
+
+    def _result(self, item_id, resolved):
+        # 결과에 표시할 '조건에 걸린 옵션 줄'은 돌려줄 아이템만 다시 확인해서 만든다
+        item = self.items[item_id]
+        matched = [mod_text for mod_text, template, low, high in item['mods']
+                   if any(template in templates and _in_range(low, high, minimum, maximum) for group in resolved for templates, minimum, maximum in group)]
+        return {'name': item['name'], 'type': item['type'], 'url': item['url'], 'matched_mods': matched}
+
+
+def get_item_store_search_index(path=ITEM_STORE_PATH):
+    """로컬 아이템 저장소의 옵션 검색 색인 (파일이 바뀔 때만 다시 만듦). 저장소가 없으면 None."""
+    return get_item_store_index(path, index_class=ModSearchIndex)
+
+
+def main():
+    # 명령줄 조회: python src/mod_search.py "최대 에너지 보호막 >= 50 & 카오스 저항"
+    parser = argparse.ArgumentParser(description="로컬 아이템 저장소에서 옵션 조건으로 아이템 찾기")
+    parser.add_argument('query', help="검색어 (조건 & 조건, 조건 | 조건, 옵션 문구 >= 값)")
+    parser.add_argument('--store', default=ITEM_STORE_PATH, help="아이템 저장소 JSON Lines 경로")
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+    index = get_item_store_search_index(args.store)
+    if index is None: print(f"아이템 저장소가 없습니다: {args.store}"); return 1
+    try: results, total, elapsed_ms = index.search_text(args.query, limit=args.limit)
+    except ModQueryError as e: print(e); return 1
+    for result in results: print(f"- {result['name']} ({result['type']}): {' / '.join(result['matched_mods'])}")
+    print(f"{total}개 일치 ({len(results)}개 표시, 조회 {elapsed_ms:.2f}ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# src/mod_stats.py
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+
+try:
+    import numpy # 선택 사항: 설치되어 있으면 아이템 x 옵션 행렬을 NumPy로 계산 (없으면 같은 결과를 파이썬 희소 벡터로)
+except ImportError:
+    numpy = None
+
+from utils import resource_path
+from item_record import ItemRecord
+
+# 아이템 옵션(mods) 정규화와 '옵션이 비슷한 아이템' 찾기.
+# 크롤러가 모은 옵션 줄은 자유 문장이라 그대로는 비교할 수 없으므로, 숫자를 #으로 바꾼 템플릿 + 숫자 값으로 나눈다.
+#   "+(30–40) 최대 생명력"      -> ("+# 최대 생명력", [35.0])        (범위는 가운데 값)
+#   "주문 피해 (15–25)% 증가"   -> ("주문 피해 #% 증가", [20.0])
+#   "(10–20)~(30–40) 물리 피해 추가" -> ("#~# 물리 피해 추가", [15.0, 35.0])
+# 로컬 아이템 저장소(ITEM_STORE_PATH, JSON Lines)의 아이템마다 템플릿별 크기(값들의 평균, 숫자가 없는 옵션은 1)를 구해
+# 아이템 x 템플릿 행렬을 만들고, 코사인 유사도(템플릿별 가중치를 줄 수 있음)로 비슷한 아이템을 찾는다.
+# 저장소는 crawl_pipeline으로 만든다: python src/crawl_pipeline.py --all-known --output item_store.jsonl
+ITEM_STORE_PATH = resource_path('item_store.jsonl')
+SIMILAR_ITEMS_IN_PROMPT = 5 # 가이드 프롬프트에 넣는 비슷한 아이템 수
+MIN_PROMPT_SIMILARITY = 0.2 # 이보다 덜 비슷하면 프롬프트에 넣지 않음 (억지 추천 방지)
+
+_NUMBER = r"\d+(?:\.\d+)?"
+# (최소–최대) 범위 또는 숫자 하나. 괄호 밖의 +/- 부호는 템플릿 글자로 남긴다 ("+#%"와 "-#%"는 다른 옵션)
+_VALUE_PATTERN = re.compile(rf"\(\s*(-?{_NUMBER})\s*[–—\-~]\s*(-?{_NUMBER})\s*\)|({_NUMBER})")
+_SPACES_PATTERN = re.compile(r"\s+")
+
+def parse_mod(mod_text):
+    """옵션 한 줄을 (템플릿, [(최소, 최대), ...])로 나눈다. 숫자 하나는 (값, 값)."""
+    ranges = []
+    def replace(match):
+        if match.group(3) is not None: ranges.append((float(match.group(3)), float(match.group(3))))
+        else: ranges.append((float(match.group(1)), float(match.group(2))))
+        return "#"
+    template = _VALUE_PATTERN.sub(replace, mod_text.replace('[1]', ''))
+    return _SPACES_PATTERN.sub(" ", template).strip(), ranges
+
+def normalize_mod(mod_text):
+    """옵션 한 줄을 (템플릿, [값, ...])으로 나눈다. 범위 값은 가운데 값으로."""
+    template, ranges = parse_mod(mod_text)
+    return template, [(low + high) / 2 for low, high in ranges]
+
+def item_stats(mods):
+    """옵션 목록을 {템플릿: 크기}로. 크기는 값 절댓값의 평균, 숫자가 없는 옵션(예: "피의 마법")은 1. 같은 템플릿이 또 나오면 더한다."""
+    stats = {}
+    for mod_text in mods or []:
+        template, values = normalize_mod(mod_text)
+        if not template or template.startswith('('): continue # "(상세 옵션 정보 없음)" 같은 안내문
+        magnitude = sum(abs(value) for value in values) / len(values) if values else 1.0
+        stats[template] = stats.get(template, 0.0) + (magnitude or 1.0)
+    return stats
+
+def load_item_store(path=ITEM_STORE_PATH):
+    """
+    JSON Lines 아이템 저장소를 읽어 ItemRecord 목록으로 (dict처럼 읽을 수 있고, 수만 개를 들고 있어도 dict보다 훨씬 작다).
+    줄마다 crawl_pipeline 결과({'item_data': ...}) 또는 item_data 그대로. 같은 이름이 여러 번 나오면 마지막 것을 쓴다. 읽을 수 없는 줄은 건너뛴다.
+    """
+    items = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip(): continue
+            try: record = json.loads(line)
+            except ValueError: print(f"아이템 저장소 {line_number}번째 줄을 읽을 수 없어 건너뜁니다: {path}"); continue
+            item_data = record.get('item_data', record) if isinstance(record, dict) else None
+            if item_data and item_data.get('name'): items[item_data['name']] = ItemRecord.from_dict(item_data)
+    return list(items.values())
+
+
+class ModStatIndex:
+    """
+    아이템 x 옵션 템플릿 행렬과 유사도 검색.
+    열마다 (1) 저장소 안의 최댓값으로 나눠 단위를 맞추고(생명력 100과 저항 30을 같은 눈금으로), (2) 드문 옵션일수록 큰 가중치(idf)를 곱한다.
+    similar()는 이 벡터들의 코사인 유사도로 순위를 매긴다. weights={템플릿: 배수}로 특정 옵션을 더(덜) 중요하게 볼 수 있다.
+    NumPy가 있으면 행렬을 압축 열 배열로 두고 질의 옵션의 열만 모아 배열 연산으로, 없으면 템플릿 -> 아이템 역색인(dict)으로 같은 계산을 한다.
+    만든 뒤에는 읽기만 하므로 여러 스레드에서 같이 써도 된다.
+    """
+    def __init__(self, items, use_numpy=None):
+        self.items = []; self._stats = []; self._row_by_name = {}
+        for item_data in items:
+            if not item_data or not item_data.get('name'): continue
+            stats = item_stats(item_data.get('mods'))
+            if not stats: continue
+            self._row_by_name[item_data['name']] = len(self.items)
+            self.items.append({'name': item_data['name'], 'type': item_data.get('type'), 'url': item_data.get('url')}); self._stats.append(stats)
+        self.templates = sorted({template for stats in self._stats for template in stats})
+        self._columns = {template: column for column, template in enumerate(self.templates)}
+        self._scale = [0.0] * len(self.templates); document_counts = [0] * len(self.templates)
+        for stats in self._stats:
+            for template, magnitude in stats.items():
+                column = self._columns[template]; self._scale[column] = max(self._scale[column], magnitude); document_counts[column] += 1
+        self._idf = [math.log((1 + len(self.items)) / (1 + count)) + 1 for count in document_counts]
+        self.backend = 'numpy' if (numpy is not None if use_numpy is None else use_numpy) else 'python'
+        if self.backend == 'numpy': self._build_matrix()
+        else: self._build_sparse()
+
+    def __len__(self):
+        return len(self.items)
+
+    def vector(self, mods):
+        """옵션 목록을 이 색인의 열 기준 {열: 값}으로 (색인에 없는 템플릿은 뺀다)."""
+        return {self._columns[template]: magnitude / self._scale[self._columns[template]] * self._idf[self._columns[template]]
+                for template, magnitude in item_stats(mods).items() if template in self._columns}
+
+    def similar(self, item, top_n=10, weights=None, exclude_self=True):
+        """
+        item(아이템 이름 또는 item_data dict)과 옵션이 비슷한 아이템 top_n개를 유사도 높은 순으로.
+        결과 dict: name, type, url, score(코사인 유사도 0~1), shared_mods(겹치는 템플릿, 기여도 큰 순)
+        이름이 색인에 없거나 겹치는 옵션이 하나도 없으면 빈 목록.
+        """
+        if isinstance(item, str):
+            row = self._row_by_name.get(item)
+            if row is None: return []
+            query_name = item; query = self._row_vector(row)
+        else:
+            query_name = item.get('name'); query = self.vector(item.get('mods'))
+        if not query: return []
+        column_weights = {}
+        for template, weight in (weights or {}).items():
+            if template in self._columns: column_weights[self._columns[template]] = float(weight)
+        exclude = self._row_by_name.get(query_name) if exclude_self else None
+        scored = self._score_numpy(query, column_weights, top_n, exclude) if self.backend == 'numpy' else self._score_python(query, column_weights, top_n, exclude)
+        results = []
+        for row, score in scored:
+            contributions = sorted(((query[self._columns[template]] * self._row_value(row, self._columns[template]) * column_weights.get(self._columns[template], 1.0) ** 2, template)
+                                    for template in self._stats[row] if self._columns[template] in query), reverse=True)
+            results.append({**self.items[row], 'score': score, 'shared_mods': [template for contribution, template in contributions if contribution > 0]})
+        return results
+
+    # --- 내부 ---
+    def _row_vector(self, row):
+        return {self._columns[template]: magnitude / self._scale[self._columns[template]] * self._idf[self._columns[template]] for template, magnitude in self._stats[row].items()}
+
+    def _row_value(self, row, column):
+        template = self.templates[column]
+        return self._stats[row].get(template, 0.0) / self._scale[column] * self._idf[column]
+
+    def _build_matrix(self):
+        # 아이템 하나에 옵션이 4~8줄이라 행렬은 0.5%도 차지 않는다. 빈칸까지 곱하는 밀집 행렬 대신
+        # 열(템플릿)별로 (행, 값)을 이어 붙인 압축 열 형식으로 둔다: 열 c의 항목은 _column_rows[_column_starts[c]:_column_starts[c + 1]]
+        rows, columns, values = [], [], []
+        for row, stats in enumerate(self._stats):
+            for template, magnitude in stats.items():
+                column = self._columns[template]; rows.append(row); columns.append(column); values.append(magnitude / self._scale[column] * self._idf[column])
+        columns = numpy.asarray(columns, dtype=numpy.int64); order = numpy.argsort(columns, kind='stable')
+        self._column_rows = numpy.asarray(rows, dtype=numpy.int64)[order]; self._column_values = numpy.asarray(values, dtype=numpy.float64)[order]
+        self._column_starts = numpy.searchsorted(columns[order], numpy.arange(len(self.templates) + 1))
+        self._squared_norms = numpy.bincount(self._column_rows, weights=self._column_values ** 2, minlength=len(self.items))
+
+    def _build_sparse(self):
+        self._vectors = [self._row_vector(row) for row in range(len(self.items))]
+        self._squared_norms = [sum(value * value for value in vector.values()) for vector in self._vectors]
+        self._postings = {} # 열 -> [(행, 값)]
+        for row, vector in enumerate(self._vectors):
+            for column, value in vector.items(): self._postings.setdefault(column, []).append((row, value))
+
+    # 가중치 w를 준 열은 양쪽 벡터에서 w배가 되므로, 노름의 제곱은 기본값에 가중 열의 (w² - 1) x 값²만 더하면 된다 (가중 열만 훑음)
+    def _score_numpy(self, query, column_weights, top_n, exclude):
+        dots = numpy.zeros(len(self.items))
+        for column, query_value in query.items():
+            start, end = self._column_starts[column], self._column_starts[column + 1]
+            dots[self._column_rows[start:end]] += self._column_values[start:end] * (query_value * column_weights.get(column, 1.0) ** 2)
+        squared_norms = self._squared_norms
+        if column_weights:
+            squared_norms = squared_norms.copy()
+            for column, weight in column_weights.items():
+                start, end = self._column_starts[column], self._column_starts[column + 1]
+                squared_norms[self._column_rows[start:end]] += (weight * weight - 1) * self._column_values[start:end] ** 2
+        query_norm = math.sqrt(sum(value * value * column_weights.get(column, 1.0) ** 2 for column, value in query.items()))
+        scores = dots / numpy.maximum(numpy.sqrt(squared_norms) * query_norm, 1e-12)
+        if exclude is not None: scores[exclude] = 0.0
+        if top_n <= 0: return []
+        # argpartition은 경계의 동점 중 아무거나 고르므로, k번째 점수 이상인 행을 모두 남긴 뒤 (-점수, 행) 순으로 잘라 파이썬 쪽과 같은 결과를 낸다
+        candidates = numpy.flatnonzero(scores > 0)
+        if len(candidates) > top_n:
+            kth = len(candidates) - top_n
+            candidates = candidates[scores[candidates] >= numpy.partition(scores[candidates], kth)[kth]]
+        candidates = candidates[numpy.lexsort((candidates, -scores[candidates]))[:top_n]]
+        return [(int(row), float(scores[row])) for row in candidates]
+
+    def _score_python(self, query, column_weights, top_n, exclude):
+        dots = {}
+        for column, query_value in query.items():
+            factor = query_value * column_weights.get(column, 1.0) ** 2
+            for row, value in self._postings.get(column, ()): dots[row] = dots.get(row, 0.0) + factor * value
+        query_norm = math.sqrt(sum(value * value * column_weights.get(column, 1.0) ** 2 for column, value in query.items()))
+        scored = []
+        for row, dot in dots.items():
+            if row == exclude or dot <= 0: continue
+            squared_norm = self._squared_norms[row] + sum((weight * weight - 1) * self._vectors[row].get(column, 0.0) ** 2 for column, weight in column_weights.items())
+            scored.append((row, dot / max(math.sqrt(squared_norm) * query_norm, 1e-12)))
+        scored.sort(key=lambda entry: (-entry[1], entry[0]))
+        return scored[:top_n]
+
+
+# --- 앱/서버가 같이 쓰는 저장소 색인 ---
+_store_index_lock = threading.Lock()
+_store_indexes = {} # (색인 클래스, 경로) -> (수정 시각, 크기, 색인)
+
+def get_item_store_index(path=ITEM_STORE_PATH, index_class=None):
+    """
+    로컬 아이템 저장소의 색인 (기본: ModStatIndex, mod_search는 ModSearchIndex를 넘김).
+    처음 부를 때(또는 파일이 바뀌었을 때) 한 번 만들고 이후에는 재사용한다. 저장소 파일이 없으면 None (해당 기능을 건너뜀).
+    """
+    index_class = index_class or ModStatIndex
+    try: stat = os.stat(path)
+    except OSError: return None
+    with _store_index_lock:
+        cached = _store_indexes.get((index_class, path))
+        if cached and cached[:2] == (stat.st_mtime, stat.st_size): return cached[2]
+        started = time.perf_counter()
+        index = index_class(load_item_store(path))
+        print(f"아이템 저장소 색인 완료 ({index_class.__name__}): 아이템 {len(index)}개, 옵션 템플릿 {len(index.templates)}개 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        _store_indexes[(index_class, path)] = (stat.st_mtime, stat.st_size, index)
+        return index
+
+def similar_items_for_prompt(item_data, top_n=SIMILAR_ITEMS_IN_PROMPT, path=ITEM_STORE_PATH):
+    """가이드 프롬프트에 넣을 비슷한 아이템 목록. 저장소가 없거나 충분히 비슷한 아이템이 없으면 빈 목록."""
+    if not item_data or not item_data.get('mods'): return []
+    index = get_item_store_index(path)
+    if index is None: return []
+    return [result for result in index.similar(item_data, top_n=top_n) if result['score'] >= MIN_PROMPT_SIMILARITY]
+
+
+def main():
+    # 명령줄 조회: python src/mod_stats.py "카옴의 심장" --top 10 --weight "+# 최대 생명력=3"
+    parser = argparse.ArgumentParser(description="로컬 아이템 저장소에서 옵션이 비슷한 아이템 찾기")
+    parser.add_argument('name', help="기준 아이템 이름 (저장소에 있는 이름)")
+    parser.add_argument('--store', default=ITEM_STORE_PATH, help="아이템 저장소 JSON Lines 경로")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--weight', action='append', default=[], help="템플릿=배수 (여러 번 줄 수 있음)")
+    args = parser.parse_args()
+    weights = {}
+    for entry in args.weight:
+        template, _, weight = entry.rpartition('=')
+        if not template: parser.error(f"--weight는 '템플릿=배수' 형식이어야 합니다: {entry}")
+        weights[template.strip()] = float(weight)
+    index = get_item_store_index(args.store)
+    if index is None: print(f"아이템 저장소가 없습니다: {args.store}"); return 1
+    started = time.perf_counter(); results = index.similar(args.name, top_n=args.top, weights=weights); elapsed = time.perf_counter() - started
+    if not results: print(f"'{args.name}'이(가) 저장소에 없거나 옵션이 겹치는 아이템이 없습니다."); return 1
+    for rank, result in enumerate(results, 1): print(f"{rank:>2}. {result['name']} ({result['type']})  유사도 {result['score']:.3f}  공통: {', '.join(result['shared_mods'][:4])}")
+    print(f"조회 {elapsed * 1000:.2f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
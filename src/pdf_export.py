@@ -0,0 +1,129 @@
+# src/pdf_export.py
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, CancelledError
+
+from PyQt5.QtCore import QMarginsF, QRectF
+from PyQt5.QtGui import QTextCursor, QTextDocument, QTextDocumentFragment, QPainter, QPageLayout, QPageSize, QGuiApplication
+from PyQt5.QtPrintSupport import QPrinter # 무거운 모듈이라 app_planner는 PDF를 처음 저장할 때 이 모듈을 임포트한다
+
+from guide_renderer import split_markdown_blocks
+from snapshot_io import snapshot_markdown_parts
+
+# 가이드 PDF 내보내기.
+# - render_markdown_to_pdf(): 자기 QTextDocument를 따로 만들어 그리므로 GUI 스레드가 아닌 일꾼 스레드에서 호출해도 된다.
+#   (QPainter로 QPrinter에 그리는 것은 보조 스레드에서도 허용됨. 화면의 QTextBrowser 문서는 건드리지 않는다.)
+# - export_snapshots_to_pdf(): 스냅샷 여러 개를 여러 프로세스에서 나눠 PDF로 만든다 (리그 시작용 가이드 묶음 등).
+PDF_PAGE_MARGIN_MM = 15
+PDF_BASE_FONT_POINT_SIZE = 10
+PDF_CHUNK_CHARS = 1500 # 문서에 한 번에 넣는 마크다운 조각 크기
+
+class PdfExportError(Exception):
+    """PDF 파일을 만들 수 없을 때 (경로에 쓸 수 없음 등). 메시지는 그대로 사용자에게 보여줄 수 있는 문장이다."""
+    pass
+
+def snapshot_to_markdown(snapshot_data):
+    """스냅샷(또는 같은 모양의 현재 화면 내용)을 PDF 한 부에 들어갈 마크다운으로 만든다: 제목/조건 + 아이템 요약 + 가이드 + 노트."""
+    header_markdown, body_markdown = snapshot_markdown_parts(snapshot_data)
+    return header_markdown + body_markdown
+
+def render_markdown_to_pdf(markdown_text, output_path, title=""):
+    """
+    마크다운을 A4 PDF로 저장하고 측정값 dict를 반환한다:
+    {'output_path', 'pages', 'layout_ms'(마크다운 변환+페이지 나누기), 'page_ms'(페이지별 그리기 시간 목록), 'total_ms'}
+    """
+    started = time.perf_counter()
+    printer = QPrinter(QPrinter.HighResolution)
+    printer.setOutputFormat(QPrinter.PdfFormat); printer.setOutputFileName(output_path); printer.setDocName(title)
+    printer.setPageLayout(QPageLayout(QPageSize(QPageSize.A4), QPageLayout.Portrait, QMarginsF(*[PDF_PAGE_MARGIN_MM] * 4), QPageLayout.Millimeter))
+    document = QTextDocument()
+    document.documentLayout().setPaintDevice(printer) # 프린터 해상도 기준으로 글꼴/줄 간격 계산
+    font = document.defaultFont(); font.setPointSize(PDF_BASE_FONT_POINT_SIZE); document.setDefaultFont(font)
+    page_rect = printer.pageRect(QPrinter.DevicePixel)
+    document.setPageSize(page_rect.size()) # 페이지 높이를 주면 줄이 페이지 경계에 걸리지 않게 나눠진다
+    # PyQt5는 Qt 함수를 실행하는 동안 GIL을 쥐고 있으므로, 긴 가이드를 setMarkdown() 한 번으로 넣으면 일꾼 스레드여도 GUI가 그동안 멈춘다.
+    # 그래서 블록 단위 조각으로 나눠 넣는다 (조각 사이사이에 GUI 스레드가 돈다).
+    cursor = QTextCursor(document); remaining = markdown_text
+    while remaining:
+        chunk, remaining = split_markdown_blocks(remaining, PDF_CHUNK_CHARS, True)
+        scratch_document = QTextDocument(); scratch_document.setMarkdown(chunk)
+        cursor.movePosition(QTextCursor.End); cursor.insertFragment(QTextDocumentFragment(scratch_document))
+    page_count = document.pageCount()
+    layout_ms = (time.perf_counter() - started) * 1000
+
+    painter = QPainter()
+    if not painter.begin(printer): raise PdfExportError(f"PDF 파일을 만들 수 없습니다. 경로와 쓰기 권한을 확인해주세요:\n{output_path}")
+    page_ms = []
+    try:
+        for page_index in range(page_count):
+            page_started = time.perf_counter()
+            if page_index: printer.newPage()
+            page_top = page_index * page_rect.height()
+            painter.save(); painter.translate(0, -page_top)
+            document.drawContents(painter, QRectF(0, page_top, page_rect.width(), page_rect.height()))
+            painter.restore()
+            page_ms.append((time.perf_counter() - page_started) * 1000)
+    finally: painter.end()
+    return {'output_path': output_path, 'pages': page_count, 'layout_ms': layout_ms, 'page_ms': page_ms, 'total_ms': (time.perf_counter() - started) * 1000}
+
+def export_snapshot_to_pdf(snapshot_path, output_path):
+    """스냅샷 파일 하나를 PDF로. 일괄 내보내기의 작업 단위이며 결과 dict에 원본 경로와 처리한 프로세스 id를 붙인다."""
+    from snapshot_io import read_snapshot
+    snapshot_data = read_snapshot(snapshot_path)
+    result = render_markdown_to_pdf(snapshot_to_markdown(snapshot_data), output_path, title=os.path.splitext(os.path.basename(snapshot_path))[0])
+    result['snapshot_path'] = snapshot_path; result['pid'] = os.getpid()
+    return result
+
+def pdf_output_path(snapshot_path, output_dir, used_names):
+    """스냅샷 파일 이름으로 PDF 이름을 정한다. 폴더가 달라 이름이 겹치면 _2, _3...을 붙인다."""
+    stem = os.path.splitext(os.path.basename(snapshot_path))[0]; name = stem; suffix = 2
+    while name.lower() in used_names: name = f"{stem}_{suffix}"; suffix += 1
+    used_names.add(name.lower())
+    return os.path.join(output_dir, name + ".pdf")
+
+def _init_pdf_process():
+    # 일괄 내보내기 일꾼 프로세스마다 한 번: QTextDocument/글꼴을 쓰려면 QGuiApplication이 있어야 한다. 창은 띄우지 않는다.
+    global _process_app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if QGuiApplication.instance() is None: _process_app = QGuiApplication([sys.argv[0] if sys.argv else "pdf_export"])
+
+def export_snapshots_to_pdf(snapshot_paths, output_dir, max_workers=None, progress_callback=None, cancel_token=None):
+    """
+    스냅샷 파일들을 여러 프로세스에서 나눠 PDF로 만든다. 결과 dict 목록을 끝난 순서대로 반환한다.
+    실패한 항목은 {'snapshot_path', 'error'}. progress_callback(완료 수, 전체 수, 결과 dict)는 한 건 끝날 때마다 호출된다.
+    cancel_token이 취소되면 아직 시작하지 않은 작업은 건너뛴다 (이미 그리는 중인 파일은 끝까지 만든다).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    used_names = set(); jobs = [(path, pdf_output_path(path, output_dir, used_names)) for path in snapshot_paths]
+    if not jobs: return []
+    max_workers = max_workers or min(os.cpu_count() or 1, len(jobs))
+    results = []; started = time.perf_counter()
+    # Qt 앱(스레드 포함)이 떠 있는 프로세스를 fork하면 위험하므로 어느 OS에서든 spawn으로 새 프로세스를 띄운다.
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_pdf_process) as executor:
+        futures = {executor.submit(export_snapshot_to_pdf, snapshot_path, output_path): snapshot_path for snapshot_path, output_path in jobs}
+        unregister = cancel_token.register(lambda: [future.cancel() for future in futures]) if cancel_token else None
+        try:
+            for future in as_completed(futures):
+                try: result = future.result()
+                except CancelledError: continue
+                except Exception as e: result = {'snapshot_path': futures[future], 'error': str(e)}
+                results.append(result)
+                if progress_callback: progress_callback(len(results), len(jobs), result)
+        finally:
+            if unregister: unregister()
+    elapsed = time.perf_counter() - started
+    page_times = [ms for result in results for ms in result.get('page_ms', [])]
+    print(f"PDF 일괄 내보내기: {sum(1 for result in results if 'error' not in result)}/{len(jobs)}개, {len(page_times)}쪽, {elapsed:.2f}초 (프로세스 {max_workers}개"
+          + (f", 쪽당 평균 {sum(page_times) / len(page_times):.1f}ms)" if page_times else ")"))
+    return results
+
+
+if __name__ == '__main__':
+    # 명령줄 일괄 내보내기: python src/pdf_export.py <스냅샷_폴더> <출력_폴더> [프로세스_수]
+    from snapshot_io import SNAPSHOT_FILE_EXTENSIONS
+    if len(sys.argv) < 3: print("사용법: python src/pdf_export.py <스냅샷_폴더> <출력_폴더> [프로세스_수]"); sys.exit(1)
+    source_paths = sorted(os.path.join(root, name) for root, _, files in os.walk(sys.argv[1]) for name in files if name.lower().endswith(SNAPSHOT_FILE_EXTENSIONS))
+    export_snapshots_to_pdf(source_paths, sys.argv[2], max_workers=int(sys.argv[3]) if len(sys.argv) > 3 else None,
+                            progress_callback=lambda done, total, result: print(f"[{done}/{total}] {result.get('output_path') or result.get('error')}"))
@@ -0,0 +1,166 @@
+# src/popularity.py
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from utils import resource_path
+
+# 어떤 아이템/클래스로 가이드를 많이 만드는지 익명으로 기록하고, 한가할 때 인기 있는 것부터 캐시를 미리 데운다.
+# 리그 초반에는 요청이 소수의 아이템/전직에 몰리므로 상위 몇 개만 데워 둬도 대부분의 요청이 캐시에 맞는다.
+# 기록(popularity_log.jsonl, JSON Lines)에는 같은 요청을 다시 만드는 데 필요한 값만 남긴다:
+#   매핑 테이블에 있는 poedb 식별자(자유 입력 문장은 남기지 않음), 클래스, 전직, 리그 유형, 리그, LLM, 노트 유무(내용은 남기지 않음), 시각(시 단위)
+POPULARITY_LOG_PATH = resource_path('popularity_log.jsonl')
+POPULARITY_WINDOW_DAYS = 7 # 이보다 오래된 기록은 세지 않는다 (시작할 때 파일에서도 지움)
+POPULARITY_HALF_LIFE_HOURS = 24 # 하루 전 요청은 지금 요청의 절반으로 센다 (리그 초반 유행이 빨리 바뀌므로)
+KEY_FIELDS = ('item', 'char_class', 'ascendancy', 'league_mode', 'league_season', 'llm')
+
+class PopularityLog:
+    """요청 키 기록과 인기 순위. 여러 스레드에서 같이 써도 된다."""
+    def __init__(self, path=POPULARITY_LOG_PATH, window_days=POPULARITY_WINDOW_DAYS, half_life_hours=POPULARITY_HALF_LIFE_HOURS):
+        self.path = path
+        self.window_seconds = window_days * 86400
+        self.half_life_seconds = half_life_hours * 3600
+        self._lock = threading.Lock()
+        self._entries = deque() # (시각, 키 튜플, 노트 유무), 오래된 것부터
+        self._load()
+
+    def __len__(self):
+        with self._lock: return len(self._entries)
+
+    def record(self, item=None, char_class="", ascendancy="", league_mode="", league_season="", llm="", has_notes=False):
+        """가이드 요청 하나를 기록한다. item은 매핑 테이블에 있는 poedb 식별자만 (그 외 입력은 None으로)."""
+        timestamp = int(time.time()) // 3600 * 3600 # 시 단위로 뭉개서 남긴다
+        key = (item or None, char_class or "", ascendancy or "", league_mode or "", league_season or "", llm or "")
+        line = json.dumps(dict(zip(KEY_FIELDS, key), t=timestamp, notes=bool(has_notes)), ensure_ascii=False)
+        with self._lock:
+            self._entries.append((timestamp, key, bool(has_notes)))
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f: f.write(line + "\n")
+            except OSError as e: print(f"경고: 요청 기록 저장 실패 ({self.path}): {e}")
+
+    def top_requests(self, count, include_notes=False):
+        """
+        최근 요청이 더 무겁게 세어진 인기 순 요청 키 [{'item', 'char_class', ..., 'score'}, ...] 최대 count개.
+        노트가 있던 요청은 프롬프트가 달라 가이드 캐시에 맞지 않으므로 기본으로는 세지 않는다.
+        """
+        scores = self._scores(lambda key, has_notes: key if include_notes or not has_notes else None)
+        return [dict(zip(KEY_FIELDS, key), score=score) for key, score in scores[:count]]
+
+    def top_items(self, count):
+        """인기 순 poedb 식별자 [(식별자, 점수), ...] 최대 count개 (아이템 없는 요청은 빼고)."""
+        return self._scores(lambda key, has_notes: key[0])[:count]
+
+    # --- 내부 ---
+    def _scores(self, key_of):
+        now = time.time(); scores = {}
+        with self._lock:
+            self._prune_locked(now)
+            entries = list(self._entries)
+        for timestamp, key, has_notes in entries:
+            score_key = key_of(key, has_notes)
+            if score_key is None: continue
+            scores[score_key] = scores.get(score_key, 0.0) + 0.5 ** (max(0, now - timestamp) / self.half_life_seconds)
+        return sorted(scores.items(), key=lambda entry: -entry[1])
+
+    def _prune_locked(self, now):
+        while self._entries and now - self._entries[0][0] > self.window_seconds: self._entries.popleft()
+
+    def _load(self):
+        # 기간이 지난 줄이 있으면 남은 줄만으로 파일을 다시 쓴다 (임시 파일에 쓰고 바꿔치기)
+        if not os.path.exists(self.path): return
+        now = time.time(); kept_lines = []; dropped = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try: record = json.loads(line)
+                    except ValueError: dropped += 1; continue
+                    if not isinstance(record, dict) or now - record.get('t', 0) > self.window_seconds: dropped += 1; continue
+                    self._entries.append((record['t'], tuple(record.get(field) if field == 'item' else (record.get(field) or "") for field in KEY_FIELDS), bool(record.get('notes'))))
+                    kept_lines.append(line if line.endswith("\n") else line + "\n")
+        except OSError as e: print(f"경고: 요청 기록을 읽지 못했습니다 ({self.path}): {e}"); return
+        self._entries = deque(sorted(self._entries, key=lambda entry: entry[0]))
+        if dropped:
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f: f.writelines(kept_lines)
+                os.replace(temp_path, self.path)
+            except OSError as e: print(f"경고: 오래된 요청 기록 정리 실패 ({self.path}): {e}")
+
+
+class CacheWarmer:
+    """
+    한가할 때 인기 상위 요청의 캐시를 데우는 백그라운드 스레드 (interval_seconds마다, is_idle()이 True일 때만).
+    warm_item(poedb 식별자): 아이템 정보 캐시를 데운다 (끝날 때까지 기다리는 함수). 새로 가져왔으면 True (이미 캐시에 있었으면 False).
+    warm_guide(요청 키 dict): 가이드를 만들어 가이드 캐시에 넣는다. LLM을 실제로 불렀으면 True (캐시에 이미 있었으면 False).
+    LLM 호출은 최근 24시간 동안 llm_budget_per_day번까지만 쓴다 (0이거나 warm_guide가 없으면 가이드는 데우지 않음).
+    LLM을 부른 시각은 budget_state_path(기본: 요청 기록 옆의 <이름>_llm_budget.json)에 남겨서, 서버를 다시 켜도 예산이 다시 차지 않는다.
+    데우는 도중에 한가하지 않게 되면(사용자 요청이 들어오면) 이번 차례는 거기서 멈춘다.
+    """
+    def __init__(self, popularity_log, warm_item, warm_guide=None, is_idle=None, top_n=10, llm_budget_per_day=0, interval_seconds=300, budget_state_path=None):
+        self.popularity_log = popularity_log
+        self.warm_item = warm_item; self.warm_guide = warm_guide
+        self.is_idle = is_idle or (lambda: True)
+        self.top_n = top_n; self.llm_budget_per_day = llm_budget_per_day; self.interval_seconds = interval_seconds
+        self.budget_state_path = budget_state_path or os.path.splitext(popularity_log.path)[0] + "_llm_budget.json"
+        self._llm_calls = deque(self._load_llm_calls()) # 가이드를 데우느라 LLM을 부른 시각들 (time.time(), 최근 24시간)
+        self._wake = threading.Event(); self._stop = threading.Event(); self._thread = None
+
+    def start(self):
+        if self._thread is not None: return
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True); self._thread.start()
+
+    def stop(self):
+        self._stop.set(); self._wake.set()
+
+    def wake(self):
+        """다음 차례를 기다리지 않고 곧 데운다 (예: 리그 버전이 바뀌어 캐시가 비었을 때)."""
+        self._wake.set()
+
+    def llm_budget_left(self):
+        now = time.time()
+        while self._llm_calls and now - self._llm_calls[0] > 86400: self._llm_calls.popleft()
+        return max(0, self.llm_budget_per_day - len(self._llm_calls))
+
+    def run_once(self):
+        """한 차례 데우기. {'items': 데운 아이템 수, 'guides': LLM으로 새로 만든 가이드 수, 'stopped': 한가하지 않아 멈췄으면 True}"""
+        summary = {'items': 0, 'guides': 0, 'stopped': False}
+        for item, _ in self.popularity_log.top_items(self.top_n):
+            if self._stop.is_set() or not self.is_idle(): summary['stopped'] = True; return summary
+            try:
+                if self.warm_item(item): summary['items'] += 1
+            except Exception as e: print(f"캐시 데우기 중 오류 (아이템 {item}): {e}")
+        if not self.warm_guide: return summary
+        for key in self.popularity_log.top_requests(self.top_n):
+            if self.llm_budget_left() <= 0: break
+            if self._stop.is_set() or not self.is_idle(): summary['stopped'] = True; return summary
+            try:
+                if self.warm_guide(key): self._record_llm_call(); summary['guides'] += 1
+            except Exception as e: print(f"캐시 데우기 중 오류 (가이드 {key.get('item')}, {key.get('char_class')}): {e}")
+        return summary
+
+    def _record_llm_call(self):
+        # 부를 때마다 파일에 남긴다 (임시 파일에 쓰고 바꿔치기). 저장에 실패해도 이번 실행 동안은 메모리로 센다
+        self._llm_calls.append(time.time())
+        temp_path = f"{self.budget_state_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f: json.dump({'llm_calls': list(self._llm_calls)}, f)
+            os.replace(temp_path, self.budget_state_path)
+        except OSError as e: print(f"경고: 캐시 데우기 LLM 예산 기록 저장 실패 ({self.budget_state_path}): {e}")
+
+    def _load_llm_calls(self):
+        if not os.path.exists(self.budget_state_path): return []
+        try:
+            with open(self.budget_state_path, 'r', encoding='utf-8') as f: calls = json.load(f).get('llm_calls', [])
+        except (OSError, ValueError, AttributeError) as e: print(f"경고: 캐시 데우기 LLM 예산 기록을 읽지 못했습니다 ({self.budget_state_path}): {e}"); return []
+        now = time.time()
+        return sorted(float(t) for t in calls if isinstance(t, (int, float)) and now - t <= 86400)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_seconds); self._wake.clear()
+            if self._stop.is_set(): return
+            if not self.is_idle(): continue
+            summary = self.run_once()
+            if summary['items'] or summary['guides']: print(f"인기 요청 캐시 데우기: 아이템 {summary['items']}개, 새 가이드 {summary['guides']}개 (남은 LLM 예산 {self.llm_budget_left()}회)")
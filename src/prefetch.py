@@ -0,0 +1,152 @@
+# src/prefetch.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from cancellation import CancelToken, is_cancelled
+from metrics import CACHE_LOOKUPS, CACHE_EVICTIONS
+from league_version import get_league_version_tracker, UNKNOWN_NAMESPACE
+from item_name_mapper import get_poedb_identifier, is_known_poedb_identifier
+from item_record import ItemRecord, ByteBoundedCache
+
+class ItemPrefetcher:
+    """
+    아이템 입력칸에 적힌 이름을 미리 poedb 식별자로 바꾸고, 상세 정보를 백그라운드에서 받아 메모리에 캐시해 둔다.
+    사용자가 '빌드 가이드 생성'을 누를 즈음에는 크롤링이 끝나 있어서, GuideWorker는 캐시만 꺼내 쓰면 된다.
+    입력이 바뀌면 더 이상 필요 없는(stale) 요청은 취소 토큰으로 즉시 끊는다.
+    fetch_item(key, cancel_token)을 주면 poedb 대신 그 함수로 가져온다 (예: 공유 가이드 서버).
+    캐시는 리그 버전별로 나뉜다: 새 버전이 감지되면 이전 버전 항목을 버리고, 최근에 쓴 rewarm_items개는 백그라운드에서 다시 가져온다.
+    캐시 항목은 ItemRecord로 들고 있고, 항목 수가 아니라 잰 크기의 합(max_cached_bytes)으로 제한한다 (옵션이 많은 아이템도 있으므로).
+    """
+    metrics_cache_name = 'item_prefetch' # 캐시 조회 지표의 cache 레이블
+
+    def __init__(self, cache_ttl_seconds=600, max_cached_bytes=1024 * 1024, fetch_item=None, rewarm_items=16, version_tracker=None):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cached_bytes = max_cached_bytes
+        self.fetch_item = fetch_item
+        self.rewarm_items = rewarm_items
+        self.version_tracker = version_tracker or get_league_version_tracker()
+        # poedb에 한 번에 한 요청만 보내도록 작업 스레드는 하나만 둔다.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="item-prefetch")
+        self._lock = threading.Lock()
+        self._cache = ByteBoundedCache(max_cached_bytes) # (리그 버전, poedb 식별자(또는 URL)) -> (가져온 시각, ItemRecord)
+        self._pending = {} # poedb 식별자(또는 URL) -> (future, CancelToken)
+        self._unregister_version_listener = self.version_tracker.add_listener(self.on_league_version_changed)
+
+    def resolve_prefetch_key(self, item_query):
+        """
+        미리 가져올 대상 키를 구한다. poedb URL이거나 매핑 테이블에 있는 이름일 때만 키를 돌려준다.
+        (영어 자동 변환으로 '추측'한 식별자는 입력 도중의 부분 문자열일 가능성이 커서 미리 가져오지 않는다.)
+        """
+        item_query = (item_query or "").strip()
+        if not item_query: return None
+        if item_query.startswith("http") and "poedb.tw" in item_query: return item_query
+        poedb_id = get_poedb_identifier(item_query)
+        return poedb_id if poedb_id and is_known_poedb_identifier(poedb_id) else None
+
+    def prefetch(self, item_query):
+        """입력이 확정(디바운스)될 때마다 호출. 필요하면 백그라운드 크롤링을 시작하고 키를 반환한다."""
+        key = self.resolve_prefetch_key(item_query)
+        self.cancel_pending(except_key=key) # 입력이 바뀌었으니 이전 요청은 버림
+        if key is None: return None
+        if self._start_fetch(key): print(f"미리 가져오기 시작: '{item_query}' -> '{key}'")
+        return key
+
+    def take(self, key, cancel_token=None):
+        """
+        캐시된 아이템 정보를 꺼낸다. 아직 받는 중이면 끝날 때까지 기다린다(cancel_token으로 중단 가능).
+        캐시에도 없고 진행 중인 요청도 없으면 None (호출한 쪽에서 직접 크롤링).
+        """
+        if not key: return None
+        with self._lock:
+            cached = self._get_fresh_locked(key)
+            if cached is not None: CACHE_LOOKUPS.inc(cache=self.metrics_cache_name, result='hit'); return cached.to_dict()
+            pending = self._pending.get(key)
+        CACHE_LOOKUPS.inc(cache=self.metrics_cache_name, result='miss' if pending is None else 'pending') # pending: 받는 중이라 끝날 때까지 기다림
+        if pending is None: return None
+        future, _ = pending
+        while not is_cancelled(cancel_token):
+            try:
+                item_data = future.result(timeout=0.1)
+                return dict(item_data) if item_data else None
+            except FutureTimeoutError:
+                continue
+            except Exception as e:
+                print(f"미리 가져오기 결과 확인 중 오류 ({key}): {e}")
+                return None
+        return None
+
+    def warm(self, key, cancel_token=None):
+        """
+        캐시 데우기용: 캐시에 없으면 가져와서 넣고 끝날 때까지 기다린다 (다른 가져오기와 같은 작업 스레드를 쓰므로 줄을 세우지 않음).
+        새로 가져오기 시작했으면 True, 이미 캐시에 있거나 받는 중이었으면 False.
+        """
+        if not key or not self._start_fetch(key): return False
+        with self._lock: pending = self._pending.get(key)
+        while pending and not is_cancelled(cancel_token):
+            try: pending[0].result(timeout=0.1); break
+            except FutureTimeoutError: continue
+            except Exception: break # 취소되었거나 가져오기 실패 (_fetch가 이미 알림)
+        return True
+
+    def cancel_pending(self, except_key=None):
+        with self._lock:
+            stale_keys = [key for key in self._pending if key != except_key]
+            stale = [self._pending.pop(key) for key in stale_keys]
+        for future, token in stale:
+            future.cancel(); token.cancel()
+        if stale_keys: print(f"미리 가져오기 취소: {', '.join(stale_keys)}")
+
+    def on_league_version_changed(self, previous_version, new_version):
+        """리그 버전 리스너. 이전 버전 항목을 버리고(처음 알게 된 버전이면 버전 모름 항목을 옮기고) 최근 항목을 다시 데운다."""
+        with self._lock:
+            if previous_version is None: # 리그 정보보다 먼저 가져온 항목은 지금 버전 것
+                for key in [key for key in self._cache.keys() if key[0] == UNKNOWN_NAMESPACE]: self._cache.put((new_version, key[1]), self._cache.pop(key))
+                return
+            stale = [key for key in self._cache.keys() if key[0] != new_version]
+            rewarm_keys = [key[1] for key in reversed(stale)][:self.rewarm_items] # 최근에 쓴 것부터
+            for key in stale: self._cache.pop(key)
+        self.cancel_pending() # 받는 중인 것도 이전 버전 페이지일 수 있다
+        if stale: CACHE_EVICTIONS.inc(len(stale), cache=self.metrics_cache_name)
+        for key in rewarm_keys: self._start_fetch(key)
+        print(f"리그 버전 {new_version}: 아이템 캐시 {len(stale)}개 비움, {len(rewarm_keys)}개 다시 가져오는 중")
+
+    def shutdown(self):
+        self._unregister_version_listener()
+        self.cancel_pending()
+        self._executor.shutdown(wait=False)
+
+    def _start_fetch(self, key):
+        # 캐시에 없고 받는 중도 아니면 백그라운드로 가져오기 시작. 새로 시작했으면 True
+        with self._lock:
+            if self._get_fresh_locked(key) is not None or key in self._pending: return False
+            token = CancelToken()
+            future = self._executor.submit(self._fetch, key, token, self.version_tracker.namespace())
+            self._pending[key] = (future, token)
+        return True
+
+    def _fetch(self, key, token, namespace):
+        item_data = None
+        try:
+            if self.fetch_item: item_data = self.fetch_item(key, token)
+            else:
+                from crawler import get_item_details_from_poedb # requests/bs4 임포트는 첫 사용 시점으로 미룸
+                item_data = get_item_details_from_poedb(key, cancel_token=token)
+            if namespace == UNKNOWN_NAMESPACE: namespace = self.version_tracker.namespace() # 받는 사이에 처음 알게 된 버전
+            if item_data and not token.is_cancelled:
+                with self._lock: # 시작할 때의 버전 아래에 넣는다 (그 사이 버전이 바뀌었으면 토큰이 취소되어 여기 오지 않음)
+                    self._cache.put((namespace, key), (time.monotonic(), ItemRecord.from_dict(item_data)))
+                print(f"미리 가져오기 완료: '{key}'")
+            return item_data
+        finally:
+            with self._lock:
+                if key in self._pending and self._pending[key][1] is token: del self._pending[key]
+
+    def _get_fresh_locked(self, key):
+        cache_key = (self.version_tracker.namespace(), key)
+        entry = self._cache.get(cache_key)
+        if entry is None: return None
+        fetched_at, item_data = entry
+        if time.monotonic() - fetched_at > self.cache_ttl_seconds:
+            self._cache.pop(cache_key); return None
+        return item_data
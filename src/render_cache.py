@@ -0,0 +1,65 @@
+# src/render_cache.py
+import hashlib
+import time
+from collections import OrderedDict
+
+from PyQt5.QtGui import QTextDocument, QTextDocumentFragment
+
+from metrics import CACHE_LOOKUPS
+
+class RenderCache:
+    """
+    마크다운 -> 렌더링 결과 캐시 (메모리 LRU).
+    키는 마크다운 텍스트의 해시이고, 값은 변환이 끝난 QTextDocumentFragment다.
+    GuideRenderer가 본문을 블록 묶음 단위로 붙이므로 캐시도 그 단위로 쌓이고,
+    같은 가이드(스냅샷)를 다시 열면 마크다운 파싱 없이 조각만 복사해서 붙인다.
+
+    참고: HTML 문자열로 저장하는 방식도 재봤지만, Qt의 toHtml() 결과는 원문 마크다운보다 10배 이상 커서
+    fromHtml()로 다시 읽는 쪽이 setMarkdown()보다 오히려 느렸다. 그래서 HTML이 아니라 조각 객체를 그대로 보관한다.
+    """
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # 해시 -> (fragment, 변환에 걸린 ms)
+        self.hits = 0; self.misses = 0; self.saved_ms = 0.0; self.convert_ms = 0.0
+
+    @staticmethod
+    def cache_key(markdown_text):
+        return hashlib.sha1(markdown_text.encode('utf-8')).hexdigest()
+
+    def fragment_for(self, markdown_text):
+        """캐시에 있으면 그대로, 없으면 변환해서 캐시에 넣고 돌려준다."""
+        key = self.cache_key(markdown_text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1; self.saved_ms += entry[1]; CACHE_LOOKUPS.inc(cache='render', result='hit')
+            return entry[0]
+        started = time.perf_counter()
+        scratch_document = QTextDocument(); scratch_document.setMarkdown(markdown_text)
+        fragment = QTextDocumentFragment(scratch_document)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.misses += 1; self.convert_ms += elapsed_ms; CACHE_LOOKUPS.inc(cache='render', result='miss')
+        self._entries[key] = (fragment, elapsed_ms)
+        while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'saved_ms': self.saved_ms, 'convert_ms': self.convert_ms}
+
+    def stats_summary(self):
+        stats = self.stats()
+        return f"렌더 캐시: 적중 {stats['hits']}/{stats['hits'] + stats['misses']} ({stats['hit_rate']:.0%}), 절약 {stats['saved_ms']:.1f}ms, 변환 {stats['convert_ms']:.1f}ms"
+
+_SHARED_RENDER_CACHE = None
+
+def get_shared_render_cache():
+    """앱 전체(가이드 출력창, 스냅샷 보기 등)가 함께 쓰는 렌더 캐시."""
+    global _SHARED_RENDER_CACHE
+    if _SHARED_RENDER_CACHE is None: _SHARED_RENDER_CACHE = RenderCache()
+    return _SHARED_RENDER_CACHE
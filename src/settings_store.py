@@ -0,0 +1,85 @@
+# src/settings_store.py
+import configparser
+import io
+import os
+import threading
+
+# config.ini / api_keys.txt를 한 번만 파싱해서 메모리에 두는 설정 저장소.
+# 읽을 때마다 파일의 (수정 시각, 크기)만 확인하고(os.stat 한 번) 바뀌었을 때만 다시 파싱하므로, 메모장으로 고쳐도 다음 조회부터 반영된다.
+# (QFileSystemWatcher는 Qt 이벤트 루프가 돌아야 알림이 오는데 가이드 일꾼 스레드와 가이드 서버에서도 읽으므로 시각 비교를 쓴다)
+# 쓰기는 같은 폴더의 임시 파일에 다 쓴 뒤 os.replace로 바꿔치기하므로, 다른 스레드/프로세스가 반쯤 쓴 파일을 읽는 일이 없다.
+
+class SettingsFile:
+    """
+    INI 파일 하나의 캐시. config()가 돌려주는 ConfigParser는 여러 스레드가 같이 읽는 공유본이므로 고치지 말고,
+    고칠 때는 editable_copy()로 복사본을 받아 write()로 저장한다.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None # (수정 시각 ns, 크기). 파일이 없으면 None
+        self._text = ""; self._config = configparser.ConfigParser()
+        self._loaded = False
+
+    def exists(self):
+        with self._lock: self._refresh_locked(); return self._signature is not None
+
+    def config(self):
+        """파싱된 설정 (파일이 없으면 빈 ConfigParser). 파일이 바뀌었을 때만 다시 파싱한다."""
+        with self._lock: self._refresh_locked(); return self._config
+
+    def get(self, section, option, fallback=None):
+        return self.config().get(section, option, fallback=fallback)
+
+    def editable_copy(self):
+        """고쳐서 write()에 넘길 복사본 (디스크를 다시 읽지 않고 캐시해 둔 원문을 파싱)."""
+        with self._lock: self._refresh_locked(); text = self._text
+        return _parse(text)
+
+    def write(self, config):
+        """설정을 임시 파일에 다 쓴 뒤 원래 파일과 바꿔치기한다. 실패하면 OSError (원래 파일은 그대로)."""
+        buffer = io.StringIO(); config.write(buffer); text = buffer.getvalue()
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f: f.write(text); f.flush(); os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError:
+            try: os.remove(temp_path)
+            except OSError: pass
+            raise
+        with self._lock: # 방금 쓴 내용을 바로 캐시에 (다음 조회에서 다시 파싱하지 않음)
+            self._signature = _signature(self.path); self._text = text; self._config = _parse(text); self._loaded = True
+
+    def _refresh_locked(self):
+        signature = _signature(self.path)
+        if self._loaded and signature == self._signature: return
+        self._signature = signature; self._loaded = True
+        if signature is None: self._text = ""; self._config = configparser.ConfigParser(); return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: text = f.read()
+            config = _parse(text)
+        except (OSError, UnicodeDecodeError, configparser.Error) as e: # 고치는 중인 파일 등: 마지막으로 읽은 설정을 계속 쓴다
+            print(f"경고: '{self.path}' 설정 파일을 읽지 못해 이전 설정을 계속 사용합니다: {e}"); return
+        self._text = text; self._config = config
+
+
+def _signature(path):
+    try: stat = os.stat(path)
+    except OSError: return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _parse(text):
+    config = configparser.ConfigParser(); config.read_string(text)
+    return config
+
+
+_settings_files = {} # 절대 경로 -> SettingsFile
+_settings_files_lock = threading.Lock()
+
+def get_settings_file(path):
+    """경로별로 프로세스 전체가 함께 쓰는 SettingsFile."""
+    path = os.path.abspath(path)
+    with _settings_files_lock:
+        settings_file = _settings_files.get(path)
+        if settings_file is None: settings_file = _settings_files[path] = SettingsFile(path)
+        return settings_file
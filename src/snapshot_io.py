@@ -0,0 +1,190 @@
+# src/snapshot_io.py
+import json
+import os
+import struct
+import zlib
+
+try:
+    import zstandard # 선택 사항: 설치되어 있으면 압축 스냅샷을 zstd로 저장 (없으면 zlib)
+except ImportError:
+    zstandard = None
+
+# 스냅샷 파일 읽기/쓰기. (app_planner의 저장/불러오기와 스냅샷 라이브러리가 함께 사용)
+# - 1.x (.json)    : 들여쓰기된 JSON 한 덩어리 (기존 형식, 계속 읽을 수 있음)
+# - 2.0 (.poesnap) : [매직 8바이트][헤더 길이 4바이트][헤더 JSON (압축 안 함)][본문 JSON (zlib/zstd 압축)]
+#                    헤더에는 목록/검색에 필요한 query_inputs와 메타데이터만 담아서, 본문 압축을 풀지 않고도 읽을 수 있다.
+# - 2.1 (.poesnap) : 2.0과 같은 틀이지만 아이템 상세/가이드 본문은 blob 저장소(blob_store.py)에 한 번만 두고
+#                    헤더의 blob_refs에 해시만 적는다. 다른 PC로 옮길 때는 export_standalone_snapshot()으로 독립 파일을 만든다.
+SNAPSHOT_VERSION = "1.3" # JSON 형식으로 저장할 때의 버전
+COMPACT_SNAPSHOT_VERSION = "2.0"
+DEDUP_SNAPSHOT_VERSION = "2.1"
+SUPPORTED_SNAPSHOT_VERSIONS = ["1.1", "1.2", "1.3", COMPACT_SNAPSHOT_VERSION, DEDUP_SNAPSHOT_VERSION]
+COMPACT_SNAPSHOT_EXTENSION = ".poesnap"
+COMPACT_SNAPSHOT_MAGIC = b"POESNAP\x02"
+SNAPSHOT_FILE_EXTENSIONS = (".json", COMPACT_SNAPSHOT_EXTENSION)
+
+# 헤더(압축 안 함)에 들어가는 최상위 필드. 나머지(아이템 상세, 가이드 본문, 노트)는 압축된 본문으로 간다.
+_HEADER_FIELDS = ("snapshot_version", "timestamp", "query_inputs")
+# 2.1 형식에서 blob 저장소로 빼서 해시로 참조하는 필드 (스냅샷끼리 그대로 겹치는 경우가 많은 큰 값들)
+BLOB_FIELDS = ("crawled_item_data", "generated_guide_text_markdown")
+
+class SnapshotFormatError(Exception):
+    """스냅샷 파일 형식/버전이 올바르지 않을 때. 메시지는 그대로 사용자에게 보여줄 수 있는 문장이다."""
+    pass
+
+def validate_snapshot_data(snapshot_data):
+    if not isinstance(snapshot_data, dict):
+        raise SnapshotFormatError("선택한 파일의 내용이 올바른 스냅샷 형식이 아닙니다.")
+    if snapshot_data.get("snapshot_version") not in SUPPORTED_SNAPSHOT_VERSIONS:
+        raise SnapshotFormatError(f"선택한 스냅샷 버전({snapshot_data.get('snapshot_version')})이 호환되지 않거나 필수 정보가 누락되었습니다.\n지원 버전: {', '.join(SUPPORTED_SNAPSHOT_VERSIONS)}")
+    return snapshot_data
+
+def is_compact_snapshot_path(file_path):
+    return file_path.lower().endswith(COMPACT_SNAPSHOT_EXTENSION)
+
+def read_snapshot(file_path, blob_store=None):
+    """
+    스냅샷 파일(1.x JSON 또는 2.x 압축 형식)을 읽어 딕셔너리로 반환한다. 형식은 파일 내용(매직 바이트)으로 판별한다.
+    2.1 형식의 blob 참조는 blob_store(없으면 기본 저장소)에서 채워 넣는다.
+    파일이 없으면 FileNotFoundError, 형식이나 버전이 맞지 않거나 참조한 blob이 없으면 SnapshotFormatError.
+    """
+    for stage, data in read_snapshot_stages(file_path, blob_store): pass
+    return data
+
+def read_snapshot_header(file_path):
+    """
+    목록/검색용 메타데이터만 읽는다: snapshot_version, timestamp, query_inputs, item_name.
+    2.0 형식은 본문 압축을 풀지 않고 헤더만 읽고, 1.x JSON은 파일 전체를 읽어 같은 모양으로 만들어 준다.
+    """
+    stages = read_snapshot_stages(file_path)
+    try: return next(stages)[1]
+    finally: stages.close()
+
+def read_snapshot_stages(file_path, blob_store=None):
+    """
+    스냅샷을 두 단계로 읽는 제너레이터: ('header', read_snapshot_header와 같은 dict) 다음 ('snapshot', read_snapshot과 같은 dict).
+    2.x 형식은 본문 압축을 풀기 전에 헤더부터 내놓으므로, 불러오는 쪽은 조건/제목을 먼저 화면에 채울 수 있다. 1.x JSON은 한 번 읽어서 둘 다 만든다.
+    오류는 read_snapshot과 같다 (헤더를 내놓은 뒤 본문에서 날 수도 있음).
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(len(COMPACT_SNAPSHOT_MAGIC)) == COMPACT_SNAPSHOT_MAGIC:
+            header = _read_compact_header(f)
+            header_data = dict(header.get("fields", {})); header_data["item_name"] = header.get("item_name")
+            yield 'header', validate_snapshot_data(header_data)
+            snapshot_data = dict(header.get("fields", {}))
+            snapshot_data.update(_decompress_body(header, f.read()))
+            if header.get("blob_refs"): snapshot_data.update(_resolve_blob_refs(header["blob_refs"], blob_store))
+            yield 'snapshot', validate_snapshot_data(snapshot_data)
+            return
+        f.seek(0); raw = f.read()
+    try: snapshot_data = json.loads(raw.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError): raise SnapshotFormatError("선택한 파일이 올바른 JSON 형식이 아닙니다.")
+    validate_snapshot_data(snapshot_data)
+    header_data = {field: snapshot_data.get(field) for field in _HEADER_FIELDS}
+    item_data = snapshot_data.get("crawled_item_data"); header_data["item_name"] = item_data.get("name") if isinstance(item_data, dict) else None
+    yield 'header', header_data
+    yield 'snapshot', snapshot_data
+
+def snapshot_markdown_parts(snapshot_data):
+    """
+    스냅샷(또는 같은 모양의 현재 화면 내용)을 (머리, 본문) 마크다운으로: 머리는 제목/조건 + 아이템 요약, 본문은 가이드 + 노트.
+    헤더 dict(read_snapshot_header)만 줘도 머리는 만들 수 있다 (아이템 이름은 item_name). PDF 내보내기와 스냅샷 탭에서 같이 쓴다.
+    """
+    inputs = snapshot_data.get("query_inputs", {}) or {}; item_info = snapshot_data.get("crawled_item_data", {}) or {}
+    class_display = inputs.get("base_class") or "클래스 미지정"
+    if class_display == "클래스 선택 안함": class_display = "클래스 미지정"
+    elif inputs.get("ascendancy_class") and inputs["ascendancy_class"] not in ["전직 선택 안함", "전직 정보 없음"]: class_display += f" ({inputs['ascendancy_class']})"
+    league_display = f"{inputs.get('league_season', '')} {inputs.get('league_mode', '')}".strip() or "리그 정보 없음"
+    if item_info.get('notice') == 'no_item_specified': title = "일반 빌드 가이드"
+    else: title = item_info.get('name') or snapshot_data.get('item_name') or inputs.get("item_input_text") or "(아이템 미지정)"
+    lines = [f"# {title}", "", f"**대상:** {class_display} / **리그:** {league_display} / **LLM:** {inputs.get('selected_llm', '')} / **저장 시각:** {snapshot_data.get('timestamp', '')}", ""]
+    if item_info.get('notice') != 'no_item_specified':
+        if item_info.get('type'): lines += [f"**유형:** {item_info['type']}", ""]
+        mods = [mod for mod in item_info.get('mods', []) if '(상세 옵션 정보 없음)' not in mod]
+        if mods: lines += ["**옵션:**", ""] + [f"- {mod}" for mod in mods] + [""]
+    body_lines = ["---", "", snapshot_data.get("generated_guide_text_markdown", "") or "(가이드 내용 없음)", ""]
+    notes = (snapshot_data.get("user_notes_text") or "").strip()
+    if notes: body_lines += ["---", "", "## 나만의 빌드 노트", ""] + [line + "  " for line in notes.splitlines()] # 줄바꿈 유지
+    return "\n".join(lines) + "\n", "\n".join(body_lines)
+
+def read_snapshot_blob_refs(file_path):
+    """2.1 스냅샷이 참조하는 blob 해시({필드: 해시})를 헤더에서 읽는다. 독립 파일이면 빈 dict, 읽을 수 없으면 None."""
+    try:
+        with open(file_path, 'rb') as f:
+            if f.read(len(COMPACT_SNAPSHOT_MAGIC)) != COMPACT_SNAPSHOT_MAGIC: return {}
+            return _read_compact_header(f).get("blob_refs") or {}
+    except (OSError, SnapshotFormatError): return None
+
+def write_snapshot(file_path, snapshot_data, compact=None, blob_store=None):
+    """
+    스냅샷을 저장한다. compact가 None이면 확장자로 정한다 (.poesnap -> 압축 형식, 그 외 -> 1.3 JSON).
+    압축 형식이고 blob_store가 주어지면 BLOB_FIELDS를 저장소에 넣고 해시만 적는 2.1 형식으로, 아니면 독립 파일로 저장한다.
+    실제로 파일에 적은 snapshot_version을 반환한다 (snapshot_data의 값과 다를 수 있음).
+    """
+    if compact is None: compact = is_compact_snapshot_path(file_path)
+    previous_refs = read_snapshot_blob_refs(file_path) if os.path.exists(file_path) else {}
+    if not compact:
+        snapshot_data = dict(snapshot_data); snapshot_data["snapshot_version"] = SNAPSHOT_VERSION
+        with open(file_path, 'w', encoding='utf-8') as f: json.dump(snapshot_data, f, ensure_ascii=False, indent=4)
+    elif blob_store is None:
+        with open(file_path, 'wb') as f: f.write(encode_compact_snapshot(snapshot_data))
+    else:
+        blob_refs = {field: blob_store.put(snapshot_data[field]) for field in BLOB_FIELDS if snapshot_data.get(field) is not None} # blob을 먼저 쓰고 나서 스냅샷 파일을 쓴다
+        with open(file_path, 'wb') as f: f.write(encode_compact_snapshot(snapshot_data, blob_refs))
+        blob_store.set_references(file_path, blob_refs) # 같은 파일의 이전 참조는 여기서 교체됨
+        return DEDUP_SNAPSHOT_VERSION if blob_refs else COMPACT_SNAPSHOT_VERSION
+    if previous_refs: _get_blob_store(blob_store).release_snapshot(file_path) # 2.1 파일을 독립 파일로 덮어쓴 경우
+    return COMPACT_SNAPSHOT_VERSION if compact else SNAPSHOT_VERSION
+
+def export_standalone_snapshot(source_path, target_path, blob_store=None):
+    """
+    스냅샷(2.1 포함)을 blob 저장소 없이도 열리는 독립 파일 하나로 내보낸다. 형식은 target_path 확장자로 정한다.
+    """
+    write_snapshot(target_path, read_snapshot(source_path, blob_store))
+    return target_path
+
+def encode_compact_snapshot(snapshot_data, blob_refs=None):
+    """압축 형식의 바이트열을 만든다. blob_refs({필드: 해시})가 있으면 그 필드는 본문에서 빼고 헤더에 해시만 적는다 (2.1)."""
+    blob_refs = blob_refs or {}
+    fields = {field: snapshot_data.get(field) for field in _HEADER_FIELDS}; fields["snapshot_version"] = DEDUP_SNAPSHOT_VERSION if blob_refs else COMPACT_SNAPSHOT_VERSION
+    body = {key: value for key, value in snapshot_data.items() if key not in _HEADER_FIELDS and key not in blob_refs}
+    body_bytes = json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if zstandard is not None: codec = "zstd"; compressed = zstandard.ZstdCompressor(level=10).compress(body_bytes)
+    else: codec = "zlib"; compressed = zlib.compress(body_bytes, 9)
+    header = {"fields": fields, "item_name": (snapshot_data.get("crawled_item_data") or {}).get("name"),
+              "body_codec": codec, "body_size": len(body_bytes), "body_compressed_size": len(compressed)}
+    if blob_refs: header["blob_refs"] = blob_refs
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return COMPACT_SNAPSHOT_MAGIC + struct.pack(">I", len(header_bytes)) + header_bytes + compressed
+
+def _read_compact_header(f):
+    length_bytes = f.read(4)
+    if len(length_bytes) != 4: raise SnapshotFormatError("압축 스냅샷 파일의 헤더가 손상되었습니다.")
+    (header_length,) = struct.unpack(">I", length_bytes)
+    try: return json.loads(f.read(header_length).decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError): raise SnapshotFormatError("압축 스냅샷 파일의 헤더가 손상되었습니다.")
+
+def _get_blob_store(blob_store):
+    if blob_store is not None: return blob_store
+    from blob_store import get_default_blob_store # sqlite 저장소는 2.1 스냅샷을 처음 다룰 때 연다
+    return get_default_blob_store()
+
+def _resolve_blob_refs(blob_refs, blob_store):
+    from blob_store import BlobNotFoundError
+    store = _get_blob_store(blob_store); values = {}
+    for field, digest in blob_refs.items():
+        try: values[field] = store.get(digest)
+        except BlobNotFoundError: raise SnapshotFormatError(f"이 스냅샷이 참조하는 데이터({field})를 blob 저장소에서 찾을 수 없습니다.\n다른 PC에서 가져온 파일이라면 원래 PC에서 '독립 파일로 내보내기'로 다시 내보내 주세요.")
+    return values
+
+def _decompress_body(header, compressed):
+    codec = header.get("body_codec")
+    try:
+        if codec == "zlib": body_bytes = zlib.decompress(compressed)
+        elif codec == "zstd":
+            if zstandard is None: raise SnapshotFormatError("이 스냅샷은 zstd로 압축되어 있습니다. 'zstandard' 패키지를 설치한 뒤 다시 열어주세요.")
+            body_bytes = zstandard.ZstdDecompressor().decompress(compressed, max_output_size=header.get("body_size") or 0)
+        else: raise SnapshotFormatError(f"지원하지 않는 스냅샷 압축 방식입니다: {codec}")
+        return json.loads(body_bytes.decode('utf-8'))
+    except SnapshotFormatError: raise
+    except Exception as e: raise SnapshotFormatError(f"압축 스냅샷 본문을 읽는 중 오류가 발생했습니다: {e}")
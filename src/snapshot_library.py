@@ -0,0 +1,208 @@
+# src/snapshot_library.py
+import os
+import sqlite3
+import threading
+import time
+
+from utils import resource_path
+from snapshot_io import read_snapshot, SnapshotFormatError, SNAPSHOT_FILE_EXTENSIONS
+from guide_search import GuideSearchIndex, make_snippet
+
+# 스냅샷 라이브러리 인덱스 DB (프로젝트 루트 / 실행 파일 옆)
+LIBRARY_DB_PATH = resource_path('snapshot_library.db')
+
+# 인덱스에 보관하는 메타데이터 열. 가이드 본문은 넣지 않고, 행을 열 때 파일에서 읽는다.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL UNIQUE,
+    snapshot_version TEXT,
+    timestamp TEXT,
+    item_input_text TEXT,
+    item_name TEXT,
+    base_class TEXT,
+    ascendancy_class TEXT,
+    league_mode TEXT,
+    league_season TEXT,
+    selected_llm TEXT,
+    file_mtime REAL,
+    file_size INTEGER,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_class ON snapshots(base_class, ascendancy_class);
+CREATE INDEX IF NOT EXISTS idx_snapshots_league ON snapshots(league_season, league_mode);
+CREATE INDEX IF NOT EXISTS idx_snapshots_item ON snapshots(item_name);
+CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots(timestamp);
+"""
+
+# search()에서 정확히 일치로 거를 수 있는 열
+FILTER_COLUMNS = ['base_class', 'ascendancy_class', 'league_season', 'league_mode', 'selected_llm']
+
+class SnapshotLibrary:
+    """
+    스냅샷 파일들의 메타데이터(query_inputs, 아이템 이름, 시각, 파일 위치)를 SQLite에 색인해 두는 라이브러리.
+    목록/필터 조회는 인덱스만 보므로 수천 개여도 밀리초 단위로 끝나고,
+    가이드 본문은 사용자가 행을 열 때(load_snapshot) 비로소 파일에서 읽는다.
+    가이드 본문/노트의 전문 검색 색인(GuideSearchIndex)도 같은 DB에 두고, 스냅샷을 색인할 때마다 함께 갱신한다.
+    """
+    def __init__(self, db_path=LIBRARY_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.RLock() # 백그라운드 작업에서도 같은 연결을 쓸 수 있도록
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            self.search_index = GuideSearchIndex(self._conn)
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+    # --- 색인 ---
+    def add_snapshot(self, file_path, snapshot_data=None):
+        """스냅샷 파일 하나를 색인에 추가(이미 있으면 갱신)하고 행 id를 반환한다."""
+        with self._lock, self._conn:
+            return self._upsert(file_path, snapshot_data)
+
+    def import_directory(self, directory, recursive=True, progress_callback=None):
+        """
+        폴더 안의 스냅샷 파일들(.json 1.1~1.3, .poesnap 2.0)을 한 번에 색인한다.
+        이미 색인되어 있고 크기/수정 시각이 같은 파일은 건너뛴다. (imported, skipped, failed) 개수를 반환.
+        """
+        file_paths = []
+        for root, dirs, files in os.walk(directory):
+            file_paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(SNAPSHOT_FILE_EXTENSIONS))
+            if not recursive: break
+        imported = skipped = failed = 0
+        started = time.perf_counter()
+        with self._lock, self._conn:
+            known = {row['file_path']: (row['file_mtime'], row['file_size']) for row in self._conn.execute("SELECT file_path, file_mtime, file_size FROM snapshots")}
+            for index, file_path in enumerate(file_paths):
+                file_path = os.path.abspath(file_path)
+                try:
+                    stat = os.stat(file_path)
+                    if known.get(file_path) == (stat.st_mtime, stat.st_size): skipped += 1
+                    else: self._upsert(file_path, None); imported += 1
+                except Exception as e: # 형식은 맞지만 값이 이상한 파일 하나 때문에 나머지까지 되돌려지지 않도록 파일마다 잡는다
+                    failed += 1; print(f"스냅샷 색인 실패 ({file_path}): {e}")
+                if progress_callback: progress_callback(index + 1, len(file_paths))
+        print(f"스냅샷 라이브러리 가져오기: {imported}개 추가, {skipped}개 변경 없음, {failed}개 실패 ({(time.perf_counter() - started):.2f}초)")
+        self.index_missing_texts()
+        return imported, skipped, failed
+
+    def index_missing_texts(self):
+        """전문 검색 색인이 없는 행(예: 검색 기능 추가 전에 색인된 스냅샷)의 본문을 읽어 색인한다."""
+        with self._lock, self._conn:
+            indexed = self.search_index.indexed_ids()
+            missing = [(row['id'], row['file_path']) for row in self._conn.execute("SELECT id, file_path FROM snapshots") if row['id'] not in indexed]
+            for snapshot_id, file_path in missing:
+                try:
+                    snapshot_data = read_snapshot(file_path)
+                    self.search_index.index_document(snapshot_id, _text_field(snapshot_data.get("generated_guide_text_markdown")), _text_field(snapshot_data.get("user_notes_text")))
+                except Exception as e: print(f"전문 검색 색인 실패 ({file_path}): {e}")
+        if missing: print(f"전문 검색 색인 보충: {len(missing)}개")
+        return len(missing)
+
+    def remove_missing(self):
+        """디스크에서 사라진 파일의 색인을 지운다."""
+        with self._lock, self._conn:
+            missing = [(row['id'],) for row in self._conn.execute("SELECT id, file_path FROM snapshots") if not os.path.exists(row['file_path'])]
+            self._conn.executemany("DELETE FROM snapshots WHERE id = ?", missing)
+            for (snapshot_id,) in missing: self.search_index.remove_document(snapshot_id)
+        return len(missing)
+
+    # --- 조회 ---
+    def search(self, item_text=None, limit=1000, **filters):
+        """
+        메타데이터로 스냅샷을 찾는다. filters는 FILTER_COLUMNS 중 하나(정확히 일치),
+        item_text는 입력한 아이템 이름/조회된 아이템 이름의 부분 일치. 최신순으로 반환.
+        """
+        where_sql, params = self._filter_sql(item_text, filters)
+        where = f"WHERE {where_sql}" if where_sql else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM snapshots {where} ORDER BY timestamp DESC, id DESC LIMIT ?", params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_text(self, query_text, limit=50, with_snippets=True, item_text=None, **filters):
+        """
+        가이드 본문/노트 전문 검색. 관련도 순으로 스냅샷 행 dict를 반환하며,
+        각 행에는 'score'(bm25, 낮을수록 관련도 높음)와 'snippet'(발췌문)이 붙는다.
+        발췌문은 반환되는 행의 파일만 읽어서 만든다. 메타데이터 필터(search와 동일)도 함께 쓸 수 있다.
+        """
+        where_sql, params = self._filter_sql(item_text, filters, table_alias="s.")
+        with self._lock:
+            hits = self.search_index.search(query_text, where_sql, params, limit)
+        results = []
+        for entry, score in hits:
+            entry['score'] = score; entry['snippet'] = ""
+            if with_snippets:
+                try:
+                    snapshot_data = read_snapshot(entry['file_path'])
+                    guide_text = _text_field(snapshot_data.get("generated_guide_text_markdown")); notes_text = _text_field(snapshot_data.get("user_notes_text"))
+                    entry['snippet'] = make_snippet(guide_text, query_text) if query_text.strip().lower() in guide_text.lower() or not notes_text else make_snippet(notes_text, query_text)
+                except (OSError, SnapshotFormatError): entry['snippet'] = "(파일을 읽을 수 없음)"
+            results.append(entry)
+        return results
+
+    def distinct_values(self, column):
+        """필터 콤보박스를 채울 때 쓰는, 해당 열의 서로 다른 값 목록."""
+        if column not in FILTER_COLUMNS: raise ValueError(f"알 수 없는 열: {column}")
+        with self._lock:
+            return [row[0] for row in self._conn.execute(f"SELECT DISTINCT {column} FROM snapshots WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}")]
+
+    def count(self):
+        with self._lock: return self._conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def get_entry(self, snapshot_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        return dict(row) if row else None
+
+    def load_snapshot(self, snapshot_id):
+        """행을 열 때 호출. 이때 처음으로 파일 전체(가이드 본문 포함)를 읽는다."""
+        entry = self.get_entry(snapshot_id)
+        if entry is None: raise KeyError(f"스냅샷 라이브러리에 없는 항목입니다: {snapshot_id}")
+        return read_snapshot(entry['file_path'])
+
+    # --- 내부 구현 ---
+    def _filter_sql(self, item_text, filters, table_alias=""):
+        clauses = []; params = []
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS: raise ValueError(f"알 수 없는 필터: {column}")
+            if value: clauses.append(f"{table_alias}{column} = ?"); params.append(value)
+        if item_text:
+            clauses.append(f"({table_alias}item_input_text LIKE ? OR {table_alias}item_name LIKE ?)"); params += [f"%{item_text}%"] * 2
+        return " AND ".join(clauses), params
+
+    def _upsert(self, file_path, snapshot_data):
+        file_path = os.path.abspath(file_path)
+        if snapshot_data is None: snapshot_data = read_snapshot(file_path)
+        stat = os.stat(file_path)
+        inputs = _dict_field(snapshot_data.get("query_inputs")); item_data = _dict_field(snapshot_data.get("crawled_item_data"))
+        row = (file_path, _text_field(snapshot_data.get("snapshot_version"), None), _text_field(snapshot_data.get("timestamp"), None),
+               _text_field(inputs.get("item_input_text")), _text_field(item_data.get("name"), None), _text_field(inputs.get("base_class"), None), _text_field(inputs.get("ascendancy_class"), None),
+               _text_field(inputs.get("league_mode"), None), _text_field(inputs.get("league_season"), None), _text_field(inputs.get("selected_llm"), None), stat.st_mtime, stat.st_size, time.time())
+        self._conn.execute("""
+            INSERT INTO snapshots (file_path, snapshot_version, timestamp, item_input_text, item_name, base_class, ascendancy_class,
+                                   league_mode, league_season, selected_llm, file_mtime, file_size, indexed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(file_path) DO UPDATE SET
+                snapshot_version = excluded.snapshot_version, timestamp = excluded.timestamp, item_input_text = excluded.item_input_text,
+                item_name = excluded.item_name, base_class = excluded.base_class, ascendancy_class = excluded.ascendancy_class,
+                league_mode = excluded.league_mode, league_season = excluded.league_season, selected_llm = excluded.selected_llm,
+                file_mtime = excluded.file_mtime, file_size = excluded.file_size, indexed_at = excluded.indexed_at
+        """, row)
+        snapshot_id = self._conn.execute("SELECT id FROM snapshots WHERE file_path = ?", (file_path,)).fetchone()[0]
+        self.search_index.index_document(snapshot_id, _text_field(snapshot_data.get("generated_guide_text_markdown")), _text_field(snapshot_data.get("user_notes_text")))
+        return snapshot_id
+
+
+# 손으로 고치거나 다른 도구가 만든 스냅샷은 JSON으로는 맞아도 값의 타입이 다를 수 있다 (예: item_input_text가 목록).
+# 색인 열에는 문자열만 넣는다.
+def _dict_field(value):
+    return value if isinstance(value, dict) else {}
+
+def _text_field(value, default=""):
+    if value is None: return default
+    if isinstance(value, str): return value
+    if isinstance(value, (list, tuple)): return " ".join(str(part) for part in value)
+    return str(value)
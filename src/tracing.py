@@ -0,0 +1,145 @@
+# src/tracing.py
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils import resource_path
+
+# 가이드 요청 한 건의 단계별 구간(span) 기록. config.ini의 [TRACING]으로 켠다.
+# 요청마다 Chrome 트레이스 이벤트 JSON 파일을 하나씩 남기므로, chrome://tracing 이나 Perfetto(ui.perfetto.dev)에서
+# 열어 map / crawl.sleep / crawl.network / crawl.parse / prompt / llm / render.flush 중 어디서 시간이 갔는지 볼 수 있다.
+# 꺼져 있으면 span()은 아무것도 하지 않는 공용 객체를 돌려주므로 비용이 거의 없다.
+TRACE_OUTPUT_DIR = resource_path('traces')
+
+_settings = {'enabled': False, 'output_dir': TRACE_OUTPUT_DIR, 'slow_threshold_ms': 0.0}
+
+def configure_tracing(enabled, output_dir=None, slow_threshold_ms=0):
+    """트레이싱 설정 (앱 설정을 읽을 때 호출). slow_threshold_ms보다 오래 걸린 요청만 파일로 남긴다 (0이면 전부)."""
+    _settings['enabled'] = bool(enabled)
+    _settings['output_dir'] = output_dir or TRACE_OUTPUT_DIR
+    _settings['slow_threshold_ms'] = max(0.0, float(slow_threshold_ms or 0))
+
+def tracing_enabled():
+    return _settings['enabled']
+
+
+class _NullSpan:
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc_value, traceback): return False
+    def set(self, **args): pass
+
+class _NullTrace:
+    """트레이싱이 꺼져 있을 때 쓰는 빈 트레이스. 모든 호출이 아무 일도 하지 않는다."""
+    enabled = False
+    def span(self, name, **args): return _NULL_SPAN
+    def add_span(self, name, started, ended, **args): pass
+    def mark(self, name, **args): pass
+    def finish(self, status="success"): return None
+
+_NULL_SPAN = _NullSpan()
+NULL_TRACE = _NullTrace()
+
+class _CurrentTrace(threading.local):
+    trace = NULL_TRACE # 클래스 기본값: 트레이스를 정하지 않은 스레드에서 속성 조회가 예외 없이 바로 끝난다 (꺼져 있을 때 비용)
+
+_current = _CurrentTrace() # 스레드마다 지금 기록 중인 요청 트레이스
+
+
+class _Span:
+    def __init__(self, trace, name, args):
+        self.trace = trace; self.name = name; self.args = args; self.started = None
+    def __enter__(self):
+        self.started = time.perf_counter(); return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None: self.args['error'] = exc_type.__name__
+        self.trace.add_span(self.name, self.started, time.perf_counter(), **self.args)
+        return False
+    def set(self, **args):
+        """구간이 끝나기 전에 인자를 덧붙인다 (예: 받은 바이트 수)."""
+        self.args.update(args)
+
+class RequestTrace:
+    """
+    요청 한 건의 구간 기록. 여러 스레드(일꾼 스레드의 크롤링/LLM, GUI 스레드의 렌더링)에서 구간을 더할 수 있고,
+    finish()가 불리면 요청 전체 구간을 닫고 Chrome 트레이스 JSON으로 저장한다.
+    """
+    enabled = True
+
+    def __init__(self, name, **args):
+        self.name = name; self.args = args
+        self.started = time.perf_counter(); self.started_at = datetime.now()
+        self.events = []; self.thread_names = {}
+        self._lock = threading.Lock(); self._finished = False
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    def add_span(self, name, started, ended, **args):
+        """perf_counter 값으로 잰 구간을 직접 더한다 (이미 잰 시간을 옮겨 적을 때)."""
+        self._add_event({'name': name, 'ph': 'X', 'ts': self._micros(started), 'dur': max(0.0, (ended - started) * 1e6), 'args': args})
+
+    def mark(self, name, **args):
+        """한 시점 표시 (예: LLM 첫 조각 도착)."""
+        self._add_event({'name': name, 'ph': 'i', 's': 't', 'ts': self._micros(time.perf_counter()), 'args': args})
+
+    def finish(self, status="success"):
+        """요청 전체 구간을 닫고 파일로 저장한다. 저장한 경로(기준보다 빨라서 건너뛰면 None)를 반환. 두 번째 호출부터는 무시."""
+        with self._lock:
+            if self._finished: return None
+            self._finished = True
+        ended = time.perf_counter(); total_ms = (ended - self.started) * 1000
+        self.add_span(self.name, self.started, ended, status=status, **self.args)
+        if total_ms < _settings['slow_threshold_ms']: return None
+        file_path = os.path.join(_settings['output_dir'], self._file_name(total_ms))
+        try:
+            os.makedirs(_settings['output_dir'], exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f: json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        except OSError as e:
+            print(f"경고: 트레이스 파일 저장 실패 ({file_path}): {e}"); return None
+        print(f"트레이스 저장: {file_path} (총 {total_ms:.0f}ms)")
+        return file_path
+
+    def to_chrome_trace(self):
+        """Chrome 트레이스 이벤트 형식 dict ({'traceEvents': [...]}). 스레드 이름 메타데이터를 붙인다."""
+        pid = os.getpid()
+        with self._lock: events = list(self.events); thread_names = dict(self.thread_names)
+        trace_events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}} for tid, thread_name in thread_names.items()]
+        trace_events += [dict(event, pid=pid, cat='poeplanner') for event in sorted(events, key=lambda event: event['ts'])]
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms',
+                'otherData': {'request': self.name, 'started_at': self.started_at.isoformat(timespec='seconds'), **{key: str(value) for key, value in self.args.items()}}}
+
+    def _add_event(self, event):
+        thread = threading.current_thread(); event['tid'] = thread.ident
+        with self._lock:
+            self.events.append(event); self.thread_names.setdefault(thread.ident, thread.name)
+
+    def _micros(self, perf_counter_value):
+        return (perf_counter_value - self.started) * 1e6
+
+    def _file_name(self, total_ms):
+        label = re.sub(r'[\\/*?:"<>|\s]+', "_", str(self.args.get('item') or "no_item"))[:40]
+        return f"{self.name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}_{label}_{total_ms:.0f}ms.json"
+
+
+# --- 현재 스레드의 트레이스 ---
+def start_request_trace(name, **args):
+    """새 요청 트레이스를 만든다. 트레이싱이 꺼져 있으면 NULL_TRACE."""
+    return RequestTrace(name, **args) if _settings['enabled'] else NULL_TRACE
+
+def current_trace():
+    return _current.trace
+
+@contextmanager
+def use_trace(trace):
+    """이 블록 안에서 현재 스레드가 부르는 span()은 trace에 기록된다 (크롤러처럼 트레이스를 직접 받지 않는 함수용)."""
+    previous = current_trace(); _current.trace = trace
+    try: yield trace
+    finally: _current.trace = previous
+
+def span(name, **args):
+    """현재 스레드의 요청 트레이스에 구간을 기록한다. 기록 중인 트레이스가 없으면 아무것도 하지 않는다."""
+    return current_trace().span(name, **args)
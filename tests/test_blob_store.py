@@ -0,0 +1,75 @@
+# tests/test_blob_store.py
+"""
+blob 저장소 참조 수/정리(mark_reachable_snapshots + collect_garbage) 회귀 테스트.
+
+사용법:
+    python -m pytest tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import blob_store
+from blob_store import BlobStore
+from snapshot_io import read_snapshot, write_snapshot
+
+
+def snapshot_data(guide_text):
+    return {"query_inputs": {"item_input_text": "타뷸라 라사"}, "crawled_item_data": {"name": "Tabula Rasa", "type": "Armour", "mods": [guide_text], "url": None},
+            "generated_guide_text_markdown": guide_text, "user_notes_text": ""}
+
+
+class BlobGarbageCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = BlobStore(os.path.join(self.directory, "blobs"))
+        self.snapshot_dir = os.path.join(self.directory, "snapshots"); os.makedirs(self.snapshot_dir)
+        self.previous_default_store = blob_store._default_store; blob_store._default_store = self.store # 독립 파일로 덮어쓸 때 write_snapshot이 참조를 해제하는 저장소
+
+    def tearDown(self):
+        blob_store._default_store = self.previous_default_store
+        self.store.close(); shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, name, guide_text, directory=None):
+        path = os.path.join(directory or self.snapshot_dir, name)
+        write_snapshot(path, snapshot_data(guide_text), blob_store=self.store)
+        return path
+
+    def collect(self, snapshot_paths=()):
+        return self.store.collect_garbage(min_age_seconds=0, live_hashes=self.store.mark_reachable_snapshots(snapshot_paths))
+
+    def test_deleted_snapshot_blobs_are_reclaimed(self):
+        os.remove(self.write("a.poesnap", "가이드 A"))
+        removed, _ = self.collect()
+        self.assertEqual(removed, 2)
+        self.assertEqual(self.store.stats(), {'blobs': 0, 'raw_bytes': 0, 'stored_bytes': 0, 'references': 0, 'unreferenced': 0})
+
+    def test_moved_snapshot_keeps_blobs(self):
+        other_dir = os.path.join(self.directory, "moved"); os.makedirs(other_dir)
+        path = self.write("a.poesnap", "가이드 A"); self.write("b.poesnap", "가이드 B", other_dir) # 라이브러리에 있는 다른 폴더
+        moved_path = os.path.join(other_dir, "a.poesnap"); shutil.move(path, moved_path)
+        self.assertEqual(self.collect()[0], 0)
+        self.assertEqual(read_snapshot(moved_path, self.store)["generated_guide_text_markdown"], "가이드 A")
+
+    def test_copy_keeps_blobs_after_original_is_deleted(self):
+        path = self.write("a.poesnap", "가이드 A"); copy_path = os.path.join(self.snapshot_dir, "a_copy.poesnap")
+        shutil.copy(path, copy_path); os.remove(path)
+        self.assertEqual(self.collect()[0], 0)
+        self.assertEqual(read_snapshot(copy_path, self.store)["generated_guide_text_markdown"], "가이드 A")
+        os.remove(copy_path) # 복사본까지 지우면 이제 정리된다
+        self.assertEqual(self.collect()[0], 2)
+
+    def test_overwrite_as_standalone_releases_references(self):
+        path = self.write("a.poesnap", "가이드 A"); self.write("keep.poesnap", "가이드 B")
+        write_snapshot(path, snapshot_data("가이드 A")) # blob_store 없이 = 독립 파일
+        self.assertEqual(self.store.stats()['references'], 2) # keep.poesnap의 것만 남음
+        self.assertEqual(self.collect()[0], 2)
+        self.assertEqual(read_snapshot(path)["generated_guide_text_markdown"], "가이드 A")
+
+
+if __name__ == '__main__':
+    unittest.main()
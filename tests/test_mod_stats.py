@@ -0,0 +1,46 @@
+# tests/test_mod_stats.py
+"""
+ModStatIndex의 NumPy/파이썬 두 계산 경로가 동점일 때도 같은 결과를 내는지 확인하는 회귀 테스트.
+
+사용법:
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import mod_stats
+from mod_stats import ModStatIndex
+
+
+def tied_items():
+    # 옵션이 완전히 같은 아이템 여러 개 -> 질의와의 유사도가 모두 같다. 순서를 섞어 넣어 행 번호와 이름 순서가 다르게 한다
+    # 사이사이에 점수가 더 높거나 낮은 아이템을 끼워 argpartition이 경계의 동점 중 아무거나 고르게 만든다
+    same_mods = ["+80 to maximum Life", "+30% to Fire Resistance"]
+    items = [{"name": "Query", "type": "Armour", "mods": same_mods + ["+20 to Strength"]}]
+    for number in range(120):
+        items.append({"name": f"Tied {(number * 37) % 120:03d}", "type": "Armour", "mods": same_mods})
+        if number % 3 == 0: items.append({"name": f"Closer {number:03d}", "type": "Armour", "mods": same_mods + [f"+{10 + number} to Strength"]})
+        if number % 4 == 0: items.append({"name": f"Farther {number:03d}", "type": "Armour", "mods": ["+80 to maximum Life", f"+{number + 1} to Intelligence"]})
+    return items
+
+
+@unittest.skipIf(mod_stats.numpy is None, "NumPy가 설치되어 있지 않음")
+class BackendTieBreakTest(unittest.TestCase):
+    def test_backends_agree_on_tied_scores(self):
+        numpy_index = ModStatIndex(tied_items(), use_numpy=True); python_index = ModStatIndex(tied_items(), use_numpy=False)
+        for top_n in (1, 5, 40, 45, 60, 100, 200, 500):
+            numpy_results = [(result["name"], round(result["score"], 9)) for result in numpy_index.similar("Query", top_n=top_n)]
+            python_results = [(result["name"], round(result["score"], 9)) for result in python_index.similar("Query", top_n=top_n)]
+            self.assertEqual(numpy_results, python_results, top_n)
+
+    def test_ties_are_ordered_by_row(self):
+        index = ModStatIndex(tied_items(), use_numpy=True)
+        tied = [result["name"] for result in index.similar("Query", top_n=60) if result["name"].startswith("Tied")]
+        self.assertEqual(tied, [f"Tied {(number * 37) % 120:03d}" for number in range(len(tied))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_popularity.py
+"""
+CacheWarmer의 하루 LLM 예산이 재시작 후에도 유지되는지 확인하는 회귀 테스트.
+
+사용법:
+    python -m pytest tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from popularity import CacheWarmer, PopularityLog
+
+
+class CacheWarmerBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log = PopularityLog(os.path.join(self.directory, "popularity_log.jsonl"))
+        self.log.record(item="Tabula_Rasa", char_class="Witch")
+        self.guide_calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_warmer(self):
+        return CacheWarmer(self.log, lambda item: False, lambda key: self.guide_calls.append(key) or True, llm_budget_per_day=1)
+
+    def test_budget_survives_restart(self):
+        self.assertEqual(self.make_warmer().run_once()["guides"], 1)
+        restarted = self.make_warmer()
+        self.assertEqual(restarted.llm_budget_left(), 0)
+        self.assertEqual(restarted.run_once()["guides"], 0)
+        self.assertEqual(len(self.guide_calls), 1)
+
+    def test_calls_older_than_a_day_are_dropped_on_load(self):
+        warmer = self.make_warmer()
+        with open(warmer.budget_state_path, "w", encoding="utf-8") as f: json.dump({"llm_calls": [time.time() - 90000]}, f)
+        self.assertEqual(self.make_warmer().llm_budget_left(), 1)
+
+    def test_broken_state_file_does_not_block_startup(self):
+        warmer = self.make_warmer()
+        with open(warmer.budget_state_path, "w", encoding="utf-8") as f: f.write("{not json")
+        self.assertEqual(self.make_warmer().llm_budget_left(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
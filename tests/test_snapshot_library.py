@@ -0,0 +1,77 @@
+# tests/test_snapshot_library.py
+"""
+스냅샷 라이브러리 색인 회귀 테스트 (네트워크/Qt 없이).
+
+사용법:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from blob_store import BlobStore
+from snapshot_library import SnapshotLibrary
+from snapshot_io import read_snapshot_header, write_snapshot
+
+
+def snapshot_data(item_input_text, guide_text="# 가이드\n\n본문"):
+    return {"snapshot_version": "1.3", "timestamp": "2024-01-01 00:00:00",
+            "query_inputs": {"item_input_text": item_input_text, "base_class": "Witch", "ascendancy_class": "", "league_mode": "소프트코어", "league_season": "Settlers", "selected_llm": "ChatGPT"},
+            "crawled_item_data": {"name": item_input_text, "type": "Armour", "mods": [], "url": None},
+            "generated_guide_text_markdown": guide_text, "user_notes_text": ""}
+
+
+class ImportDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.library = SnapshotLibrary(os.path.join(self.directory, "library.db"))
+
+    def tearDown(self):
+        self.library.close(); shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_json(self, name, data):
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f: json.dump(data, f, ensure_ascii=False)
+
+    def test_malformed_values_do_not_roll_back_good_files(self):
+        for index in range(3): write_snapshot(os.path.join(self.directory, f"good_{index}.json"), snapshot_data(f"타뷸라 라사 {index}"))
+        self.write_json("list_item_text.json", snapshot_data(["타뷸라", "라사"])) # 값 타입이 다름 -> 문자열로 색인
+        self.write_json("bad_inputs.json", dict(snapshot_data("x"), query_inputs=["not", "a", "dict"], crawled_item_data="oops", generated_guide_text_markdown=42))
+        self.write_json("no_version.json", {}); open(os.path.join(self.directory, "broken.json"), 'w').write("{not json")
+        imported, skipped, failed = self.library.import_directory(self.directory)
+        self.assertEqual((imported, skipped, failed), (5, 0, 2)) # 버전 없는 파일과 JSON이 아닌 파일만 실패
+        self.assertEqual(self.library.count(), 5)
+        self.assertEqual(len(self.library.search(item_text="타뷸라 라사")), 4)
+
+    def test_reimport_skips_unchanged_files(self):
+        write_snapshot(os.path.join(self.directory, "good.json"), snapshot_data("카메리아"))
+        self.assertEqual(self.library.import_directory(self.directory), (1, 0, 0))
+        self.assertEqual(self.library.import_directory(self.directory), (0, 1, 0))
+
+
+class WrittenVersionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.library = SnapshotLibrary(os.path.join(self.directory, "library.db"))
+
+    def tearDown(self):
+        self.library.close(); shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_index_records_version_actually_written(self):
+        store = BlobStore(os.path.join(self.directory, "blobs"))
+        for name, blob_store, expected in (("plain.json", None, "1.3"), ("standalone.poesnap", None, "2.0"), ("dedup.poesnap", store, "2.1")):
+            path = os.path.join(self.directory, name); data = snapshot_data(name)
+            written_version = write_snapshot(path, data, blob_store=blob_store)
+            self.assertEqual(written_version, expected); self.assertEqual(read_snapshot_header(path)["snapshot_version"], expected)
+            snapshot_id = self.library.add_snapshot(path, {**data, "snapshot_version": written_version})
+            self.assertEqual(self.library.get_entry(snapshot_id)["snapshot_version"], expected)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()